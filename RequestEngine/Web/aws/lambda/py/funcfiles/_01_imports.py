@@ -7,12 +7,40 @@
 # This file contains common imports shared by all Request Engine implementations.
 # It is merged with other modules during deployment.
 
-import os
 import time
+_COLD_START_IMPORT_BEGIN = time.perf_counter()  # Cold start measurement (eo.meta.cold-start-imports-ms)
+
+import os
+import asyncio
+import atexit
 import hashlib
+import re
 import json
+import random
 import ssl
+import socket
 import logging
-from typing import Any, Dict, Optional, Tuple
+import threading
+import http.cookiejar
+import email.utils
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
+import urllib3
+import urllib3.connection
+import urllib3.util.connection
+
+try:
+    import aiohttp  # Optional: async fetch engine (FETCH_ENGINE_ASYNC)
+except ImportError:
+    aiohttp = None
+
+try:
+    import httpx  # Optional: HTTP/2 fetch engine (FETCH_ENGINE_HTTP2, requires httpx[http2])
+    import h2  # noqa: F401 (HTTP/2 support of httpx)
+except ImportError:
+    httpx = None
+
+_COLD_START_IMPORT_END = time.perf_counter()
@@ -18,6 +18,8 @@
 #   * httpRequestNumber: Optional request sequence number
 #   * httpRequestUUID: Optional UUID for each request (created by n8n)
 #   * httpRequestRoundID: Optional UNIX timestamp when the first request of a round reaches 215 Add httpRequestRoundID (created by n8n)
+#   * warmupStrategy: Optional "full" (default) / "head" / "range-first-bytes" / "full-if-under-<N>-bytes" (see WARMUP_STRATEGY_*)
+# - Batch mode: JSON array of 2+ items above -> JSON array of flat results (same order, BATCH_MAX_CONCURRENCY parallel)
 # - Actual usage: n8n workflow (EOn8nWorkflowJson/eo-n8n-workflow-jp.json) sends POST with JSON body
 #
 # * Dependencies:
@@ -28,8 +30,7 @@
 # ======================================================================
 # AWS-Specific Imports
 # ======================================================================
-import boto3
-from botocore.exceptions import BotoCoreError, ClientError
+# boto3 / botocore are imported lazily in _get_secretsmng_secretkey_value (cold start optimization)
 
 # ======================================================================
 # AWS Secrets Manager Configuration
@@ -37,6 +38,13 @@ from botocore.exceptions import BotoCoreError, ClientError
 LAMBDA_REQUEST_SECRET_NAME = "re-d1-secretsmng-apne1"  # AWS Secrets Manager secret name (secret ID)
 LAMBDA_REQUEST_SECRET_KEY_NAME = "LAMBDA_REQUEST_SECRET"  # Key name within the secret
 
+# ======================================================================
+# Fetch Engine
+# ======================================================================
+LAMBDA_FETCH_ENGINE = FETCH_ENGINE_SYNC
+# Lambda layer only bundles requests, so the sync engine is used (thread pool in batch mode)
+# FETCH_ENGINE_HTTP2 (HTTP/2 via httpx) requires httpx[http2] in the layer
+
 # ======================================================================
 # EO Identification Header
 # ======================================================================
@@ -92,6 +100,13 @@ def _get_secretsmng_secretkey_value() -> str:
     if not region:
         raise RuntimeError("AWS_REGION environment variable is not set")
 
+    # Lazy SDK import (runs in the secret prefetch thread during instance init)
+    sdk_import_start = time.perf_counter()
+    import boto3
+    from botocore.exceptions import BotoCoreError, ClientError
+    secret_fetch_start = time.perf_counter()
+    _record_cold_start_timing("sdk-import", (secret_fetch_start - sdk_import_start) * 1000)
+
     # Create boto3 session and initialize Secrets Manager client
     session = boto3.session.Session()
     client = session.client(
@@ -148,14 +163,28 @@ def _get_secretsmng_secretkey_value() -> str:
     # Cache and return
     # ==================================================================
     # Cache only secret key value (for security reasons, don't cache entire JSON)
+    _record_cold_start_timing("secret-fetch", (time.perf_counter() - secret_fetch_start) * 1000)
     _cached_secretsmng_secretkey_value = secretkey_value
     return secretkey_value
 
 
+# ======================================================================
+# Request Pipeline (platform-neutral logic in request_engine_core)
+# ======================================================================
+# Validation, token verification, request headers, warmup and batch mode are shared;
+# this handler only adapts input/output and supplies the secret getter.
+_request_pipeline = _RequestPipeline(
+    get_request_secret=_get_secretsmng_secretkey_value,
+    eo_header_name=EO_HEADER_NAME,
+    eo_header_value=EO_HEADER_VALUE,
+    fetch_engine=LAMBDA_FETCH_ENGINE,
+)
+
+
 # ======================================================================
 # Main Function (Lambda Handler)
 # ======================================================================
-def lambda_handler(event: Any, context: Any) -> Dict[str, Any]:
+def lambda_handler(event: Any, context: Any) -> Any:
     """
     AWS Lambda main handler
 
@@ -164,7 +193,8 @@ def lambda_handler(event: Any, context: Any) -> Dict[str, Any]:
 
     Args:
         event: Lambda event (JSON Body or Lambda event structure)
-            - Array format: [{...}] - uses first element
+            - Array format (1 item): [{...}] - uses first element
+            - Array format (2+ items): [{...}, {...}, ...] - batch mode (see BATCH_MAX_CONCURRENCY)
             - Object format: {targetUrl, tokenCalculatedByN8n, ...}
             - targetUrl: Target URL (required)
             - tokenCalculatedByN8n: Authentication token (required, SHA-256(url + secret))
@@ -173,22 +203,23 @@ def lambda_handler(event: Any, context: Any) -> Dict[str, Any]:
             - httpRequestUUID: Request UUID (optional)
             - httpRequestRoundID: Request round ID (optional)
             - urltype: URL type (optional, "main_document", "asset", "exception")
+            - warmupStrategy: Warmup strategy (optional, "full" (default), "head", "range-first-bytes", "full-if-under-<N>-bytes")
         context: Lambda context (used to get execution ID, etc.)
 
     Returns:
-        Dict[str, Any]: Flat JSON structure response
+        Dict[str, Any] | List[Dict[str, Any]]: Flat JSON structure response
             - On success: HTTP status code 200, includes performance metrics
             - On error: Appropriate HTTP status code, includes error message
+            - Batch mode: List of flat results (one per item, same order)
 
     Note:
         - Authentication: Verify token parameter against AWS Secrets Manager secret
         - Retry: Automatic retry for temporary errors (up to 3 times)
-        - Memory protection: Skip analysis for content exceeding 5MB
+        - Memory protection: Body is streamed in chunks and discarded (constant memory, see BODY_DRAIN_*)
     """
-    start_time = time.time()
-
-    # Get AWS region for passing to _build_flat_result
-    aws_region = os.environ.get("AWS_REGION")
+    # Get AWS region for passing to the request pipeline (cached instance metadata)
+    aws_region = _get_instance_metadata()["region"]
+    execution_id = context.aws_request_id if context else None
 
     # ==================================================================
     # Receive request from n8n AWS Lambda node (Request Engine node)
@@ -205,279 +236,23 @@ def lambda_handler(event: Any, context: Any) -> Dict[str, Any]:
     print("### RAW EVENT END ###")
 
     # ==================================================================
-    # Normalize event format
-    # ==================================================================
-    # If event is array format, extract first element
-    # (Some Lambda integrations send in array format)
-    if isinstance(event, list):
-        if len(event) == 0:
-            # Return error for empty array
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            return _build_flat_result(
-                status_code=400,
-                status_message="EMPTY_EVENT_LIST",
-                duration_ms=duration_ms,
-                target_url="",
-                http_request_number=None,
-                req_headers={},
-                res_headers={},
-                request_start_timestamp=start_time,
-                request_end_timestamp=end_time,
-                execution_id=context.aws_request_id if context else None,
-                from_area=aws_region,
-            )
-        event = event[0]  # Use first element
-
-    # Return error if event is not dictionary format
-    if not isinstance(event, dict):
-        end_time = time.time()
-        duration_ms = (end_time - start_time) * 1000
-        return _build_flat_result(
-            status_code=400,
-            status_message="INVALID_EVENT_TYPE",
-            duration_ms=duration_ms,
-            target_url="",
-            http_request_number=None,
-            req_headers={},
-            res_headers={},
-            request_start_timestamp=start_time,
-            request_end_timestamp=end_time,
-            execution_id=context.aws_request_id if context else None,
-            from_area=aws_region,
-        )
-
-    data = event
-
-    # ==================================================================
-    # Extract request data
-    # ==================================================================
-    target_url = data.get("targetUrl") or ""
-    token_calculated_by_n8n = data.get("tokenCalculatedByN8n")
-    http_request_number = data.get("httpRequestNumber")
-    http_request_uuid = data.get("httpRequestUUID")
-    http_request_round_id = data.get("httpRequestRoundID")
-    urltype = data.get("urltype")
-    input_headers = data.get("headersForTargetUrl") if isinstance(data.get("headersForTargetUrl"), dict) else {}
-
-    # Get User-Agent header
-    ua_from_request_headers = (
-        input_headers.get("User-Agent") or ""
-    )
-
-    # ==================================================================
-    # URL Validation
+    # Return warmup result data to n8n AWS Lambda node (Request Engine node)
     # ==================================================================
-    if not target_url:
-        end_time = time.time()
-        duration_ms = (end_time - start_time) * 1000
-        return _build_flat_result(
-            status_code=400,
-            status_message="MISSING_URL",
-            duration_ms=duration_ms,
-            target_url="",
-            http_request_number=http_request_number,
-            http_request_uuid=http_request_uuid,
-            http_request_round_id=http_request_round_id,
-            req_headers={},
-            res_headers={},
-            request_start_timestamp=start_time,
-            request_end_timestamp=end_time,
-            execution_id=context.aws_request_id if context else None,
-            urltype=urltype,
-            from_area=aws_region,
-        )
-
-    # ==================================================================
-    # Verify n8n-generated token against token generated from AWS Secrets Manager secret key
-    # ==================================================================
-    # Get secret from AWS Secrets Manager
-    # Note: Secret is retrieved once, subsequent calls use cached value
-    try:
-        secretsmng_secretkey_value = _get_secretsmng_secretkey_value()
-        token_calculated_by_cloud_secret = _calc_token(target_url, secretsmng_secretkey_value)  # SHA-256(url + request secret)
-        if token_calculated_by_n8n == token_calculated_by_cloud_secret:
-            # Token verification successful: continue processing
-            pass
-        else:
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            return _build_flat_result(
-                status_code=401,
-                status_message="INVALID_TOKEN",
-                duration_ms=duration_ms,
-                target_url=target_url,
-                http_request_number=http_request_number,
-                http_request_uuid=http_request_uuid,
-                http_request_round_id=http_request_round_id,
-                req_headers={},
-                res_headers={},
-                request_start_timestamp=start_time,
-                request_end_timestamp=end_time,
-                execution_id=context.aws_request_id if context else None,
-                urltype=urltype,
-                from_area=aws_region,
-            )
-    except Exception as e:
-        logging.error(f"Request Secret validation failed: {str(e)}")
-        end_time = time.time()
-        duration_ms = (end_time - start_time) * 1000
-        return _build_flat_result(
-            status_code=500,
-            status_message="SECRET_FETCH_FAILED",
-            duration_ms=duration_ms,
-            target_url=target_url,
-            http_request_number=http_request_number,
-            http_request_uuid=http_request_uuid,
-            http_request_round_id=http_request_round_id,
-            req_headers={},
-            res_headers={},
-            request_start_timestamp=start_time,
-            request_end_timestamp=end_time,
-            execution_id=context.aws_request_id if context else None,
-            urltype=urltype,
-            from_area=aws_region,
-        )
-
-    # ==================================================================
-    # Prepare request headers
-    # ==================================================================
-    req_headers: Dict[str, str] = dict(input_headers)
-    # Set User-Agent if specified (always included from n8n workflow node 175)
-    if ua_from_request_headers:
-        req_headers.setdefault("User-Agent", ua_from_request_headers)
-    # Add EO identification header (for Request Engine identification)
-    req_headers[EO_HEADER_NAME] = EO_HEADER_VALUE
+    # Event normalization (array / batch mode) and all error results are built by the pipeline
+    _, result = _request_pipeline.handle(event, from_area=aws_region, execution_id=execution_id)
+    return result
 
-    # ==================================================================
-    # Execute HTTP request (with retry)
-    # ==================================================================
-    # initial_response_ms (Time To First Byte) measurement
-    # Definition: Time from sending HTTP request to receiving response headers from server
-    # Includes: DNS lookup, TCP connection, TLS handshake, server processing, network latency
-    # Measurement: stream=True makes requests.get() return at headers-received (before body download)
-    http_request_start_time = time.time()
-    try:
-        # ==================================================================
-        # Send HTTP request to Warmup Target URL
-        # ==================================================================
-        # HTTP request execution with retry support
-        response, retry_info = _execute_http_request_with_retry(
-            target_url,
-            req_headers,
-        )
-
-        with response:
-            # ==================================================================
-            # TTFB measurement (stream=True: headers already received, body not yet downloaded)
-            # ==================================================================
-            ttfb_end = time.time()
-            initial_response_ms = (ttfb_end - http_request_start_time) * 1000
-
-            # ==================================================================
-            # Get HTTP protocol version (connection still open with stream=True)
-            # ==================================================================
-            http_protocol_version = _get_http_protocol_version(response)
-
-            # ==================================================================
-            # Get TLS version (connection still open with stream=True)
-            # ==================================================================
-            tls_version = _get_tls_version(response, target_url)
-
-            # ==================================================================
-            # Get response headers
-            # ==================================================================
-            res_headers = dict(response.headers)
-
-            # ==================================================================
-            # Get redirect count
-            # ==================================================================
-            redirect_count = len(response.history) if hasattr(response, 'history') else 0
-
-            # ==================================================================
-            # Download body (cache warmup) and measure actual content length
-            # ==================================================================
-            body_content = response.content
-            content_length = len(body_content)
-
-            # ==================================================================
-            # Build result
-            # ==================================================================
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-
-            # ==================================================================
-            # Return warmup result data to n8n AWS Lambda node (Request Engine node)
-            # ==================================================================
-            # Build result in flat JSON structure
-            return _build_flat_result(
-                status_code=response.status_code,
-                status_message=response.reason or "OK",
-                duration_ms=duration_ms,
-                initial_response_ms=initial_response_ms,
-                content_length_bytes=content_length,
-                target_url=target_url,
-                http_request_number=http_request_number,
-                http_request_uuid=http_request_uuid,
-                http_request_round_id=http_request_round_id,
-                req_headers=req_headers,
-                res_headers=res_headers,
-                tls_version=tls_version,
-                http_protocol_version=http_protocol_version,
-                request_start_timestamp=http_request_start_time,
-                request_end_timestamp=end_time,
-                execution_id=context.aws_request_id if context else None,
-                redirect_count=redirect_count,
-                urltype=urltype,
-                retry_info=retry_info,
-                from_area=aws_region,
-            )
 
-    # ==================================================================
-    # Error Handling
-    # ==================================================================
-    except requests.exceptions.RequestException as e:
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            return _build_flat_result(
-                status_code=500,
-                status_message=f"Request failed: {str(e)}",
-                duration_ms=duration_ms,
-                target_url=target_url,
-                http_request_number=http_request_number,
-                http_request_uuid=http_request_uuid,
-                http_request_round_id=http_request_round_id,
-                req_headers=req_headers,
-                res_headers={},
-                request_start_timestamp=http_request_start_time if "http_request_start_time" in locals() else None,
-                request_end_timestamp=end_time,
-                execution_id=context.aws_request_id if context else None,
-                redirect_count=0,
-                urltype=urltype if "urltype" in locals() else None,
-                retry_info=retry_info if "retry_info" in locals() else None,
-                from_area=aws_region,
-            )
-
-    except Exception as e:
-        logging.error(f"Unexpected error: {str(e)}")
-        end_time = time.time()
-        duration_ms = (end_time - start_time) * 1000
-        error_target_url = target_url if "target_url" in locals() else ""
-        return _build_flat_result(
-            status_code=500,
-            status_message=f"Internal error: {str(e)}",
-            duration_ms=duration_ms,
-            target_url=error_target_url,
-            http_request_number=http_request_number if "http_request_number" in locals() else None,
-            http_request_uuid=http_request_uuid if "http_request_uuid" in locals() else None,
-            http_request_round_id=http_request_round_id if "http_request_round_id" in locals() else None,
-            req_headers=input_headers if "input_headers" in locals() else {},
-            res_headers={},
-            request_start_timestamp=start_time if "start_time" in locals() else None,
-            request_end_timestamp=end_time,
-            execution_id=context.aws_request_id if context else None,
-            redirect_count=0,
-            urltype=urltype if "urltype" in locals() else None,
-            retry_info=None,  # No retry info for unexpected errors
-            from_area=aws_region,
-        )
\ No newline at end of file
+# ======================================================================
+# Cold Start (instance init)
+# ======================================================================
+# Record import/init time and start fetching the request secret in the background,
+# so the first request does not pay for the SDK import and Secrets Manager round trip.
+# Instance metadata: Lambda environment variables (no metadata endpoint to query).
+_mark_cold_start_init_done()
+_start_secret_prefetch(_get_secretsmng_secretkey_value)
+_init_instance_metadata({
+    "region": os.environ.get("AWS_REGION"),
+    "instance_id": os.environ.get("AWS_LAMBDA_LOG_STREAM_NAME"),  # Unique per execution environment
+    "project_id": None,
+})
@@ -18,6 +18,8 @@
 #   * httpRequestNumber: Optional request sequence number
 #   * httpRequestUUID: Optional UUID for each request (created by n8n)
 #   * httpRequestRoundID: Optional UNIX timestamp when the first request of a round reaches 215 Add httpRequestRoundID (created by n8n)
+#   * warmupStrategy: Optional "full" (default) / "head" / "range-first-bytes" / "full-if-under-<N>-bytes" (see WARMUP_STRATEGY_*)
+# - Batch mode: JSON array of 2+ items above -> JSON array of flat results (same order, BATCH_MAX_CONCURRENCY parallel)
 # - Actual usage: n8n workflow (EOn8nWorkflowJson/eo-n8n-workflow-jp.json) sends POST with JSON body
 #
 # * Dependencies:
@@ -29,6 +31,14 @@
 # ======================================================================
 AZFUNC_REQUEST_SECRET_NAME = "AZFUNC-REQUEST-SECRET"  # Azure Key Vault secret name (not Key Vault name)
 
+# ======================================================================
+# Fetch Engine
+# ======================================================================
+AZFUNC_FETCH_ENGINE = FETCH_ENGINE_ASYNC
+# Single requests and batch mode run on the shared asyncio event loop (falls back to sync if aiohttp
+# is not installed); the handler thread waits for the result (see FETCH_ENGINE_ASYNC in the core)
+# FETCH_ENGINE_HTTP2 (HTTP/2 via httpx) requires httpx[http2] in requirements.txt
+
 # ======================================================================
 # EO Identification Header
 # ======================================================================
@@ -86,16 +96,37 @@ def _get_kv_request_secret() -> str:
     if not keyvault_url:
         raise RuntimeError("EO_AZ_RE_KEYVAULT_URL environment variable is not set")
 
+    # Lazy SDK import (runs in the secret prefetch thread during instance init)
+    sdk_import_start = time.perf_counter()
+    from azure.identity import DefaultAzureCredential
+    from azure.keyvault.secrets import SecretClient
+    secret_fetch_start = time.perf_counter()
+    _record_cold_start_timing("sdk-import", (secret_fetch_start - sdk_import_start) * 1000)
+
     try:
         azure_credential = DefaultAzureCredential()
         azure_kv_secret_client = SecretClient(vault_url=keyvault_url, credential=azure_credential)
         azure_kv_secret = azure_kv_secret_client.get_secret(AZFUNC_REQUEST_SECRET_NAME)
+        _record_cold_start_timing("secret-fetch", (time.perf_counter() - secret_fetch_start) * 1000)
         _cached_kv_request_secret = azure_kv_secret.value
         return _cached_kv_request_secret
     except Exception as e:
         raise RuntimeError(f"Failed to get secret from Azure Key Vault: {str(e)}")
 
 
+# ======================================================================
+# Request Pipeline (platform-neutral logic in request_engine_core)
+# ======================================================================
+# Validation, token verification, request headers, warmup and batch mode are shared;
+# this handler only adapts input/output and supplies the secret getter.
+_request_pipeline = _RequestPipeline(
+    get_request_secret=_get_kv_request_secret,
+    eo_header_name=EO_HEADER_NAME,
+    eo_header_value=EO_HEADER_VALUE,
+    fetch_engine=AZFUNC_FETCH_ENGINE,
+)
+
+
 # ======================================================================
 # Main Function (Azure Functions Handler)
 # ======================================================================
@@ -110,6 +141,7 @@ def requestengine_func(req: func.HttpRequest) -> func.HttpResponse:
     Args:
         req: Azure Functions HTTP request object
             - JSON Body: {targetUrl, tokenCalculatedByN8n, ...}
+            - JSON Body (batch mode): [{...}, {...}, ...] (2+ items, see BATCH_MAX_CONCURRENCY)
             - targetUrl: Target URL (required)
             - tokenCalculatedByN8n: Authentication token (required, SHA-256(url + secret))
             - headersForTargetUrl: Request headers for target URL (optional)
@@ -117,350 +149,58 @@ def requestengine_func(req: func.HttpRequest) -> func.HttpResponse:
             - httpRequestUUID: Request UUID (optional)
             - httpRequestRoundID: Request round ID (optional)
             - urltype: URL type (optional, "main_document", "asset", "exception")
+            - warmupStrategy: Warmup strategy (optional, "full" (default), "head", "range-first-bytes", "full-if-under-<N>-bytes")
 
     Returns:
         func.HttpResponse: JSON response
             - On success: HTTP status code 200, includes performance metrics
             - On error: Appropriate HTTP status code, includes error message
+            - Batch mode: HTTP status code 200, JSON array of flat results (one per item, same order)
 
     Note:
         - Authentication: Verify token parameter against Azure Key Vault secret
         - Retry: Automatic retry for temporary errors (up to 3 times)
-        - Memory protection: Skip analysis for content exceeding 5MB
+        - Memory protection: Body is streamed in chunks and discarded (constant memory, see BODY_DRAIN_*)
     """
-    start_time = time.time()
-
-    # Get Azure region for passing to _build_flat_result
-    azure_region = os.environ.get("REGION_NAME")
-
+    # Get Azure region for passing to the request pipeline (cached instance metadata)
+    azure_region = _get_instance_metadata()["region"]
+    execution_id = _get_execution_id()
+
+    # ==================================================================
+    # Receive request from n8n HttpRequest node (Request Engine node)
+    # ==================================================================
+    # JSON parse and data extraction
     try:
-        # ==================================================================
-        # Receive request from n8n HttpRequest node (Request Engine node)
-        # ==================================================================
-        # JSON parse and data extraction
-        try:
-            body_json = req.get_json() or {}
-        except Exception:
-            body_json = {}
-
-        # ==================================================================
-        # Normalize event format
-        # ==================================================================
-        # Note: Event normalization (array handling, type validation) is NOT in common/
-        # because error response format differs per platform:
-        # - AWS Lambda: return dict
-        # - Azure Functions: return func.HttpResponse(...)
-        # - GCP Cloud Run: return jsonify(...), status_code
-
-        # If body_json is array format, extract first element
-        if isinstance(body_json, list):
-            if len(body_json) == 0:
-                end_time = time.time()
-                duration_ms = (end_time - start_time) * 1000
-                execution_id = _get_execution_id()
-                result = _build_flat_result(
-                    status_code=400,
-                    status_message="EMPTY_EVENT_LIST",
-                    duration_ms=duration_ms,
-                    target_url="",
-                    http_request_number=None,
-                    req_headers={},
-                    res_headers={},
-                    request_start_timestamp=start_time,
-                    request_end_timestamp=end_time,
-                    execution_id=execution_id,
-                    from_area=azure_region,
-                )
-                return func.HttpResponse(
-                    json.dumps(result),
-                    status_code=400,
-                    mimetype="application/json",
-                )
-            body_json = body_json[0]
-
-        # Return error if body_json is not dictionary format
-        if not isinstance(body_json, dict):
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            execution_id = _get_execution_id()
-            result = _build_flat_result(
-                status_code=400,
-                status_message="INVALID_EVENT_TYPE",
-                duration_ms=duration_ms,
-                target_url="",
-                http_request_number=None,
-                req_headers={},
-                res_headers={},
-                request_start_timestamp=start_time,
-                request_end_timestamp=end_time,
-                execution_id=execution_id,
-                from_area=azure_region,
-            )
-            return func.HttpResponse(
-                json.dumps(result),
-                status_code=400,
-                mimetype="application/json",
-            )
-
-        data = body_json
-
-        # ==================================================================
-        # Extract request data
-        # ==================================================================
-        target_url = data.get("targetUrl") or ""
-        token_calculated_by_n8n = data.get("tokenCalculatedByN8n")
-        http_request_number = data.get("httpRequestNumber")
-        http_request_uuid = data.get("httpRequestUUID")
-        http_request_round_id = data.get("httpRequestRoundID")
-        urltype = data.get("urltype")
-        input_headers = data.get("headersForTargetUrl") if isinstance(data.get("headersForTargetUrl"), dict) else {}
-
-        # Get User-Agent header
-        ua_from_request_headers = input_headers.get("User-Agent") or ""
+        body_json = req.get_json() or {}
+    except Exception:
+        body_json = {}
+
+    # ==================================================================
+    # Return warmup result data to n8n HttpRequest node
+    # ==================================================================
+    # Event normalization (array / batch mode) and all error results are built by the pipeline
+    # Note: Response wrapping is NOT in common/ because response format differs per platform:
+    # - AWS Lambda: return dict
+    # - Azure Functions: return func.HttpResponse(...)
+    # - GCP Cloud Run: return jsonify(...), status_code
+    status_code, result = _request_pipeline.handle(body_json, from_area=azure_region, execution_id=execution_id)
+    return func.HttpResponse(
+        json.dumps(result),
+        status_code=status_code,
+        mimetype="application/json",
+    )
 
-        # ==================================================================
-        # URL Validation
-        # ==================================================================
-        if not target_url:
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            execution_id = _get_execution_id()
-            result = _build_flat_result(
-                status_code=400,
-                status_message="MISSING_URL",
-                duration_ms=duration_ms,
-                target_url="",
-                http_request_number=http_request_number,
-                http_request_uuid=http_request_uuid,
-                http_request_round_id=http_request_round_id,
-                req_headers={},
-                res_headers={},
-                request_start_timestamp=start_time,
-                request_end_timestamp=end_time,
-                execution_id=execution_id,
-                urltype=urltype,
-                from_area=azure_region,
-            )
-            return func.HttpResponse(
-                json.dumps(result),
-                status_code=400,
-                mimetype="application/json",
-            )
 
-        # ==================================================================
-        # Verify n8n-generated token against token generated from Azure Key Vault secret
-        # ==================================================================
-        try:
-            kv_request_secret = _get_kv_request_secret()
-            token_calculated_by_cloud_secret = _calc_token(target_url, kv_request_secret)
-            if token_calculated_by_n8n == token_calculated_by_cloud_secret:
-                # Token verification successful: continue processing
-                pass
-            else:
-                end_time = time.time()
-                duration_ms = (end_time - start_time) * 1000
-                execution_id = _get_execution_id()
-                result = _build_flat_result(
-                    status_code=401,
-                    status_message="INVALID_TOKEN",
-                    duration_ms=duration_ms,
-                    target_url=target_url,
-                    http_request_number=http_request_number,
-                    http_request_uuid=http_request_uuid,
-                    http_request_round_id=http_request_round_id,
-                    req_headers={},
-                    res_headers={},
-                    request_start_timestamp=start_time,
-                    request_end_timestamp=end_time,
-                    execution_id=execution_id,
-                    urltype=urltype,
-                    from_area=azure_region,
-                )
-                return func.HttpResponse(
-                    json.dumps(result),
-                    status_code=401,
-                    mimetype="application/json",
-                )
-        except Exception as e:
-            logging.error(f"Request Secret validation failed: {str(e)}")
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            execution_id = _get_execution_id()
-            result = _build_flat_result(
-                status_code=500,
-                status_message="SECRET_FETCH_FAILED",
-                duration_ms=duration_ms,
-                target_url=target_url,
-                http_request_number=http_request_number,
-                http_request_uuid=http_request_uuid,
-                http_request_round_id=http_request_round_id,
-                req_headers={},
-                res_headers={},
-                request_start_timestamp=start_time,
-                request_end_timestamp=end_time,
-                execution_id=execution_id,
-                urltype=urltype,
-                from_area=azure_region,
-            )
-            return func.HttpResponse(
-                json.dumps(result),
-                status_code=500,
-                mimetype="application/json",
-            )
-
-        # ==================================================================
-        # Prepare request headers
-        # ==================================================================
-        req_headers: Dict[str, str] = dict(input_headers)
-        # Set User-Agent if specified (always included from n8n workflow node 175)
-        if ua_from_request_headers:
-            req_headers.setdefault("User-Agent", ua_from_request_headers)
-        # Add EO identification header (for Request Engine identification)
-        req_headers[EO_HEADER_NAME] = EO_HEADER_VALUE
-
-        # ==================================================================
-        # Execute HTTP request (with retry)
-        # ==================================================================
-        # initial_response_ms (TTFB) measurement
-        # stream=True makes requests.get() return at headers-received (before body download)
-        http_request_start_time = time.time()
-        try:
-            # ==================================================================
-            # Send HTTP request to Warmup Target URL
-            # ==================================================================
-            response, retry_info = _execute_http_request_with_retry(
-                target_url,
-                req_headers,
-            )
-
-            with response:
-                # ==================================================================
-                # TTFB measurement (stream=True: headers already received, body not yet downloaded)
-                # ==================================================================
-                ttfb_end = time.time()
-                initial_response_ms = (ttfb_end - http_request_start_time) * 1000
-
-                # ==================================================================
-                # Get HTTP protocol version (connection still open with stream=True)
-                # ==================================================================
-                http_protocol_version = _get_http_protocol_version(response)
-
-                # ==================================================================
-                # Get TLS version (connection still open with stream=True)
-                # ==================================================================
-                tls_version = _get_tls_version(response, target_url)
-
-                # ==================================================================
-                # Get response headers
-                # ==================================================================
-                res_headers = dict(response.headers)
-
-                # ==================================================================
-                # Get redirect count
-                # ==================================================================
-                redirect_count = len(response.history) if hasattr(response, 'history') else 0
-
-                # ==================================================================
-                # Download body (cache warmup) and measure actual content length
-                # ==================================================================
-                body_content = response.content
-                content_length = len(body_content)
-
-                # ==================================================================
-                # Build result
-                # ==================================================================
-                end_time = time.time()
-                duration_ms = (end_time - start_time) * 1000
-                execution_id = _get_execution_id()
-
-                # ==================================================================
-                # Return warmup result data to n8n HttpRequest node
-                # ==================================================================
-                result = _build_flat_result(
-                    status_code=response.status_code,
-                    status_message=response.reason or "OK",
-                    duration_ms=duration_ms,
-                    initial_response_ms=initial_response_ms,
-                    content_length_bytes=content_length,
-                    target_url=target_url,
-                    http_request_number=http_request_number,
-                    http_request_uuid=http_request_uuid,
-                    http_request_round_id=http_request_round_id,
-                    req_headers=req_headers,
-                    res_headers=res_headers,
-                    tls_version=tls_version,
-                    http_protocol_version=http_protocol_version,
-                    request_start_timestamp=http_request_start_time,
-                    request_end_timestamp=end_time,
-                    execution_id=execution_id,
-                    redirect_count=redirect_count,
-                    urltype=urltype,
-                    retry_info=retry_info,
-                    from_area=azure_region,
-                )
-                return func.HttpResponse(
-                    json.dumps(result),
-                    status_code=200,
-                    mimetype="application/json",
-                )
-
-        # ==================================================================
-        # Error Handling
-        # ==================================================================
-        except requests.exceptions.RequestException as e:
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            execution_id = _get_execution_id()
-            result = _build_flat_result(
-                status_code=500,
-                status_message=f"Request failed: {str(e)}",
-                duration_ms=duration_ms,
-                target_url=target_url,
-                http_request_number=http_request_number,
-                http_request_uuid=http_request_uuid,
-                http_request_round_id=http_request_round_id,
-                req_headers=req_headers,
-                res_headers={},
-                request_start_timestamp=http_request_start_time if "http_request_start_time" in locals() else None,
-                request_end_timestamp=end_time,
-                execution_id=execution_id,
-                redirect_count=0,
-                urltype=urltype if "urltype" in locals() else None,
-                retry_info=retry_info if "retry_info" in locals() else None,
-                from_area=azure_region,
-            )
-            return func.HttpResponse(
-                json.dumps(result),
-                status_code=500,
-                mimetype="application/json",
-            )
-
-    except Exception as e:
-        logging.error(f"Unexpected error: {str(e)}")
-        end_time = time.time()
-        duration_ms = (end_time - start_time) * 1000
-        execution_id = _get_execution_id()
-        error_target_url = target_url if "target_url" in locals() else ""
-        result = _build_flat_result(
-            status_code=500,
-            status_message=f"Internal error: {str(e)}",
-            duration_ms=duration_ms,
-            target_url=error_target_url,
-            http_request_number=http_request_number if "http_request_number" in locals() else None,
-            http_request_uuid=http_request_uuid if "http_request_uuid" in locals() else None,
-            http_request_round_id=http_request_round_id if "http_request_round_id" in locals() else None,
-            req_headers=input_headers if "input_headers" in locals() else {},
-            res_headers={},
-            request_start_timestamp=start_time if "start_time" in locals() else None,
-            request_end_timestamp=end_time,
-            execution_id=execution_id,
-            redirect_count=0,
-            urltype=urltype if "urltype" in locals() else None,
-            retry_info=None,
-            from_area=azure_region,
-        )
-        return func.HttpResponse(
-            json.dumps(result),
-            status_code=500,
-            mimetype="application/json",
-        )
+# ======================================================================
+# Cold Start (instance init)
+# ======================================================================
+# Record import/init time and start fetching the request secret in the background,
+# so the first request does not pay for the SDK import and Key Vault round trip.
+# Instance metadata: Function App environment variables (no metadata endpoint to query).
+_mark_cold_start_init_done()
+_start_secret_prefetch(_get_kv_request_secret)
+_init_instance_metadata({
+    "region": os.environ.get("REGION_NAME"),
+    "instance_id": os.environ.get("WEBSITE_INSTANCE_ID"),
+    "project_id": None,
+})
@@ -21,7 +21,11 @@ EXTENSION_PREFIX = "eo.security."
 # ======================================================================
 # Analyze Security Headers
 # ======================================================================
-def _analyze_security_headers(res_headers: Dict[str, str], target_url: str) -> Dict[str, Any]:
+def _analyze_security_headers(
+    res_headers: Dict[str, str],
+    target_url: str,
+    headers_lower: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
     """
     Analyze security headers and return metrics
     Included in Core Web Vitals / PageSpeed Insights / Security metrics
@@ -29,7 +33,8 @@ def _analyze_security_headers(res_headers: Dict[str, str], target_url: str) -> D
     security = {}
     security["is_https"] = target_url.startswith("https://")
 
-    headers_lower = {k.lower(): v for k, v in res_headers.items()}
+    if headers_lower is None:
+        headers_lower = {k.lower(): v for k, v in res_headers.items()}
 
     # Security header definitions (header name -> key name mapping)
     security_headers = {
@@ -64,6 +69,7 @@ def build_output(context: Dict[str, Any]) -> Dict[str, Any]:
     Args:
         context: Dictionary containing:
             - res_headers: Response headers
+            - res_headers_lower: Response headers with lowercased names (shared by core, optional)
             - target_url: Target URL
 
     Returns:
@@ -73,7 +79,7 @@ def build_output(context: Dict[str, Any]) -> Dict[str, Any]:
     target_url = context.get("target_url", "")
 
     # Use _analyze_security_headers function
-    security_metrics = _analyze_security_headers(res_headers, target_url)
+    security_metrics = _analyze_security_headers(res_headers, target_url, context.get("res_headers_lower"))
 
     # Return sorted output
     return {k: security_metrics[k] for k in sorted(security_metrics.keys())}
@@ -29,71 +29,331 @@ RETRY_INITIAL_DELAY = 0.5  # Initial retry delay (seconds)
 # 1st retry: 0.5s wait
 
 RETRY_BACKOFF_MULTIPLIER = 2.0  # Exponential backoff multiplier
-# Retry interval calculation: delay = RETRY_INITIAL_DELAY * (RETRY_BACKOFF_MULTIPLIER ** attempt)
-# Example: 1st: 0.5s, 2nd: 1.0s, 3rd: 2.0s
+# Retry interval calculation: backoff = RETRY_INITIAL_DELAY * (RETRY_BACKOFF_MULTIPLIER ** attempt)
+# Example: 1st: 0.5s, 2nd: 1.0s, 3rd: 2.0s (upper bound before jitter)
+
+RETRY_JITTER_FULL = "full"  # delay = random(0, backoff) (parallel functions do not retry in lockstep)
+RETRY_JITTER_EQUAL = "equal"  # delay = backoff / 2 + random(0, backoff / 2)
+RETRY_JITTER_NONE = "none"  # delay = backoff (deterministic)
+RETRY_JITTER = RETRY_JITTER_FULL
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}  # HTTP status codes eligible for retry
+# 5xx server errors and 429 (rate limited) are likely temporary issues, so they are retry targets
+# Other 4xx client errors are not retry targets (retrying won't resolve them)
+
+RETRY_AFTER_STATUS_CODES = {429, 503}  # Retry-After header is honoured for these status codes
+RETRY_AFTER_MAX_DELAY = 5.0  # Longest Retry-After we sleep for (seconds)
+# A longer Retry-After stops retrying (the response is returned) instead of sleeping on billed time
+
+RETRY_DEADLINE = HTTP_REQUEST_TIMEOUT * 1.5  # Total time budget for all attempts + backoff sleeps (seconds)
+# A retry is only started if its sleep + RETRY_MIN_ATTEMPT_TIMEOUT fits in the remaining budget,
+# and each retry attempt's timeout is clipped to the remaining budget
+RETRY_MIN_ATTEMPT_TIMEOUT = 1.0  # Minimum timeout worth spending on a retry attempt (seconds)
+
+# Per-host retry budget (shared by all requests of the warm instance)
+# Within each RETRY_BUDGET_WINDOW, retries to one host are allowed while
+# retries < RETRY_BUDGET_MIN_RETRIES + RETRY_BUDGET_RATIO * requests.
+# A struggling origin gets a bounded amount of extra load instead of a retry storm.
+RETRY_BUDGET_WINDOW = 10.0  # Budget window (seconds)
+RETRY_BUDGET_RATIO = 0.2  # Retries allowed per request sent to the host
+RETRY_BUDGET_MIN_RETRIES = 3  # Retries always allowed per window (low traffic hosts)
+
+RETRY_STOP_BUDGET_EXHAUSTED = "retry-budget-exhausted"  # eo.meta.retry-stop-reason values
+RETRY_STOP_DEADLINE = "retry-deadline"
+RETRY_STOP_RETRY_AFTER_TOO_LONG = "retry-after-too-long"
 
-RETRYABLE_STATUS_CODES = {500, 502, 503, 504}  # HTTP status codes eligible for retry
-# 5xx server errors are likely temporary issues, so they are retry targets
-# 4xx client errors are not retry targets (retrying won't resolve them)
+# ======================================================================
+# Circuit Breaker Configuration
+# ======================================================================
+# Per-host circuit breaker shared by all requests of the warm instance (across invocations).
+# closed -> open: CIRCUIT_FAILURE_THRESHOLD consecutive failed requests (after retries)
+# open: requests fail fast (CIRCUIT_OPEN, no request sent) for CIRCUIT_OPEN_DURATION
+# half-open: one probe request is sent; success -> closed, failure -> open again
+CIRCUIT_BREAKER_ENABLED = True
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failed requests to one host before the circuit opens
+CIRCUIT_OPEN_DURATION = 30.0  # Seconds the circuit stays open before a half-open probe
+CIRCUIT_FAILURE_STATUS_CODES = {500, 502, 503, 504}  # Final status codes counted as failure
+# Request errors (connection / timeout after retries) are always failures.
+# 429 is not counted: the origin is reachable and already answers with Retry-After
+
+CIRCUIT_STATE_CLOSED = "closed"  # eo.meta.circuit-state values
+CIRCUIT_STATE_OPEN = "open"
+CIRCUIT_STATE_HALF_OPEN = "half-open"
+
+# ======================================================================
+# Per-Host Limiter Configuration (politeness)
+# ======================================================================
+# Each warmup request takes one slot of its target host before it is sent
+# (held through retries and body download):
+# - rate / burst: token bucket (requests per second, bucket size)
+# - max_in_flight: concurrent requests to the host (per instance)
+# Requests wait for a slot instead of relying on fixed sleeps between items in n8n.
+# Limits are per instance: parallel function instances each have their own limiter.
+# Only origins listed in HOST_LIMITS / EO_HOST_LIMITS are limited by default: a limit caps the
+# async engine (ASYNC_MAX_CONCURRENCY) and HTTP/2 multiplexing to max_in_flight / rate per host,
+# so set it per origin that needs politeness rather than for every host.
+HOST_LIMIT_DEFAULT: Optional[Dict[str, Any]] = None  # Limits of hosts not in HOST_LIMITS, None = unlimited
+# Example: {"rate": 10.0, "burst": 10, "max_in_flight": 6}
+HOST_LIMITS: Dict[str, Dict[str, Any]] = {}  # Per-origin limits: host -> {"rate", "burst", "max_in_flight"}
+# Example: {"www.example.com": {"rate": 2.0, "burst": 2, "max_in_flight": 1}}
+# Missing keys fall back to HOST_LIMIT_DEFAULT (None = unlimited per key)
+HOST_LIMITS_ENV = "EO_HOST_LIMITS"  # Environment variable with per-origin overrides (JSON, same format, merged over HOST_LIMITS)
+HOST_LIMIT_MAX_WAIT = HTTP_REQUEST_TIMEOUT  # Longest wait for a slot (seconds), then HOST_LIMIT_TIMEOUT (no request sent)
+HOST_LIMIT_POLL_INTERVAL = 0.02  # Async engine: re-check interval while the host has no free in-flight slot (seconds)
+
+# ======================================================================
+# Batch Configuration
+# ======================================================================
+BATCH_MAX_CONCURRENCY = 8  # Maximum concurrent warmup requests per invocation (batch mode)
+# Batch mode: event / JSON body is an array with 2 or more items
+# Each item is processed independently and returns its own flat result (array response)
+# Single-element array keeps the legacy behavior (single flat result object)
+
+# ======================================================================
+# Fetch Engine Configuration
+# ======================================================================
+FETCH_ENGINE_SYNC = "sync"  # requests + thread pool (default, no extra dependency)
+FETCH_ENGINE_ASYNC = "async"  # aiohttp on a shared asyncio event loop (requires aiohttp)
+# Platform handlers choose the engine for single requests and batch mode (falls back to sync if
+# aiohttp is not installed)
+# Async engine: backoff sleeps do not hold a thread, so many warmups stay in flight on one loop
+# Known limitation: platform handlers are synchronous, so the invocation thread blocks on
+# _run_on_async_loop() until its warmup(s) finish; concurrent invocations of an instance share
+# the loop and the aiohttp session, but each still holds its own worker thread while waiting
+
+ASYNC_MAX_CONCURRENCY = 100  # Maximum in-flight connections on the async event loop (per instance)
+
+FETCH_ENGINE_HTTP2 = "http2"  # httpx with HTTP/2 + thread pool (requires httpx[http2])
+# Used for single requests and batch mode (falls back to sync if httpx / h2 is not installed)
+# HTTPS origins that offer h2 in ALPN are fetched over HTTP/2; other origins use HTTP/1.1.
+# Batch items to the same origin are multiplexed as streams on one connection (one handshake).
+HTTP2_MAX_CONNECTIONS = 100  # Maximum connections kept by the HTTP/2 client (all origins)
+
+# ======================================================================
+# HTTP Session Pool Configuration
+# ======================================================================
+# A module-level requests.Session is shared across requests and warm invocations
+# (Lambda / Functions / Cloud Run instance reuse), so keep-alive connections to the
+# same CDN edge skip DNS lookup, TCP connection and TLS handshake.
+HTTP_POOL_CONNECTIONS = 10  # Number of per-host connection pools kept by the session
+HTTP_POOL_MAXSIZE = 10  # Maximum keep-alive connections kept per host
+# Should be >= BATCH_MAX_CONCURRENCY so batch mode does not discard connections
+
+HTTP_SESSION_IDLE_TIMEOUT = 55  # Idle eviction (seconds)
+# If the session has not been used for this long, all pooled connections are closed
+# and a new session is created. Kept below the common 60s server keep-alive timeout
+# to avoid reusing connections the server side has already closed.
+
+# ======================================================================
+# DNS Cache / TLS Session Cache Configuration
+# ======================================================================
+# New connections (first request to a host, after idle eviction, per batch thread)
+# reuse the resolved addresses and the TLS session of earlier warmups of the instance,
+# so only the first connection per host pays full DNS resolution and a full TLS handshake.
+DNS_CACHE_TTL = 30.0  # Seconds a resolved address list is reused (0 = disabled)
+# getaddrinfo does not expose the record TTL, so a fixed TTL is used.
+# Kept well below common CDN DNS TTLs (60s+) so edge re-mapping is picked up quickly;
+# cached addresses that all fail to connect are dropped at once (the retry resolves again).
+DNS_CACHE_MAX_ENTRIES = 256  # Expired entries (then the oldest) are dropped when full
+
+TLS_SESSION_CACHE_ENABLED = True  # Offer the last TLS session of the host on new connections (resumption)
+TLS_SESSION_CACHE_TTL = 3600.0  # Upper bound of session age (seconds); the server's ticket lifetime also applies
+TLS_SESSION_CACHE_MAX_ENTRIES = 256  # Per fetch engine (the oldest is dropped when full)
+
+# ======================================================================
+# Body Drain Configuration
+# ======================================================================
+# The response body is read in fixed-size chunks and only counted (not kept),
+# so function memory stays flat regardless of the asset size (video, PDF, etc.)
+BODY_DRAIN_CHUNK_SIZE = 64 * 1024  # Chunk size for streaming body drain (bytes)
+
+BODY_DRAIN_MAX_BYTES = None  # Stop reading after this many bytes (None = read entire body)
+# Example: 5 * 1024 * 1024 stops at 5MB (eo.meta.body-truncated = true)
+# Note: Aborting the download may keep some CDNs from caching the object, so the default reads everything
+
+BODY_DRAIN_HASH_ALGORITHM = None  # Hash body while streaming (None = disabled, e.g. "sha256")
+# Output: eo.meta.content-hash = "<algorithm>:<hexdigest>" (only when the whole body was read)
+
+# ======================================================================
+# Cold Start Configuration
+# ======================================================================
+COLD_START_SECRET_PREFETCH = True  # Fetch the request secret in a background thread during instance init
+# Platform SDKs (boto3 / azure.identity / google.cloud.secretmanager) are imported lazily by the
+# secret getters, so with prefetch the SDK import and client construction overlap with the rest of init.
+# The first warmup result of each instance (fetched, failed or skipped) reports the breakdown
+# as eo.meta.cold-start-*-ms
+
+COLD_START_SECRET_WAIT_TIMEOUT = HTTP_REQUEST_TIMEOUT  # Max wait (seconds) for the prefetch before fetching synchronously
+
+
+# ======================================================================
+# Instance Metadata Configuration
+# ======================================================================
+# Instance metadata (region, instance id, project) is resolved once per instance and cached.
+# Platform handlers register environment-variable fallbacks and an optional fetcher
+# (e.g. GCP metadata server). The fetcher always runs in a background thread,
+# so the request path never waits for it.
+INSTANCE_METADATA_REFRESH_INTERVAL = 3600  # Background refresh interval after a successful fetch (seconds)
+INSTANCE_METADATA_RETRY_INTERVAL = 30  # Background retry interval after a failed fetch (seconds)
+INSTANCE_METADATA_FETCH_TIMEOUT = 2  # Timeout for each metadata request in the fetcher (seconds)
+
+
+# ======================================================================
+# Warmup Strategy Configuration
+# ======================================================================
+# Per-request option "warmupStrategy" (request contract). For large assets the CDN edge
+# usually only needs the origin fetch to be triggered, not every byte downloaded by us.
+WARMUP_STRATEGY_FULL = "full"  # GET and download the entire body (default)
+WARMUP_STRATEGY_HEAD = "head"  # HEAD request (no body)
+WARMUP_STRATEGY_RANGE_FIRST_BYTES = "range-first-bytes"  # GET with Range: bytes=0-(WARMUP_RANGE_FIRST_BYTES - 1)
+WARMUP_STRATEGY_FULL_IF_UNDER_PREFIX = "full-if-under-"  # "full-if-under-<N>-bytes"
+# full-if-under-<N>-bytes: download the body only if Content-Length <= N
+# (no Content-Length: stop reading after N bytes)
+
+DEFAULT_WARMUP_STRATEGY = WARMUP_STRATEGY_FULL
+
+WARMUP_RANGE_FIRST_BYTES = 1024  # Bytes requested by range-first-bytes
+# Also the read limit when the server ignores the Range header (200 instead of 206)
 
 
 # ======================================================================
 # CDN Detection Configuration
 # ======================================================================
-# Each entry: (detection_header, cache_status_header)
-# detection_header: Header that identifies the CDN
-# cache_status_header: Header that indicates cache HIT/MISS for that CDN
-_CDN_DETECTION_CONFIG = [
-    # Cloudflare
-    ("cf-ray", "cf-cache-status"),
-    # AWS CloudFront
-    ("x-amz-cf-id", "x-cache"),
-    # NitroCDN (NitroPack)
-    ("x-nitro-cache", "x-nitro-cache"),
-    ("x-nitro-cache-from", "x-nitro-cache"),
-    ("x-nitro-rev", "x-nitro-cache"),
-    # RabbitLoader
-    ("x-rl-cache", "x-rl-cache"),
-    ("x-rl-mode", "x-rl-cache"),
-    ("x-rl-modified", "x-rl-cache"),
-    ("x-rl-rule", "x-rl-cache"),
-    # Azure Front Door
-    ("x-azure-ref", "x-cache"),
-    ("x-azure-fdid", "x-cache"),
-    ("x-azure-clientip", "x-cache"),
-    ("x-azure-socketip", "x-cache"),
-    ("x-azure-requestchain", "x-cache"),
-    # Akamai
-    ("x-akamai-request-id", "x-cache"),
-    ("x-cache-remote", "x-cache"),
-    ("x-true-cache-key", "x-cache"),
-    ("x-cache-key", "x-cache"),
-    ("x-serial", "x-cache"),
-    ("x-akamai-edgescape", "x-cache"),
-    ("x-check-cacheable", "x-cache"),
-    # Vercel
-    ("x-vercel-cache", "x-vercel-cache"),
-    ("x-vercel-id", "x-vercel-cache"),
-    # Sakura Internet Web Accelerator (さくらウェブアクセラレータ)
-    ("x-webaccel-origin-status", "x-cache"),
-    # Bunny CDN
-    ("cdn-pullzone", "cdn-cache"),
-    ("cdn-uid", "cdn-cache"),
-    ("cdn-requestid", "cdn-cache"),
-    # Alibaba Cloud CDN
-    ("eagleid", "x-cache"),
-    ("x-swift-savetime", "x-cache"),
-    ("x-swift-cachetime", "x-cache"),
-    # CDNetworks
-    ("x-cnc-request-id", "x-cache"),
-    # KeyCDN
-    ("x-pull", "x-cache"),
-    ("x-edge-location", "x-cache"),
-    # General / Fastly
-    ("x-cache", "x-cache"),
-    ("x-served-by", "x-cache"),
-    ("x-fastly-request-id", "x-cache"),
-]
+# CDN rules are declared in a versioned rule pack (JSON) deployed next to the merged module:
+# detection headers / Server-Via signatures, priorities, cache status headers,
+# cache status normalization (HIT / MISS / EXPIRED / BYPASS ...) and edge POP extraction.
+# The pack is loaded and compiled once at cold start (_CDN_RULE_PACK).
+# To add a CDN, edit the rule pack only (no code change).
+CDN_RULE_PACK_FILE = "cdn_rule_pack.json"  # Rule pack file name (same directory as this module)
+CDN_RULE_PACK_PATH_ENV = "EO_CDN_RULE_PACK_PATH"  # Environment variable to override the rule pack path
+
+CDN_CACHE_STATUS_UNKNOWN = "UNKNOWN"  # eo.meta.cdn-cache-status-normalized for values not in the rule pack
+
+
+# ======================================================================
+# Eviction Detection Configuration
+# ======================================================================
+# Python port of the n8n "355 Eviction Detector" (eo.re.eviction-alert: cf-cache-status + age < 60)
+# for every CDN in the rule pack. Uses the normalized cache status, the shared cache TTL
+# (CDN-Cache-Control / Surrogate-Control / Cache-Control s-maxage, max-age) and the previous
+# observation of the URL at the same edge POP in this instance.
+# Output: eo.meta.eviction-alert (EVICTION_ALERT_*), eo.meta.cdn-ttl (seconds)
+# Same rules in bulk over RequestResults: classify_evictions (local/py/results/src/analytics.py)
+EVICTION_DETECTION_ENABLED = True
+EVICTION_FRESH_AGE = 60.0  # HIT younger than this (seconds) is FRESH (n8n: age < 60)
+EVICTION_FRESH_TTL_RATIO = 0.1  # With a known TTL the threshold is min(EVICTION_FRESH_AGE, TTL * ratio)
+EVICTION_AGE_TOLERANCE = 2.0  # Age is whole seconds and edge server clocks differ slightly (seconds)
+EVICTION_HISTORY_MAX_ENTRIES = 4096  # (URL, POP) observations kept across warm invocations (the oldest is dropped)
+EVICTION_TTL_HEADERS = ("cdn-cache-control", "surrogate-control", "cache-control")  # Highest precedence first
+
+EVICTION_ALERT_EVICTED = "EVICTED"  # MISS / EXPIRED before the cached copy reached its TTL (cache lost)
+EVICTION_ALERT_EXPIRED = "EXPIRED"  # MISS / EXPIRED after the previous copy reached its TTL (needs history)
+EVICTION_ALERT_FRESH = "FRESH"  # HIT on a just created copy, or on a copy younger than the one seen before
+EVICTION_ALERT_SAFE = "SAFE"  # HIT on an older copy (cache active)
+EVICTION_ALERT_IGNORE = "IGNORE"  # DYNAMIC / BYPASS (not cached by design)
+
+
+# ======================================================================
+# Revalidation Configuration
+# ======================================================================
+# Validators (ETag / Last-Modified) and the content hash of each URL are kept per instance
+# (across warm invocations). Later requests of the URL are sent as conditional GETs
+# (If-None-Match / If-Modified-Since): an unchanged object is answered with 304 and no body,
+# while the CDN edge still serves (HIT) or fetches (MISS) the object as for a full GET.
+# Applies to GET strategies that download the whole body (full / full-if-under-<N>-bytes).
+# Conditional headers already in headersForTargetUrl are sent as is (n8n can pass stored validators).
+# Output: eo.meta.revalidated (true = 304, false = full response to a conditional request),
+#         eo.meta.content-changed (compared with the previous response of the URL in this instance)
+REVALIDATION_ENABLED = False
+REVALIDATION_STATE_MAX_ENTRIES = 4096  # URLs kept across warm invocations (the oldest is dropped)
+
+REVALIDATION_SKIP_IMMUTABLE = True  # Skip URLs whose last response was a HIT with Cache-Control: immutable
+REVALIDATION_SKIP_MAX_IDLE = 3600.0  # ... only within this many seconds of that HIT (and within its TTL)
+# Skipped items send no request: headers.general.status-code = null (no HTTP status),
+# status-message SKIPPED_IMMUTABLE, eo.meta.revalidation-skipped = true,
+# eo.meta.warmup-strategy-applied = "skipped"
+
+
+# ======================================================================
+# Global Variables (HTTP Session Pool)
+# ======================================================================
+_http_session: Optional[requests.Session] = None
+_http_session_last_used: float = 0.0
+_http_session_lock = threading.Lock()
+
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_loop_lock = threading.Lock()
+_async_http_session: Optional[Any] = None  # aiohttp.ClientSession (created on the async loop)
+
+_http2_client: Optional[Any] = None  # httpx.Client(http2=True)
+_http2_client_last_used: float = 0.0
+_http2_client_lock = threading.Lock()
+
+
+# ======================================================================
+# Global Variables (DNS Cache / TLS Session Cache)
+# ======================================================================
+_dns_cache: Dict[Tuple[str, int], Tuple[List[str], float]] = {}  # (host, port) -> (addresses, expires_at)
+_dns_cache_lock = threading.Lock()
+
+_tls_session_contexts: Dict[str, ssl.SSLContext] = {}  # fetch engine -> shared client context
+_tls_session_lock = threading.Lock()
+
+
+# ======================================================================
+# Global Variables (Eviction Detection)
+# ======================================================================
+# (URL, edge POP) -> (observed_at, age of the copy then or None, TTL or None)
+_eviction_history: Dict[Tuple[str, str], Tuple[float, Optional[float], Optional[float]]] = {}
+_eviction_history_lock = threading.Lock()
+
+
+# ======================================================================
+# Global Variables (Revalidation)
+# ======================================================================
+# URL -> {"etag", "last_modified", "content_hash", "immutable", "cache_status", "age", "ttl", "observed_at"}
+_revalidation_state: Dict[str, Dict[str, Any]] = {}
+_revalidation_state_lock = threading.Lock()
+
+
+# ======================================================================
+# Global Variables (Retry Budget)
+# ======================================================================
+_retry_budgets: Dict[str, Dict[str, float]] = {}  # host -> {"window_start", "requests", "retries"}
+_retry_budget_lock = threading.Lock()
+
+
+# ======================================================================
+# Global Variables (Circuit Breaker)
+# ======================================================================
+_circuit_breakers: Dict[str, Dict[str, Any]] = {}  # host -> {"state", "failures", "opened_at", "probe_started_at"}
+_circuit_breaker_lock = threading.Lock()
+
+
+# ======================================================================
+# Global Variables (Per-Host Limiter)
+# ======================================================================
+_host_limiters: Dict[str, Dict[str, Any]] = {}  # host -> {"limits", "tokens", "updated_at", "in_flight"}
+_host_limiter_cond = threading.Condition()  # Notified when a slot is released (sync engine waiters)
+
+
+# ======================================================================
+# Global Variables (Cold Start)
+# ======================================================================
+_cold_start_timings: Dict[str, float] = {}
+_cold_start_reported = False
+_cold_start_lock = threading.Lock()
+_secret_prefetch_thread: Optional[threading.Thread] = None
+
+
+# ======================================================================
+# Global Variables (Instance Metadata)
+# ======================================================================
+_instance_metadata: Dict[str, Optional[str]] = {"region": None, "instance_id": None, "project_id": None}
+_instance_metadata_fetcher: Optional[Callable[[], Dict[str, Optional[str]]]] = None
+_instance_metadata_next_refresh: float = 0.0
+_instance_metadata_refreshing = False
+_instance_metadata_lock = threading.Lock()
 
 
 # ======================================================================
@@ -206,6 +466,375 @@ def _calc_token(url: str, secret: str) -> str:
     return hashlib.sha256(f"{url}{secret}".encode()).hexdigest()
 
 
+# ======================================================================
+# DNS Cache / TLS Session Cache (kept across warm invocations)
+# ======================================================================
+# Sync engine: addresses are cached by _resolve_host_addresses (instrumented connections).
+# Async engine: aiohttp's own resolver cache (TCPConnector ttl_dns_cache=DNS_CACHE_TTL).
+# HTTP/2 engine: httpx resolves inside the TCP connect (no cache; one connection per origin).
+# TLS sessions: each fetch engine has one shared client SSLContext (_get_tls_session_context)
+# that remembers the last session per server name and offers it on the next handshake.
+# The CA bundle is loaded once per context instead of once per new connection.
+def _resolve_host_addresses(host: str, port: int) -> Tuple[List[str], bool]:
+    """
+    Resolve host to IP addresses (in getaddrinfo order, duplicates removed), cached for DNS_CACHE_TTL
+
+    Returns:
+        Tuple of (addresses, dns_cache_hit)
+    """
+    key = (host, port)
+    now = time.monotonic()
+    with _dns_cache_lock:
+        cached = _dns_cache.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0], True
+
+    family = urllib3.util.connection.allowed_gai_family()
+    addresses: List[str] = []
+    for _, _, _, _, sockaddr in socket.getaddrinfo(host.strip("[]"), port, family, socket.SOCK_STREAM):
+        if sockaddr[0] not in addresses:
+            addresses.append(sockaddr[0])
+
+    if DNS_CACHE_TTL > 0 and addresses:
+        with _dns_cache_lock:
+            if key not in _dns_cache and len(_dns_cache) >= DNS_CACHE_MAX_ENTRIES:
+                for expired_key in [k for k, (_, expires_at) in _dns_cache.items() if expires_at <= now]:
+                    del _dns_cache[expired_key]
+                if len(_dns_cache) >= DNS_CACHE_MAX_ENTRIES:
+                    del _dns_cache[next(iter(_dns_cache))]
+            _dns_cache[key] = (addresses, now + DNS_CACHE_TTL)
+    return addresses, False
+
+
+def _evict_dns_cache(host: str, port: int) -> None:
+    """
+    Drop cached addresses of host (none of them accepted a connection)
+    """
+    with _dns_cache_lock:
+        _dns_cache.pop((host, port), None)
+
+
+class _TLSSessionContext(ssl.SSLContext):
+    """
+    Client SSLContext that offers the cached TLS session of the server name on every new connection
+
+    Covers SSLSocket (wrap_socket: requests / urllib3, httpx) and SSLObject (wrap_bio: aiohttp / asyncio).
+    Sessions are stored by _store_tls_session after the response headers are received
+    (TLS 1.3 session tickets arrive after the handshake). A session can only be resumed
+    with the context that created it, so every engine keeps its own context and cache.
+    """
+
+    def _get_cached_session(self, server_hostname: Optional[str]) -> Optional[ssl.SSLSession]:
+        if not TLS_SESSION_CACHE_ENABLED or not server_hostname:
+            return None
+        sessions = getattr(self, "_eo_sessions", None)
+        if not sessions:
+            return None
+        with _tls_session_lock:
+            session = sessions.get(server_hostname)
+            if session is None:
+                return None
+            if session.time + min(session.timeout, TLS_SESSION_CACHE_TTL) <= time.time():
+                del sessions[server_hostname]
+                return None
+            return session
+
+    def wrap_socket(self, sock: socket.socket, server_side: bool = False, do_handshake_on_connect: bool = True,
+                    suppress_ragged_eofs: bool = True, server_hostname: Optional[str] = None,
+                    session: Optional[ssl.SSLSession] = None) -> ssl.SSLSocket:
+        if session is None and not server_side:
+            session = self._get_cached_session(server_hostname)
+        return super().wrap_socket(
+            sock, server_side=server_side, do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs, server_hostname=server_hostname, session=session,
+        )
+
+    def wrap_bio(self, incoming: ssl.MemoryBIO, outgoing: ssl.MemoryBIO, server_side: bool = False,
+                 server_hostname: Optional[str] = None, session: Optional[ssl.SSLSession] = None) -> ssl.SSLObject:
+        if session is None and not server_side:
+            session = self._get_cached_session(server_hostname)
+        return super().wrap_bio(
+            incoming, outgoing, server_side=server_side, server_hostname=server_hostname, session=session,
+        )
+
+
+def _get_default_ca_bundle() -> str:
+    """
+    Get the CA bundle requests verifies with (REQUESTS_CA_BUNDLE / CURL_CA_BUNDLE, else certifi)
+    """
+    return os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE") or requests.utils.DEFAULT_CA_BUNDLE_PATH
+
+
+def _create_tls_session_context() -> ssl.SSLContext:
+    """
+    Create client SSLContext with session tickets enabled (same verification as requests)
+
+    urllib3's default context sets OP_NO_TICKET, so TLS 1.2 servers would never issue a resumable ticket.
+    """
+    context = _TLSSessionContext(ssl.PROTOCOL_TLS_CLIENT)  # CERT_REQUIRED + check_hostname
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.options |= ssl.OP_NO_COMPRESSION
+    ca_bundle = _get_default_ca_bundle()
+    if os.path.isdir(ca_bundle):
+        context.load_verify_locations(capath=ca_bundle)
+    else:
+        context.load_verify_locations(cafile=ca_bundle)
+    context._eo_ca_bundle = ca_bundle
+    context._eo_sessions = {}
+    return context
+
+
+def _get_tls_session_context(fetch_engine: str) -> ssl.SSLContext:
+    """
+    Get module-level client SSLContext of fetch_engine (created on first call, kept while the instance stays warm)
+    """
+    with _tls_session_lock:
+        context = _tls_session_contexts.get(fetch_engine)
+        if context is None:
+            context = _tls_session_contexts[fetch_engine] = _create_tls_session_context()
+        return context
+
+
+def _store_tls_session(ssl_object: Any) -> None:
+    """
+    Remember the TLS session of an established connection (ssl.SSLSocket / ssl.SSLObject) for its server name
+    """
+    sessions = getattr(ssl_object.context, "_eo_sessions", None)
+    server_hostname = ssl_object.server_hostname
+    if sessions is None or not server_hostname or not TLS_SESSION_CACHE_ENABLED:
+        return
+    session = ssl_object.session
+    if session is None:
+        return
+    with _tls_session_lock:
+        sessions.pop(server_hostname, None)  # Re-insert as the newest entry
+        if len(sessions) >= TLS_SESSION_CACHE_MAX_ENTRIES:
+            del sessions[next(iter(sessions))]
+        sessions[server_hostname] = session
+
+
+# ======================================================================
+# Connection Instrumentation (urllib3 connection-level hooks)
+# ======================================================================
+# requests does not expose per-phase timings, so the pooled session mounts an
+# HTTPAdapter whose urllib3 connections record timestamps while connecting,
+# sending the request and receiving response headers.
+# The result is attached to the urllib3 response as `eo_connection_info`
+# (requests.Response.raw.eo_connection_info) and read by _get_connection_info().
+# Handshake info (TLS version / cipher / ALPN / resumption / peer IP / handshake time / DNS cache hit) is
+# captured once in connect() and kept on the connection, so reused connections report
+# the handshake that established them.
+class _ConnectionInstrumentationMixin:
+    """
+    Record DNS / TCP connect / TLS / request-sent / first-byte timestamps on a urllib3 connection
+    """
+
+    _eo_connect_timing: Optional[Dict[str, Any]] = None
+    _eo_connect_pending: bool = False
+    _eo_request_timing: Optional[Dict[str, float]] = None
+    _eo_handshake_info: Optional[Dict[str, Any]] = None
+
+    def _new_conn(self) -> socket.socket:
+        timing = {"connect_start": time.perf_counter()}
+        self._eo_connect_timing = timing
+        try:
+            addresses, timing["dns_cache_hit"] = _resolve_host_addresses(self._dns_host, self.port)
+        except socket.gaierror as e:
+            raise urllib3.exceptions.NameResolutionError(self.host, self, e) from e
+        timing["dns_end"] = time.perf_counter()
+
+        # Connect to resolved addresses in order (same fallback as urllib3 create_connection)
+        original_dns_host = self._dns_host
+        last_error: Optional[Exception] = None
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    timing["peer_ip"] = address
+                    break
+                except (urllib3.exceptions.ConnectTimeoutError, urllib3.exceptions.NewConnectionError) as e:
+                    last_error = e
+            else:
+                if timing["dns_cache_hit"]:
+                    _evict_dns_cache(original_dns_host, self.port)
+                raise last_error or urllib3.exceptions.NewConnectionError(self, "getaddrinfo returns an empty list")
+        finally:
+            self._dns_host = original_dns_host
+        timing["tcp_end"] = time.perf_counter()
+        return sock
+
+    def connect(self) -> None:
+        super().connect()
+        timing = self._eo_connect_timing or {}
+        timing["connected"] = time.perf_counter()
+        self._eo_connect_pending = True
+
+        # Handshake info (captured once per connection, valid for every request on it)
+        handshake_ms = None
+        if isinstance(self, urllib3.connection.HTTPSConnection) and "tcp_end" in timing:
+            handshake_ms = (timing["connected"] - timing["tcp_end"]) * 1000
+        sock = getattr(self, "sock", None)
+        self._eo_handshake_info = {
+            **(_get_tls_handshake_info(sock) if isinstance(sock, ssl.SSLSocket) else {}),
+            "peer_ip": timing.get("peer_ip"),
+            "tls_handshake_ms": handshake_ms,
+            "dns_cache_hit": timing.get("dns_cache_hit"),
+        }
+
+    def request(self, *args: Any, **kwargs: Any) -> None:
+        request_start = time.perf_counter()
+        super().request(*args, **kwargs)
+        self._eo_request_timing = {"request_start": request_start, "request_sent": time.perf_counter()}
+
+    def getresponse(self) -> Any:
+        response = super().getresponse()
+        headers_received = time.perf_counter()
+        try:
+            if isinstance(self.sock, ssl.SSLSocket):
+                _store_tls_session(self.sock)
+            response.eo_connection_info = self._collect_connection_info(headers_received)
+        except Exception as e:
+            logging.warning(f"Connection instrumentation failed: {str(e)}")
+        return response
+
+    def _collect_connection_info(self, headers_received: float) -> Dict[str, Any]:
+        # New connection established for this request (not reused from the pool)
+        connect_timing = self._eo_connect_timing if self._eo_connect_pending else None
+        self._eo_connect_pending = False
+        request_timing = self._eo_request_timing or {"request_start": headers_received, "request_sent": headers_received}
+
+        timing: Dict[str, Optional[float]] = {"dns": 0.0, "connect": 0.0, "tls": 0.0}
+        connect_total = 0.0
+        if connect_timing is not None:
+            dns_end = connect_timing.get("dns_end", connect_timing["connect_start"])
+            tcp_end = connect_timing.get("tcp_end", dns_end)
+            connected = connect_timing.get("connected", tcp_end)
+            timing["dns"] = dns_end - connect_timing["connect_start"]
+            timing["connect"] = tcp_end - dns_end
+            timing["tls"] = connected - tcp_end if isinstance(self, urllib3.connection.HTTPSConnection) else None
+            # HTTP: connect() runs inside request() (http.client auto_open)
+            if connect_timing["connect_start"] >= request_timing["request_start"]:
+                connect_total = connected - connect_timing["connect_start"]
+        timing["request_sent"] = max(0.0, request_timing["request_sent"] - request_timing["request_start"] - connect_total)
+        timing["first_byte"] = headers_received - request_timing["request_sent"]
+
+        return {
+            "connection_reused": connect_timing is None,
+            "timing_ms": {k: (v * 1000 if v is not None else None) for k, v in timing.items()},
+            "handshake": self._eo_handshake_info,
+        }
+
+
+class _InstrumentedHTTPConnection(_ConnectionInstrumentationMixin, urllib3.connection.HTTPConnection):
+    pass
+
+
+class _InstrumentedHTTPSConnection(_ConnectionInstrumentationMixin, urllib3.connection.HTTPSConnection):
+    pass
+
+
+class _InstrumentedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _InstrumentedHTTPConnection
+
+
+class _InstrumentedHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _InstrumentedHTTPSConnection
+
+
+class _InstrumentedHTTPAdapter(requests.adapters.HTTPAdapter):
+    """
+    HTTPAdapter whose connection pools use the instrumented urllib3 connections
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("ssl_context", _get_tls_session_context(FETCH_ENGINE_SYNC))
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _InstrumentedHTTPConnectionPool,
+            "https": _InstrumentedHTTPSConnectionPool,
+        }
+
+    def cert_verify(self, conn: Any, url: str, verify: Any, cert: Any) -> None:
+        super().cert_verify(conn, url, verify, cert)
+        # The CA bundle is already loaded into the shared context (loading certifi again costs ~40 ms per connection)
+        ca_bundle = getattr(self.poolmanager.connection_pool_kw.get("ssl_context"), "_eo_ca_bundle", None)
+        if ca_bundle is not None and conn.ca_certs == ca_bundle:
+            conn.ca_certs = None
+        if ca_bundle is not None and conn.ca_cert_dir == ca_bundle:
+            conn.ca_cert_dir = None
+
+
+def _get_connection_info(response: requests.Response) -> Dict[str, Any]:
+    """
+    Get connection info recorded by the instrumented connection (final request after redirects)
+
+    Returns:
+        Dict with keys "connection_reused" (bool), "timing_ms" (dns / connect / tls /
+        request_sent / first_byte) and "handshake" (see _get_tls_handshake_info, + peer_ip /
+        tls_handshake_ms / dns_cache_hit), or empty dict if not available
+    """
+    raw = getattr(response, 'raw', None)
+    return getattr(raw, 'eo_connection_info', None) or {}
+
+
+# ======================================================================
+# Pooled HTTP Session (kept across warm invocations)
+# ======================================================================
+def _create_http_session() -> requests.Session:
+    """
+    Create requests.Session with keep-alive connection pool
+
+    Cookies are not stored in the session (cookie policy blocks all domains),
+    so Set-Cookie from one warmup never leaks into the next warmup request
+    (cookies can change CDN cache keys / cause BYPASS).
+    """
+    session = requests.Session()
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = _InstrumentedHTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=0,  # Retry is handled by _execute_http_request_with_retry
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _get_http_session() -> requests.Session:
+    """
+    Get module-level pooled HTTP session (thread-safe)
+
+    Created on first call and reused while the instance stays warm.
+    Idle eviction: if unused for HTTP_SESSION_IDLE_TIMEOUT seconds,
+    the old session (and all its pooled connections) is closed and replaced.
+    """
+    global _http_session, _http_session_last_used
+    with _http_session_lock:
+        now = time.monotonic()
+        if _http_session is not None and now - _http_session_last_used > HTTP_SESSION_IDLE_TIMEOUT:
+            _http_session.close()
+            _http_session = None
+        if _http_session is None:
+            _http_session = _create_http_session()
+        _http_session_last_used = now
+        return _http_session
+
+
+# ======================================================================
+# Connection Reuse Detection
+# ======================================================================
+def _is_connection_reused(response: requests.Response) -> Optional[bool]:
+    """
+    Determine whether the response was received over a reused keep-alive connection
+    (no new DNS/TCP/TLS setup was needed)
+
+    Returns:
+        True (reused), False (new connection), None (cannot be determined)
+    """
+    return _get_connection_info(response).get("connection_reused")
+
+
 # ======================================================================
 # Get HTTP Protocol Version
 # ======================================================================
@@ -245,13 +874,55 @@ def _get_http_protocol_version(response: requests.Response) -> Optional[str]:
 # ======================================================================
 # Get TLS Version
 # ======================================================================
+_TLS_VERSION_NAMES = {
+    'TLSv1': 'TLSv1.0',
+    'TLSv1.1': 'TLSv1.1',
+    'TLSv1.2': 'TLSv1.2',
+    'TLSv1.3': 'TLSv1.3',
+}
+
+
+def _normalize_tls_version(ssl_version_str: Optional[str]) -> str:
+    """
+    Normalize ssl version string (SSLSocket.version() / SSLObject.version()) for output
+
+    Exact match: "TLSv1" is a prefix of "TLSv1.3", so substring matching reported TLS 1.3 as TLSv1.0.
+    """
+    if ssl_version_str:
+        return _TLS_VERSION_NAMES.get(ssl_version_str, ssl_version_str)
+    return "unknown: version_string_empty"
+
+
+def _get_tls_handshake_info(ssl_object: Any) -> Dict[str, Any]:
+    """
+    Read negotiated TLS parameters from ssl.SSLSocket / ssl.SSLObject (right after the handshake)
+
+    Returns:
+        Dict with keys "tls_version", "tls_cipher", "tls_alpn" (e.g. "h2", "http/1.1", None)
+        and "tls_session_resumed" (bool: abbreviated handshake with a cached session)
+    """
+    cipher = ssl_object.cipher()
+    return {
+        "tls_version": _normalize_tls_version(ssl_object.version()),
+        "tls_cipher": cipher[0] if cipher else None,
+        "tls_alpn": ssl_object.selected_alpn_protocol(),
+        "tls_session_resumed": ssl_object.session_reused,
+    }
+
+
 def _get_tls_version(response: requests.Response, target_url: str) -> Optional[str]:
     """
     Get TLS version
     Returns value with reason on failure
+
+    Uses the handshake info captured by the instrumented connection; falls back to
+    inspecting the connection socket (still open with stream=True).
     """
     if not target_url.startswith("https://"):
         return "unknown: not_https"
+    handshake_info = _get_connection_info(response).get("handshake") or {}
+    if handshake_info.get("tls_version"):
+        return handshake_info["tls_version"]
     if not hasattr(response, 'raw') or response.raw is None:
         return "unknown: response_raw_not_available"
 
@@ -267,19 +938,7 @@ def _get_tls_version(response: requests.Response, target_url: str) -> Optional[s
             return f"unknown: sock_not_ssl (type: {type(sock).__name__})"
 
         try:
-            ssl_version_str = sock.version()
-            tls_version_map = {
-                'TLSv1': 'TLSv1.0',
-                'TLSv1.1': 'TLSv1.1',
-                'TLSv1.2': 'TLSv1.2',
-                'TLSv1.3': 'TLSv1.3',
-            }
-            for key, value in tls_version_map.items():
-                if key in ssl_version_str:
-                    return value
-            if ssl_version_str:
-                return ssl_version_str
-            return "unknown: version_string_empty"
+            return _normalize_tls_version(sock.version())
         except AttributeError as e:
             return f"unknown: version_method_failed (AttributeError: {str(e)})"
         except TypeError as e:
@@ -297,277 +956,1371 @@ def _get_tls_version(response: requests.Response, target_url: str) -> Optional[s
 # ======================================================================
 # CDN Detection (Core capability)
 # ======================================================================
-def _detect_cdn(res_headers: Dict[str, str]) -> Dict[str, Optional[str]]:
+def _normalize_headers(res_headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    Lowercase response header names (computed once per response, shared by core and extensions)
+    """
+    return {k.lower(): v for k, v in res_headers.items()}
+
+
+def _load_cdn_rule_pack(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load CDN rule pack (JSON)
+
+    Path: argument > environment variable EO_CDN_RULE_PACK_PATH > CDN_RULE_PACK_FILE next to this module
+    """
+    if not path:
+        path = os.environ.get(CDN_RULE_PACK_PATH_ENV) or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), CDN_RULE_PACK_FILE
+        )
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _compile_cdn_rule_pack(rule_pack: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compile CDN rule pack into a header-name -> rules index
+
+    Each rule: {"priority", "sort_key", "cdn_name", "header", "substring", "cache_status_headers",
+    "cache_status_values", "pop_patterns"} (substring is None for header presence rules)
+
+    Returns:
+        Dict with keys "version", "index" (header name -> rules), "headers" (frozenset of indexed header names)
+    """
+    default_cache_status_values = _compile_cache_status_values(rule_pack.get("cache_status_values", {}))
+
+    index: Dict[str, List[Dict[str, Any]]] = {}
+    order = 0
+    for cdn in rule_pack.get("cdns", []):
+        cache_status_values = dict(default_cache_status_values)
+        cache_status_values.update(_compile_cache_status_values(cdn.get("cache_status_values", {})))
+        pop_patterns = [(p["header"].lower(), re.compile(p["pattern"])) for p in cdn.get("pop", [])]
+
+        for detect in cdn["detect"]:
+            priority = detect.get("priority", cdn.get("priority", 0))
+            rule = {
+                "priority": priority,
+                # Rule pack order breaks ties between rules of the same priority
+                "sort_key": (-priority, order),
+                "cdn_name": cdn["name"],
+                "header": detect["header"].lower(),
+                "substring": detect["contains"].lower() if detect.get("contains") else None,
+                "cache_status_headers": tuple(
+                    h.lower() for h in detect.get("cache_status_headers", cdn.get("cache_status_headers", []))
+                ),
+                "cache_status_values": cache_status_values,
+                "pop_patterns": pop_patterns,
+            }
+            index.setdefault(rule["header"], []).append(rule)
+            order += 1
+
+    return {
+        "version": rule_pack.get("version"),
+        "index": index,
+        "headers": frozenset(index),
+    }
+
+
+def _compile_cache_status_values(cache_status_values: Dict[str, List[str]]) -> Dict[str, str]:
+    """
+    Convert {"HIT": ["hit", "tcp_hit", ...], ...} into {"hit": "HIT", "tcp_hit": "HIT", ...}
+    """
+    return {
+        raw_value.lower(): normalized
+        for normalized, raw_values in cache_status_values.items()
+        for raw_value in raw_values
+    }
+
+
+def _init_cdn_rule_pack() -> Dict[str, Any]:
+    """
+    Load and compile the CDN rule pack at cold start
+
+    If the rule pack cannot be loaded, CDN detection is disabled (eo.meta.cdn-* not output)
+    and the error is logged. Warmup requests are not affected.
+    """
+    try:
+        compiled = _compile_cdn_rule_pack(_load_cdn_rule_pack())
+        logging.info(f"CDN rule pack loaded: version={compiled['version']}, headers={len(compiled['headers'])}")
+        return compiled
+    except Exception as e:
+        logging.error(f"CDN rule pack load failed (CDN detection disabled): {type(e).__name__}: {str(e)}")
+        return {"version": None, "index": {}, "headers": frozenset()}
+
+
+_CDN_RULE_PACK = _init_cdn_rule_pack()
+
+
+def _cdn_rule_sort_key(rule: Dict[str, Any]) -> Tuple[int, int]:
+    return rule["sort_key"]
+
+
+def _normalize_cdn_cache_status(cache_status: str, cache_status_values: Dict[str, str]) -> str:
+    """
+    Normalize CDN cache status value (e.g. "Hit from cloudfront", "TCP_HIT from a23-...", "MISS, HIT")
+
+    Multi-tier values ("MISS, HIT") use the last tier (edge closest to the client).
+    Only the first word is compared ("Hit from cloudfront" -> "hit").
+    """
+    last_tier = cache_status.rsplit(",", 1)[-1].split()
+    if not last_tier:
+        return CDN_CACHE_STATUS_UNKNOWN
+    return cache_status_values.get(last_tier[0].lower(), CDN_CACHE_STATUS_UNKNOWN)
+
+
+def _extract_cdn_pop(headers_lower: Dict[str, str], pop_patterns: List[Tuple[str, Any]]) -> Optional[str]:
+    """
+    Extract edge POP (e.g. "NRT" from cf-ray "8f1c2a3b4d5e6f70-NRT") using the rule pack patterns
+    """
+    for header_name, pattern in pop_patterns:
+        header_value = headers_lower.get(header_name)
+        if header_value:
+            match = pattern.search(header_value)
+            if match:
+                return match.group(1).upper()
+    return None
+
+
+def _detect_cdn(
+    res_headers: Dict[str, str],
+    headers_lower: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
     """
     Detect CDN and cache status from response headers.
 
-    Uses _CDN_DETECTION_CONFIG to identify the CDN serving the response,
-    then looks up the corresponding cache status header.
+    Looks up each response header in the precompiled rule pack index (_CDN_RULE_PACK).
+    The highest-priority match identifies the CDN; all matching CDNs are returned
+    for multi-CDN stacks (e.g. NitroCDN behind Cloudflare).
 
     Args:
         res_headers: Response headers
+        headers_lower: Response headers with lowercased names (computed if omitted)
 
     Returns:
         Dict with keys:
             - "cdn-header-name": Detected CDN header name (or None)
             - "cdn-header-value": Detected CDN header value (or None)
             - "cdn-cache-status": Cache status value (or None)
+            - "cdn-cache-status-normalized": HIT / MISS / EXPIRED / STALE / REVALIDATED / BYPASS /
+              DYNAMIC / ERROR / UNKNOWN (or None if no cache status)
+            - "cdn-pop": Edge POP code of the detected CDN (or None)
+            - "cdn-detected": All matching CDN names, highest priority first (list)
     """
-    headers_lower = {k.lower(): v for k, v in res_headers.items()}
-
-    result = {
+    if headers_lower is None:
+        headers_lower = _normalize_headers(res_headers)
+
+    # Only headers that appear in the rule index are examined (set intersection)
+    matches: List[Dict[str, Any]] = []
+    rule_index = _CDN_RULE_PACK["index"]
+    for header_name in _CDN_RULE_PACK["headers"].intersection(headers_lower):
+        header_value_lower = None
+        for rule in rule_index[header_name]:
+            if rule["substring"] is not None:
+                if header_value_lower is None:
+                    header_value_lower = headers_lower[header_name].lower()
+                if rule["substring"] not in header_value_lower:
+                    continue
+            matches.append(rule)
+    if len(matches) > 1:
+        matches.sort(key=_cdn_rule_sort_key)
+
+    result: Dict[str, Any] = {
         "cdn-header-name": None,
         "cdn-header-value": None,
         "cdn-cache-status": None,
+        "cdn-cache-status-normalized": None,
+        "cdn-pop": None,
+        "cdn-detected": [],
     }
-
-    # Primary detection from _CDN_DETECTION_CONFIG
-    for detection_header, cache_status_header in _CDN_DETECTION_CONFIG:
-        if detection_header in headers_lower:
-            result["cdn-header-name"] = detection_header
-            result["cdn-header-value"] = headers_lower[detection_header]
-            if cache_status_header in headers_lower:
-                result["cdn-cache-status"] = headers_lower[cache_status_header]
+    if not matches:
+        return result
+
+    winner = matches[0]
+    result["cdn-header-name"] = winner["header"]
+    result["cdn-header-value"] = headers_lower[winner["header"]]
+
+    # Cache status: first match with its cache status header present.
+    # Signature rules fall through to the next match; header presence rules do not.
+    for rule in matches:
+        cache_status_header = None
+        for h in rule["cache_status_headers"]:
+            if h in headers_lower:
+                cache_status_header = h
+                break
+        if cache_status_header is not None:
+            result["cdn-cache-status"] = headers_lower[cache_status_header]
+            result["cdn-cache-status-normalized"] = _normalize_cdn_cache_status(
+                result["cdn-cache-status"], rule["cache_status_values"]
+            )
+            break
+        if rule["substring"] is None:
             break
 
-    # Secondary: Server header checks (may override primary detection)
-    server_header = headers_lower.get("server", "")
-
-    # GCP CDN (Cloud CDN / Media CDN) detection
-    if "google-edge-cache" in server_header.lower():
-        result["cdn-header-name"] = "server"
-        result["cdn-header-value"] = server_header
-        cache_status = headers_lower.get("cdn-cache-status") or headers_lower.get("cdn_cache_status")
-        if cache_status:
-            result["cdn-cache-status"] = cache_status
-
-    # GCP CDN custom header
-    if "cdn_cache_status" in headers_lower:
-        result["cdn-header-name"] = "cdn_cache_status"
-        result["cdn-header-value"] = headers_lower["cdn_cache_status"]
-        result["cdn-cache-status"] = headers_lower["cdn_cache_status"]
-
-    # Vercel Server header detection
-    if "vercel" in server_header.lower():
-        result["cdn-header-name"] = "server"
-        result["cdn-header-value"] = server_header
-        if "x-vercel-cache" in headers_lower:
-            result["cdn-cache-status"] = headers_lower["x-vercel-cache"]
-
-    # Bunny CDN Server header detection
-    if "bunnycdn" in server_header.lower():
-        result["cdn-header-name"] = "server"
-        result["cdn-header-value"] = server_header
-        if "cdn-cache" in headers_lower:
-            result["cdn-cache-status"] = headers_lower["cdn-cache"]
-
-    # Alibaba Cloud CDN (Tengine) Server header detection
-    if "tengine" in server_header.lower():
-        result["cdn-header-name"] = "server"
-        result["cdn-header-value"] = server_header
-        if "x-cache" in headers_lower:
-            result["cdn-cache-status"] = headers_lower["x-cache"]
-
-    # Azure Front Door Via header detection
-    via_header = headers_lower.get("via", "")
-    if "azure" in via_header.lower():
-        result["cdn-header-name"] = "via"
-        result["cdn-header-value"] = via_header
-        if "x-cache" in headers_lower:
-            result["cdn-cache-status"] = headers_lower["x-cache"]
+    # Edge POP: first match (priority order) whose CDN defines a POP pattern that matches
+    for rule in matches:
+        if rule["pop_patterns"]:
+            result["cdn-pop"] = _extract_cdn_pop(headers_lower, rule["pop_patterns"])
+            if result["cdn-pop"] is not None:
+                break
 
+    for rule in matches:
+        if rule["cdn_name"] not in result["cdn-detected"]:
+            result["cdn-detected"].append(rule["cdn_name"])
     return result
 
 
 # ======================================================================
-# Retryable Error Determination
+# Eviction Detection
 # ======================================================================
-def _is_retryable_error(exception: Exception, status_code: Optional[int] = None) -> bool:
+_EVICTION_MISS_STATUSES = frozenset({"MISS", "EXPIRED"})
+_EVICTION_CACHED_STATUSES = frozenset({"HIT", "STALE", "REVALIDATED"})
+_EVICTION_IGNORE_STATUSES = frozenset({"DYNAMIC", "BYPASS"})
+
+
+def _parse_cache_control_ttl(value: str) -> Optional[float]:
     """
-    Determine if error is retryable
-    Temporary errors (network errors, server errors, etc.) are retry targets.
+    Shared cache TTL (seconds) of one Cache-Control style header value
+
+    s-maxage takes precedence over max-age; no-store / private mean 0 (the origin forbids shared caching).
+    Returns None when the value does not set a TTL.
     """
-    if isinstance(exception, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
-        return True
+    directives: Dict[str, str] = {}
+    for part in value.lower().split(","):
+        name, _, argument = part.partition("=")
+        directives[name.strip()] = argument.strip().strip('"')
+    if "no-store" in directives or "private" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(float(directives[name]), 0.0)
+            except ValueError:
+                continue
+    return None
 
-    if status_code and status_code in RETRYABLE_STATUS_CODES:
-        return True
 
-    if isinstance(exception, requests.exceptions.HTTPError):
-        if status_code and status_code in RETRYABLE_STATUS_CODES:
-            return True
+def _parse_cache_ttl(headers_lower: Dict[str, str]) -> Optional[float]:
+    """
+    Shared cache TTL (seconds) from the first of EVICTION_TTL_HEADERS that sets one
+    """
+    for header_name in EVICTION_TTL_HEADERS:
+        value = headers_lower.get(header_name)
+        if value:
+            ttl = _parse_cache_control_ttl(value)
+            if ttl is not None:
+                return ttl
+    return None
+
+
+def _parse_age(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return max(float(value.split(",")[0]), 0.0)
+    except ValueError:
+        return None
+
+
+def _classify_eviction(
+    cache_status: Optional[str],
+    age: Optional[float],
+    ttl: Optional[float],
+    previous: Optional[Tuple[float, Optional[float], Optional[float]]] = None,
+    observed_at: Optional[float] = None,
+) -> Optional[str]:
+    """
+    Classify one response as EVICTED / EXPIRED / FRESH / SAFE / IGNORE
 
-    return False
+    - MISS / EXPIRED: EXPIRED if the previously seen copy had reached its TTL by now, else EVICTED
+    - HIT / STALE / REVALIDATED: FRESH if the copy is younger than the previously seen copy
+      would be now (lost and refilled since), or younger than the FRESH threshold
+      (min(EVICTION_FRESH_AGE, TTL * EVICTION_FRESH_TTL_RATIO)); else SAFE
 
+    Args:
+        cache_status: Normalized cache status (eo.meta.cdn-cache-status-normalized)
+        age: Age response header (seconds) or None
+        ttl: Shared cache TTL (seconds) or None (0 = unknown)
+        previous: Previous observation of the URL at the POP: (observed_at, age of the copy
+            (0 after a MISS) or None, TTL or None)
+        observed_at: Time of this response (epoch seconds)
 
-# ======================================================================
-# HTTP Request Execution (with Retry)
-# ======================================================================
-def _execute_http_request_with_retry(
+    Returns:
+        EVICTION_ALERT_* or None (no cache status / UNKNOWN / ERROR)
+    """
+    if cache_status in _EVICTION_IGNORE_STATUSES:
+        return EVICTION_ALERT_IGNORE
+    # TTL 0 (no-store / private) with a HIT / MISS: a CDN edge rule overrides the origin, TTL unknown
+    ttl = ttl or None
+    expected_age = None
+    previous_ttl = ttl
+    if previous is not None and previous[1] is not None and observed_at is not None:
+        expected_age = previous[1] + (observed_at - previous[0])
+        if previous[2]:
+            previous_ttl = previous[2]
+
+    if cache_status in _EVICTION_MISS_STATUSES:
+        if expected_age is not None and previous_ttl is not None and expected_age >= previous_ttl - EVICTION_AGE_TOLERANCE:
+            return EVICTION_ALERT_EXPIRED
+        return EVICTION_ALERT_EVICTED
+    if cache_status in _EVICTION_CACHED_STATUSES:
+        if age is None:
+            return EVICTION_ALERT_SAFE
+        if expected_age is not None and age + EVICTION_AGE_TOLERANCE < expected_age:
+            return EVICTION_ALERT_FRESH
+        fresh_age = EVICTION_FRESH_AGE if ttl is None else min(EVICTION_FRESH_AGE, ttl * EVICTION_FRESH_TTL_RATIO)
+        return EVICTION_ALERT_FRESH if age < fresh_age else EVICTION_ALERT_SAFE
+    return None
+
+
+def _detect_eviction(
     target_url: str,
-    headers: Dict[str, str],
-) -> Tuple[requests.Response, Dict[str, Any]]:
+    cache_status: Optional[str],
+    cdn_pop: Optional[str],
+    headers_lower: Dict[str, str],
+    observed_at: float,
+) -> Dict[str, Any]:
     """
-    Execute HTTP request with retry (stream=True)
-    Automatically retry for temporary errors.
+    Classify the response against the previous observation of the URL at the same POP
+    (kept across warm invocations) and record this one.
 
-    Note: stream=True makes requests.get() return when response headers are received
-    (before body download). This enables accurate TTFB measurement in the caller.
-    The caller MUST consume the body (response.content) and close the response.
+    Returns:
+        Dict with keys "eviction-alert" (EVICTION_ALERT_* or None) and "cdn-ttl" (seconds or None)
+    """
+    ttl = _parse_cache_ttl(headers_lower)
+    age = _parse_age(headers_lower.get("age"))
+    key = (target_url, cdn_pop or "")
+    # Read, classify and record under one lock: concurrent responses of the same URL / POP
+    # (batch items, async tasks) must each see the observation recorded before them
+    with _eviction_history_lock:
+        previous = _eviction_history.get(key)
+        alert = _classify_eviction(cache_status, age, ttl, previous, observed_at)
+        if alert in (EVICTION_ALERT_EVICTED, EVICTION_ALERT_EXPIRED, EVICTION_ALERT_FRESH, EVICTION_ALERT_SAFE):
+            # After a MISS the CDN holds a new copy (age 0)
+            copy_age = 0.0 if cache_status in _EVICTION_MISS_STATUSES else age
+            _eviction_history.pop(key, None)
+            if len(_eviction_history) >= EVICTION_HISTORY_MAX_ENTRIES:
+                del _eviction_history[next(iter(_eviction_history))]
+            _eviction_history[key] = (observed_at, copy_age, ttl)
+    return {"eviction-alert": alert, "cdn-ttl": ttl}
+
+
+# ======================================================================
+# Revalidation (validators / content hash per URL)
+# ======================================================================
+_REVALIDATION_STRATEGIES = frozenset({WARMUP_STRATEGY_FULL})  # Plus full-if-under-<N>-bytes
+_CONDITIONAL_HEADERS = frozenset({"if-none-match", "if-modified-since"})
+
+
+def _has_cache_directive(value: Optional[str], directive: str) -> bool:
+    if not value:
+        return False
+    return any(part.partition("=")[0].strip() == directive for part in value.lower().split(","))
+
+
+def _plan_revalidation(
+    target_url: str,
+    strategy: Dict[str, Any],
+    req_headers: Dict[str, str],
+    now: float,
+) -> Optional[Dict[str, Any]]:
+    """
+    Decide whether to skip the request or send it as a conditional GET
+
+    Returns:
+        None when revalidation does not apply (disabled, HEAD / Range strategy), else a dict with keys
+        "req_headers" (with If-None-Match / If-Modified-Since when validators are known),
+        "conditional" (bool), "skip" (str reason or None) and "previous" (state of the URL or None)
+    """
+    if not REVALIDATION_ENABLED:
+        return None
+    if strategy["name"] not in _REVALIDATION_STRATEGIES and strategy["size_limit"] is None:
+        return None
+
+    with _revalidation_state_lock:
+        previous = _revalidation_state.get(target_url)
+        previous = dict(previous) if previous is not None else None
+    plan = {"req_headers": req_headers, "conditional": False, "skip": None, "previous": previous}
+
+    if previous is not None and REVALIDATION_SKIP_IMMUTABLE and previous["immutable"]:
+        idle = now - previous["observed_at"]
+        copy_age = (previous["age"] or 0.0) + idle
+        if (previous["cache_status"] in _EVICTION_CACHED_STATUSES
+                and idle <= REVALIDATION_SKIP_MAX_IDLE
+                and (not previous["ttl"] or copy_age < previous["ttl"])):
+            plan["skip"] = f"immutable copy was HIT {idle:.0f}s ago"
+            return plan
+
+    if any(key.lower() in _CONDITIONAL_HEADERS for key in req_headers):
+        plan["conditional"] = True
+    elif previous is not None and (previous["etag"] or previous["last_modified"]):
+        conditional_headers = dict(req_headers)
+        if previous["etag"]:
+            conditional_headers["If-None-Match"] = previous["etag"]
+        if previous["last_modified"]:
+            conditional_headers["If-Modified-Since"] = previous["last_modified"]
+        plan["req_headers"] = conditional_headers
+        plan["conditional"] = True
+    return plan
+
+
+def _record_revalidation(
+    target_url: str,
+    status_code: int,
+    cache_status: Optional[str],
+    headers_lower: Dict[str, str],
+    content_hash: Optional[str],
+    body_truncated: bool,
+    plan: Dict[str, Any],
+    observed_at: float,
+) -> Dict[str, Any]:
+    """
+    Compare the response with the previous one of the URL and record its validators / content hash
+
+    Only complete responses (200 with the whole body, 304) are recorded.
+
+    Returns:
+        Dict with keys "revalidated" (bool or None: no conditional request),
+        "content-changed" (bool or None: nothing to compare) and "content-hash"
+        (the previous hash for 304 / skipped, since no body was read)
+    """
+    previous = plan["previous"]
+    if plan["skip"] is not None:
+        return {
+            "revalidated": None,
+            "content-changed": False,
+            "content-hash": previous["content_hash"],
+        }
+
+    revalidated = None
+    content_changed = None
+    if status_code == 304:
+        revalidated = plan["conditional"] or None
+        content_changed = False
+        content_hash = previous["content_hash"] if previous is not None else None
+    elif status_code == 200 and not body_truncated:
+        revalidated = False if plan["conditional"] else None
+        if previous is not None:
+            etag = headers_lower.get("etag")
+            last_modified = headers_lower.get("last-modified")
+            if content_hash is not None and previous["content_hash"] is not None:
+                content_changed = content_hash != previous["content_hash"]
+            elif etag and previous["etag"]:
+                content_changed = etag != previous["etag"]
+            elif last_modified and previous["last_modified"]:
+                content_changed = last_modified != previous["last_modified"]
+    else:
+        return {"revalidated": None, "content-changed": None, "content-hash": content_hash}
+
+    state = {
+        "etag": headers_lower.get("etag"),
+        "last_modified": headers_lower.get("last-modified"),
+        "content_hash": content_hash,
+        "immutable": _has_cache_directive(headers_lower.get("cache-control"), "immutable"),
+        "cache_status": cache_status,
+        "age": _parse_age(headers_lower.get("age")),
+        "ttl": _parse_cache_ttl(headers_lower),
+        "observed_at": observed_at,
+    }
+    if status_code == 304 and previous is not None:
+        # 304 may omit headers of the full response: keep the previous values
+        for key in ("etag", "last_modified", "ttl"):
+            if state[key] is None:
+                state[key] = previous[key]
+        state["immutable"] = state["immutable"] or ("cache-control" not in headers_lower and previous["immutable"])
+    with _revalidation_state_lock:
+        _revalidation_state.pop(target_url, None)
+        if len(_revalidation_state) >= REVALIDATION_STATE_MAX_ENTRIES:
+            del _revalidation_state[next(iter(_revalidation_state))]
+        _revalidation_state[target_url] = state
+    return {"revalidated": revalidated, "content-changed": content_changed, "content-hash": content_hash}
+
+
+# ======================================================================
+# Retryable Error Determination
+# ======================================================================
+def _is_retryable_error(exception: Exception, status_code: Optional[int] = None) -> bool:
+    """
+    Determine if error is retryable
+    Temporary errors (network errors, server errors, etc.) are retry targets.
+    """
+    if isinstance(exception, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+
+    if status_code and status_code in RETRYABLE_STATUS_CODES:
+        return True
+
+    if isinstance(exception, requests.exceptions.HTTPError):
+        if status_code and status_code in RETRYABLE_STATUS_CODES:
+            return True
+
+    return False
+
+
+# ======================================================================
+# Retry Policy (jittered backoff, Retry-After, per-host retry budget, deadline)
+# ======================================================================
+# Shared by the sync and async engines: the engines only send requests and sleep,
+# every retry decision is made by _plan_retry().
+def _get_request_host(target_url: str) -> str:
+    """
+    Get lowercase host name of target URL (key for per-host state)
+    """
+    return (urlsplit(target_url).hostname or "").lower()
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse Retry-After header value (delay-seconds or HTTP-date) into seconds
+
+    Returns:
+        Optional[float]: Seconds to wait (>= 0), or None if absent / invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _compute_backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff delay for retry after attempt (0-based) with RETRY_JITTER applied
+    """
+    backoff = RETRY_INITIAL_DELAY * (RETRY_BACKOFF_MULTIPLIER ** attempt)
+    if RETRY_JITTER == RETRY_JITTER_FULL:
+        return random.uniform(0, backoff)
+    if RETRY_JITTER == RETRY_JITTER_EQUAL:
+        return backoff / 2 + random.uniform(0, backoff / 2)
+    return backoff
+
+
+def _get_retry_budget_locked(host: str, now: float) -> Dict[str, float]:
+    """
+    Get retry budget of host for the current window (caller holds _retry_budget_lock)
+    """
+    budget = _retry_budgets.get(host)
+    if budget is None or now - budget["window_start"] >= RETRY_BUDGET_WINDOW:
+        budget = {"window_start": now, "requests": 0, "retries": 0}
+        _retry_budgets[host] = budget
+    return budget
+
+
+def _record_host_request(host: str) -> None:
+    """
+    Count one request (first attempt) to host in its retry budget window
+    """
+    with _retry_budget_lock:
+        _get_retry_budget_locked(host, time.monotonic())["requests"] += 1
+
+
+def _try_acquire_retry_budget(host: str) -> bool:
+    """
+    Take one retry from the host retry budget
+
+    Returns:
+        bool: True if the retry is allowed (retries < RETRY_BUDGET_MIN_RETRIES + RETRY_BUDGET_RATIO * requests)
+    """
+    with _retry_budget_lock:
+        budget = _get_retry_budget_locked(host, time.monotonic())
+        if budget["retries"] < RETRY_BUDGET_MIN_RETRIES + RETRY_BUDGET_RATIO * budget["requests"]:
+            budget["retries"] += 1
+            return True
+        return False
+
+
+def _new_retry_info() -> Dict[str, Any]:
     """
-    retry_info = {
+    Create retry info (returned with the response, reported in the flat result)
+
+    - retry_delays: planned sleep before each retry (seconds, jitter / Retry-After applied)
+    - retry_sleep_s: actual total sleep (reported separately from fetch time)
+    - stop_reason: why retrying stopped early (RETRY_STOP_*), None if not stopped by the policy
+    """
+    return {
         "retry_attempts": 0,
         "retry_delays": [],
+        "retry_sleep_s": 0.0,
         "last_error": None,
+        "stop_reason": None,
     }
 
-    last_exception = None
-    last_response = None
+
+def _get_attempt_timeout(attempt: int, deadline: float) -> float:
+    """
+    Timeout for attempt (0-based): first attempt uses HTTP_REQUEST_TIMEOUT,
+    retries are clipped to the remaining RETRY_DEADLINE budget
+    """
+    if attempt == 0:
+        return HTTP_REQUEST_TIMEOUT
+    return max(RETRY_MIN_ATTEMPT_TIMEOUT, min(HTTP_REQUEST_TIMEOUT, deadline - time.monotonic()))
+
+
+def _plan_retry(
+    retry_info: Dict[str, Any],
+    attempt: int,
+    deadline: float,
+    host: str,
+    status_code: Optional[int] = None,
+    retry_after: Optional[str] = None,
+) -> Optional[float]:
+    """
+    Decide whether to retry after a failed attempt (retryable status or retryable error)
+
+    Order: max attempts -> Retry-After (RETRY_AFTER_STATUS_CODES) or jittered backoff
+    -> deadline -> per-host retry budget
+
+    Returns:
+        Optional[float]: Sleep before the retry (seconds), or None to stop
+            (retry_info["stop_reason"] is set when the policy stopped retrying early)
+    """
+    if attempt >= MAX_RETRY_ATTEMPTS:
+        return None
+
+    delay = None
+    if status_code in RETRY_AFTER_STATUS_CODES:
+        retry_after_seconds = _parse_retry_after(retry_after)
+        if retry_after_seconds is not None:
+            if retry_after_seconds > RETRY_AFTER_MAX_DELAY:
+                retry_info["stop_reason"] = RETRY_STOP_RETRY_AFTER_TOO_LONG
+                return None
+            delay = retry_after_seconds
+    if delay is None:
+        delay = _compute_backoff_delay(attempt)
+
+    if time.monotonic() + delay + RETRY_MIN_ATTEMPT_TIMEOUT > deadline:
+        retry_info["stop_reason"] = RETRY_STOP_DEADLINE
+        return None
+    if not _try_acquire_retry_budget(host):
+        retry_info["stop_reason"] = RETRY_STOP_BUDGET_EXHAUSTED
+        return None
+
+    retry_info["retry_delays"].append(delay)
+    return delay
+
+
+def _sleep_before_retry(retry_info: Dict[str, Any], delay: float) -> None:
+    """
+    Sleep before retry and record the actual sleep time
+    """
+    sleep_start = time.perf_counter()
+    time.sleep(delay)
+    retry_info["retry_sleep_s"] += time.perf_counter() - sleep_start
+    retry_info["retry_attempts"] += 1
+
+
+# ======================================================================
+# Circuit Breaker (per host, kept across warm invocations)
+# ======================================================================
+# Only hosts with failures have an entry; a success removes it (closed, failure count reset).
+def _acquire_circuit(host: str) -> str:
+    """
+    Admission check before sending a request to host
+
+    Returns:
+        str: State the request runs under
+            - CIRCUIT_STATE_CLOSED: send normally
+            - CIRCUIT_STATE_HALF_OPEN: send as the single probe request
+            - CIRCUIT_STATE_OPEN: fail fast (do not send)
+    """
+    if not CIRCUIT_BREAKER_ENABLED:
+        return CIRCUIT_STATE_CLOSED
+
+    now = time.monotonic()
+    with _circuit_breaker_lock:
+        breaker = _circuit_breakers.get(host)
+        if breaker is None or breaker["state"] == CIRCUIT_STATE_CLOSED:
+            return CIRCUIT_STATE_CLOSED
+        if breaker["state"] == CIRCUIT_STATE_OPEN and now - breaker["opened_at"] < CIRCUIT_OPEN_DURATION:
+            return CIRCUIT_STATE_OPEN
+        # Half-open: one probe in flight (a probe that never reported back is replaced after CIRCUIT_OPEN_DURATION)
+        if breaker["state"] == CIRCUIT_STATE_HALF_OPEN and now - breaker["probe_started_at"] < CIRCUIT_OPEN_DURATION:
+            return CIRCUIT_STATE_OPEN
+        breaker["state"] = CIRCUIT_STATE_HALF_OPEN
+        breaker["probe_started_at"] = now
+        return CIRCUIT_STATE_HALF_OPEN
+
+
+def _record_circuit_result(host: str, success: bool) -> None:
+    """
+    Record the outcome of a request (after retries) to host
+    """
+    if not CIRCUIT_BREAKER_ENABLED:
+        return
+
+    with _circuit_breaker_lock:
+        if success:
+            if _circuit_breakers.pop(host, None) is not None:
+                logging.info(f"Circuit closed for {host}")
+            return
+
+        breaker = _circuit_breakers.setdefault(host, {
+            "state": CIRCUIT_STATE_CLOSED,
+            "failures": 0,
+            "opened_at": 0.0,
+            "probe_started_at": 0.0,
+        })
+        breaker["failures"] += 1
+        if breaker["state"] == CIRCUIT_STATE_HALF_OPEN or breaker["failures"] >= CIRCUIT_FAILURE_THRESHOLD:
+            if breaker["state"] != CIRCUIT_STATE_OPEN:
+                logging.warning(f"Circuit opened for {host} after {breaker['failures']} consecutive failures")
+            breaker["state"] = CIRCUIT_STATE_OPEN
+            breaker["opened_at"] = time.monotonic()
+
+
+def _get_circuit_retry_in(host: str) -> float:
+    """
+    Seconds until the open circuit of host allows a half-open probe
+    """
+    with _circuit_breaker_lock:
+        breaker = _circuit_breakers.get(host)
+        if breaker is None:
+            return 0.0
+        started_at = breaker["probe_started_at"] if breaker["state"] == CIRCUIT_STATE_HALF_OPEN else breaker["opened_at"]
+        return max(0.0, CIRCUIT_OPEN_DURATION - (time.monotonic() - started_at))
+
+
+# ======================================================================
+# Per-Host Limiter (token bucket + max in-flight)
+# ======================================================================
+def _load_host_limits() -> Dict[str, Dict[str, Any]]:
+    """
+    Load per-origin limits (HOST_LIMITS + HOST_LIMITS_ENV JSON), host names lowercased
+    """
+    host_limits = {host.lower(): limits for host, limits in HOST_LIMITS.items()}
+    env_value = os.environ.get(HOST_LIMITS_ENV)
+    if env_value:
+        try:
+            host_limits.update({host.lower(): limits for host, limits in json.loads(env_value).items()})
+        except (ValueError, AttributeError) as e:
+            logging.warning(f"Invalid {HOST_LIMITS_ENV} (ignored): {str(e)}")
+    return host_limits
+
+
+_HOST_LIMITS = _load_host_limits()
+
+
+def _is_host_limited(host: str) -> bool:
+    return HOST_LIMIT_DEFAULT is not None or host in _HOST_LIMITS
+
+
+def _get_host_limiter_locked(host: str, now: float) -> Dict[str, Any]:
+    """
+    Get limiter state of host, created with a full bucket (caller holds _host_limiter_cond)
+    """
+    limiter = _host_limiters.get(host)
+    if limiter is None:
+        limits = {"rate": None, "burst": None, "max_in_flight": None, **(HOST_LIMIT_DEFAULT or {}), **_HOST_LIMITS.get(host, {})}
+        limiter = {"limits": limits, "tokens": float(limits["burst"] or 1), "updated_at": now, "in_flight": 0}
+        _host_limiters[host] = limiter
+    return limiter
+
+
+def _try_acquire_host_slot(host: str) -> Optional[float]:
+    """
+    Take one slot of host without blocking
+
+    Returns:
+        Optional[float]: None if the slot was taken, otherwise seconds to wait before trying again
+            (token refill time, or HOST_LIMIT_POLL_INTERVAL while max_in_flight is reached)
+    """
+    if not _is_host_limited(host):
+        return None
+    now = time.monotonic()
+    with _host_limiter_cond:
+        limiter = _get_host_limiter_locked(host, now)
+        limits = limiter["limits"]
+        if limits["max_in_flight"] is not None and limiter["in_flight"] >= limits["max_in_flight"]:
+            return HOST_LIMIT_POLL_INTERVAL
+        if limits["rate"] is not None:
+            limiter["tokens"] = min(float(limits["burst"] or 1), limiter["tokens"] + (now - limiter["updated_at"]) * limits["rate"])
+            limiter["updated_at"] = now
+            if limiter["tokens"] < 1.0:
+                return (1.0 - limiter["tokens"]) / limits["rate"]
+            limiter["tokens"] -= 1.0
+        limiter["in_flight"] += 1
+        return None
+
+
+def _acquire_host_slot(host: str) -> Optional[float]:
+    """
+    Wait for a slot of host (sync engine, blocks the calling thread)
+
+    Returns:
+        Optional[float]: Wait time (seconds) if the slot was taken, None if HOST_LIMIT_MAX_WAIT was exceeded
+    """
+    wait_start = time.monotonic()
+    while True:
+        retry_in = _try_acquire_host_slot(host)
+        if retry_in is None:
+            return time.monotonic() - wait_start
+        remaining = HOST_LIMIT_MAX_WAIT - (time.monotonic() - wait_start)
+        if remaining <= 0:
+            return None
+        with _host_limiter_cond:
+            _host_limiter_cond.wait(min(retry_in, remaining))
+
+
+def _release_host_slot(host: str) -> None:
+    """
+    Return the in-flight slot of host
+    """
+    if not _is_host_limited(host):
+        return
+    with _host_limiter_cond:
+        limiter = _host_limiters.get(host)
+        if limiter is not None and limiter["in_flight"] > 0:
+            limiter["in_flight"] -= 1
+        _host_limiter_cond.notify_all()
+
+
+# ======================================================================
+# HTTP Request Execution (with Retry)
+# ======================================================================
+def _execute_http_request_with_retry(
+    target_url: str,
+    headers: Dict[str, str],
+    method: str = "GET",
+) -> Tuple[requests.Response, Dict[str, Any]]:
+    """
+    Execute HTTP request with retry (stream=True)
+    Automatically retry for temporary errors (see _plan_retry for the retry policy).
+    Uses the pooled HTTP session (keep-alive connections are reused).
+
+    Note: stream=True makes requests.get() return when response headers are received
+    (before body download). This enables accurate TTFB measurement in the caller.
+    The caller MUST consume the body (_drain_response_body) and close the response.
+    """
+    retry_info = _new_retry_info()
+    host = _get_request_host(target_url)
+    deadline = time.monotonic() + RETRY_DEADLINE
+    _record_host_request(host)
 
     for attempt in range(MAX_RETRY_ATTEMPTS + 1):
         try:
-            response = requests.get(
+            response = _get_http_session().request(
+                method,
                 target_url,
                 headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
+                timeout=_get_attempt_timeout(attempt, deadline),
                 allow_redirects=True,
                 stream=True,
             )
 
             status_code = response.status_code
 
-            if status_code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRY_ATTEMPTS:
-                last_response = response
-                response.close()
-                delay = RETRY_INITIAL_DELAY * (RETRY_BACKOFF_MULTIPLIER ** attempt)
-                retry_info["retry_delays"].append(delay)
-                time.sleep(delay)
-                retry_info["retry_attempts"] += 1
-                logging.warning(f"Retry attempt {retry_info['retry_attempts']} for status {status_code}")
-                continue
+            if status_code in RETRYABLE_STATUS_CODES:
+                delay = _plan_retry(retry_info, attempt, deadline, host, status_code, response.headers.get("Retry-After"))
+                if delay is not None:
+                    response.close()
+                    _sleep_before_retry(retry_info, delay)
+                    logging.warning(f"Retry attempt {retry_info['retry_attempts']} for status {status_code}")
+                    continue
 
             retry_info["retry_attempts"] = attempt
             return response, retry_info
 
         except requests.exceptions.RequestException as e:
-            last_exception = e
             retry_info["last_error"] = str(e)
 
-            if _is_retryable_error(e) and attempt < MAX_RETRY_ATTEMPTS:
-                delay = RETRY_INITIAL_DELAY * (RETRY_BACKOFF_MULTIPLIER ** attempt)
-                retry_info["retry_delays"].append(delay)
-                time.sleep(delay)
-                retry_info["retry_attempts"] += 1
-                continue
-            else:
-                raise
+            if _is_retryable_error(e):
+                delay = _plan_retry(retry_info, attempt, deadline, host)
+                if delay is not None:
+                    _sleep_before_retry(retry_info, delay)
+                    continue
+            e.eo_retry_info = retry_info  # Reported in the error result
+            raise
 
-    if last_response: last_response.close()
-    if last_exception: raise last_exception
     raise RuntimeError("Maximum retry attempts reached")
 
 
 # ======================================================================
-# Build Flat Result
+# Warmup Strategy
 # ======================================================================
-def _build_flat_result(
-    *,
-    status_code: int,
-    status_message: str,
-    duration_ms: float,
-    initial_response_ms: Optional[float] = None,
-    content_length_bytes: Optional[int] = None,
-    target_url: str,
-    http_request_number: Optional[Any] = None,
-    http_request_uuid: Optional[str] = None,
-    http_request_round_id: Optional[int] = None,
-    req_headers: Dict[str, str],
-    res_headers: Dict[str, str],
-    tls_version: Optional[str] = None,
-    http_protocol_version: Optional[str] = None,
-    request_start_timestamp: Optional[float] = None,
-    request_end_timestamp: Optional[float] = None,
-    execution_id: Optional[str] = None,
-    from_area: Optional[str] = None,
-    redirect_count: int = 0,
-    urltype: Optional[str] = None,
-    retry_info: Optional[Dict[str, Any]] = None,
-) -> Dict[str, Any]:
-    """
-    Build response in flat JSON structure (Pure HTTP Focus)
-    All keys are normalized to lowercase.
+def _parse_warmup_strategy(value: Any) -> Dict[str, Any]:
     """
-    if not from_area:
-        raise RuntimeError("from_area parameter is required - must be passed from platform handler")
+    Parse warmupStrategy request option
 
-    protocol_value = http_protocol_version or "unknown"
-    tls_version_value = tls_version or "unknown"
+    Returns:
+        Dict with keys "name" (normalized strategy string) and "size_limit" (int for full-if-under-<N>-bytes)
 
-    ordered_result = {}
+    Raises:
+        ValueError: Unknown strategy
+    """
+    if value is None or value == "":
+        return {"name": DEFAULT_WARMUP_STRATEGY, "size_limit": None}
+    if not isinstance(value, str):
+        raise ValueError(f"warmupStrategy must be a string: {value!r}")
+
+    strategy = value.strip().lower()
+    if strategy in (WARMUP_STRATEGY_FULL, WARMUP_STRATEGY_HEAD, WARMUP_STRATEGY_RANGE_FIRST_BYTES):
+        return {"name": strategy, "size_limit": None}
+    if strategy.startswith(WARMUP_STRATEGY_FULL_IF_UNDER_PREFIX) and strategy.endswith("-bytes"):
+        size_limit = strategy[len(WARMUP_STRATEGY_FULL_IF_UNDER_PREFIX):-len("-bytes")]
+        if size_limit.isdigit():
+            return {"name": strategy, "size_limit": int(size_limit)}
+    raise ValueError(f"Unknown warmupStrategy: {value}")
+
+
+def _build_warmup_request(strategy: Dict[str, Any], req_headers: Dict[str, str]) -> Tuple[str, Dict[str, str]]:
+    """
+    Build HTTP method and request headers for the warmup strategy
 
-    # ==================================================================
-    # 1. Basic HTTP Information
-    # ==================================================================
-    ordered_result["headers.general.status-code"] = status_code
-    ordered_result["headers.general.status-message"] = status_message
-    ordered_result["headers.general.request-url"] = target_url
-    ordered_result["headers.general.http-request-method"] = "GET"
+    Returns:
+        Tuple[str, Dict[str, str]]: (HTTP method, request headers)
+    """
+    if strategy["name"] == WARMUP_STRATEGY_HEAD:
+        return "HEAD", req_headers
+    if strategy["name"] == WARMUP_STRATEGY_RANGE_FIRST_BYTES:
+        range_headers = dict(req_headers)
+        range_headers["Range"] = f"bytes=0-{WARMUP_RANGE_FIRST_BYTES - 1}"
+        return "GET", range_headers
+    return "GET", req_headers
 
-    # ==================================================================
-    # 2. Request Identification Information
-    # ==================================================================
-    if http_request_number is not None:
-        ordered_result["eo.meta.http-request-number"] = http_request_number
-    if http_request_uuid is not None:
-        ordered_result["eo.meta.http-request-uuid"] = http_request_uuid
-    if http_request_round_id is not None:
-        ordered_result["eo.meta.http-request-round-id"] = http_request_round_id
-    if urltype is not None:
-        ordered_result["eo.meta.urltype"] = urltype
 
-    # ==================================================================
-    # 3. Execution Environment / Timestamp Information
-    # ==================================================================
-    ordered_result["eo.meta.re-area"] = from_area
-    if execution_id is not None:
-        ordered_result["eo.meta.execution-id"] = execution_id
-    if request_start_timestamp is not None:
-        ordered_result["eo.meta.request-start-timestamp"] = request_start_timestamp
-    if request_end_timestamp is not None:
-        ordered_result["eo.meta.request-end-timestamp"] = request_end_timestamp
+def _plan_body_download(strategy: Dict[str, Any], res_headers: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Decide how much of the response body to download for the warmup strategy
 
-    # ==================================================================
-    # 4. Protocol Information
-    # ==================================================================
-    ordered_result["eo.meta.http-protocol-version"] = protocol_value
-    ordered_result["eo.meta.tls-version"] = tls_version_value
+    Returns:
+        Dict with keys "download" (bool), "max_bytes" (read limit or None),
+        "applied" (strategy actually applied: full / head / range-first-bytes / headers-only)
+    """
+    if strategy["name"] == WARMUP_STRATEGY_HEAD:
+        # HEAD has no body; drain anyway so the keep-alive connection returns to the pool
+        return {"download": True, "max_bytes": None, "applied": WARMUP_STRATEGY_HEAD}
+    if strategy["name"] == WARMUP_STRATEGY_RANGE_FIRST_BYTES:
+        return {"download": True, "max_bytes": WARMUP_RANGE_FIRST_BYTES, "applied": WARMUP_STRATEGY_RANGE_FIRST_BYTES}
+    if strategy["size_limit"] is not None:
+        content_length = next((v for k, v in res_headers.items() if k.lower() == "content-length"), None)
+        if content_length is not None and content_length.strip().isdigit() and int(content_length) > strategy["size_limit"]:
+            return {"download": False, "max_bytes": None, "applied": "headers-only"}
+        return {"download": True, "max_bytes": strategy["size_limit"], "applied": WARMUP_STRATEGY_FULL}
+    return {"download": True, "max_bytes": BODY_DRAIN_MAX_BYTES, "applied": WARMUP_STRATEGY_FULL}
 
-    # ==================================================================
-    # 5. CDN Detection (Core capability)
-    # ==================================================================
-    cdn_info = _detect_cdn(res_headers)
-    if cdn_info["cdn-header-name"] is not None:
-        ordered_result["eo.meta.cdn-header-name"] = cdn_info["cdn-header-name"]
-        ordered_result["eo.meta.cdn-header-value"] = cdn_info["cdn-header-value"]
-    if cdn_info["cdn-cache-status"] is not None:
-        ordered_result["eo.meta.cdn-cache-status"] = cdn_info["cdn-cache-status"]
 
-    # ==================================================================
-    # 6. Measurements
-    # ==================================================================
-    if duration_ms is not None:
-        ordered_result["eo.meta.duration-ms"] = round(duration_ms, 2)
-    if initial_response_ms is not None:
-        ordered_result["eo.meta.ttfb-ms"] = round(initial_response_ms, 2)
-    if content_length_bytes is not None:
-        ordered_result["eo.meta.actual-content-length"] = content_length_bytes
-    ordered_result["eo.meta.redirect-count"] = redirect_count
-    if retry_info:
-        ordered_result["eo.meta.retry-attempts"] = retry_info.get("retry_attempts", 0)
-        if retry_info.get("retry_delays"):
-            ordered_result["eo.meta.retry-delays-ms"] = [round(d * 1000, 2) for d in retry_info.get("retry_delays", [])]
-        if retry_info.get("last_error"):
-            ordered_result["eo.meta.retry-last-error"] = retry_info.get("last_error")
+# ======================================================================
+# Streaming Body Drain
+# ======================================================================
+def _new_body_drain_state(hash_algorithm: Optional[str]) -> Dict[str, Any]:
+    return {
+        "bytes_read": 0,
+        "truncated": False,
+        "hasher": hashlib.new(hash_algorithm) if hash_algorithm else None,
+    }
+
+
+def _consume_body_chunk(state: Dict[str, Any], chunk: bytes, max_bytes: Optional[int]) -> bool:
+    """
+    Count (and optionally hash) one body chunk without keeping it
+
+    Returns:
+        bool: True to continue reading, False when max_bytes has been reached
+    """
+    if max_bytes is not None and state["bytes_read"] + len(chunk) > max_bytes:
+        chunk = chunk[:max_bytes - state["bytes_read"]]
+        state["truncated"] = True
+    state["bytes_read"] += len(chunk)
+    if state["hasher"] is not None:
+        state["hasher"].update(chunk)
+    return not state["truncated"]
+
+
+def _finish_body_drain(state: Dict[str, Any], hash_algorithm: Optional[str]) -> Dict[str, Any]:
+    content_hash = None
+    if state["hasher"] is not None and not state["truncated"]:
+        content_hash = f"{hash_algorithm}:{state['hasher'].hexdigest()}"
+    return {
+        "bytes_read": state["bytes_read"],
+        "truncated": state["truncated"],
+        "content_hash": content_hash,
+    }
+
+
+def _drain_response_body(
+    response: requests.Response,
+    *,
+    max_bytes: Optional[int] = BODY_DRAIN_MAX_BYTES,
+    hash_algorithm: Optional[str] = BODY_DRAIN_HASH_ALGORITHM,
+) -> Dict[str, Any]:
+    """
+    Download response body in fixed-size chunks with constant memory (stream=True response)
+
+    Byte count is the decoded body size (same as len(response.content)).
+
+    Returns:
+        Dict with keys "bytes_read" (int), "truncated" (bool: stopped at max_bytes),
+        "content_hash" ("<algorithm>:<hexdigest>" or None)
+    """
+    state = _new_body_drain_state(hash_algorithm)
+    for chunk in response.iter_content(chunk_size=BODY_DRAIN_CHUNK_SIZE):
+        if not _consume_body_chunk(state, chunk, max_bytes):
+            break
+    return _finish_body_drain(state, hash_algorithm)
+
+
+# ======================================================================
+# Cold Start (lazy SDK import, secret prefetch, eo.meta.cold-start-*)
+# ======================================================================
+def _record_cold_start_timing(name: str, elapsed_ms: float) -> None:
+    """
+    Record a cold start phase (reported once as eo.meta.cold-start-<name>-ms)
+    """
+    with _cold_start_lock:
+        if not _cold_start_reported:
+            _cold_start_timings[name] = elapsed_ms
+
+
+def _mark_cold_start_init_done() -> None:
+    """
+    Record module import / init time (call at the end of the platform handler module)
+
+    imports: _01_imports.py (stdlib, requests, aiohttp, platform framework)
+    init: core + extensions + handler module body (rule pack compile, registration, etc.)
+    """
+    init_end = time.perf_counter()
+    _record_cold_start_timing("imports", (_COLD_START_IMPORT_END - _COLD_START_IMPORT_BEGIN) * 1000)
+    _record_cold_start_timing("init", (init_end - _COLD_START_IMPORT_END) * 1000)
+
+
+def _start_secret_prefetch(get_secret: Callable[[], str]) -> None:
+    """
+    Fetch the request secret in a background thread during instance init (COLD_START_SECRET_PREFETCH)
+
+    get_secret is the platform secret getter (caches the value on success).
+    Failures are logged only; the request path calls the getter again and reports the error.
+    """
+    global _secret_prefetch_thread
+    if not COLD_START_SECRET_PREFETCH or _secret_prefetch_thread is not None:
+        return
+
+    def prefetch() -> None:
+        try:
+            get_secret()
+        except Exception as e:
+            logging.warning(f"Secret prefetch failed (will retry on request): {str(e)}")
+
+    _secret_prefetch_thread = threading.Thread(target=prefetch, name="eo-secret-prefetch", daemon=True)
+    _secret_prefetch_thread.start()
+
+
+def _wait_secret_prefetch() -> None:
+    """
+    Wait for the background secret prefetch (if still running) before using the secret getter
+    """
+    prefetch_thread = _secret_prefetch_thread
+    if prefetch_thread is None or not prefetch_thread.is_alive():
+        return
+    wait_start = time.perf_counter()
+    prefetch_thread.join(timeout=COLD_START_SECRET_WAIT_TIMEOUT)
+    _record_cold_start_timing("secret-wait", (time.perf_counter() - wait_start) * 1000)
+
+
+def _pop_cold_start_info() -> Optional[Dict[str, float]]:
+    """
+    Return cold start timings once per instance (first warmup result), otherwise None
+    """
+    global _cold_start_reported
+    if _cold_start_reported:
+        return None
+    with _cold_start_lock:
+        if _cold_start_reported or not _cold_start_timings:
+            return None
+        _cold_start_reported = True
+        return dict(_cold_start_timings)
+
+
+# ======================================================================
+# Instance Metadata (cached, background refresh)
+# ======================================================================
+def _init_instance_metadata(
+    fallback: Dict[str, Optional[str]],
+    fetcher: Optional[Callable[[], Dict[str, Optional[str]]]] = None,
+) -> None:
+    """
+    Register instance metadata fallback values and optional fetcher (call once at handler module init)
+
+    Args:
+        fallback: Values available without I/O (environment variables), keys: region / instance_id / project_id
+        fetcher: Function returning metadata from the platform (may block; always run in background).
+                 Non-empty values override the fallback.
+    """
+    global _instance_metadata_fetcher, _instance_metadata_next_refresh
+    with _instance_metadata_lock:
+        _instance_metadata.update({k: v for k, v in fallback.items() if v})
+        _instance_metadata_fetcher = fetcher
+        _instance_metadata_next_refresh = 0.0
+    _refresh_instance_metadata_in_background()
+
+
+def _refresh_instance_metadata_in_background() -> None:
+    """
+    Start background metadata fetch if a fetcher is registered and the cache is due for refresh
+    """
+    global _instance_metadata_refreshing
+    if _instance_metadata_fetcher is None:
+        return
+    with _instance_metadata_lock:
+        if _instance_metadata_refreshing or time.monotonic() < _instance_metadata_next_refresh:
+            return
+        _instance_metadata_refreshing = True
+
+    def refresh() -> None:
+        global _instance_metadata_refreshing, _instance_metadata_next_refresh
+        interval = INSTANCE_METADATA_RETRY_INTERVAL
+        try:
+            fetched = _instance_metadata_fetcher() or {}
+            with _instance_metadata_lock:
+                _instance_metadata.update({k: v for k, v in fetched.items() if v})
+            if fetched and all(fetched.values()):
+                interval = INSTANCE_METADATA_REFRESH_INTERVAL
+        except Exception as e:
+            logging.warning(f"Instance metadata fetch failed (using cached/fallback values): {str(e)}")
+        finally:
+            with _instance_metadata_lock:
+                _instance_metadata_next_refresh = time.monotonic() + interval
+                _instance_metadata_refreshing = False
+
+    threading.Thread(target=refresh, name="eo-instance-metadata", daemon=True).start()
+
+
+def _get_instance_metadata() -> Dict[str, Optional[str]]:
+    """
+    Get cached instance metadata (never blocks; schedules a background refresh when due)
+
+    Returns:
+        Dict with keys "region", "instance_id", "project_id" (None if unknown)
+    """
+    _refresh_instance_metadata_in_background()
+    with _instance_metadata_lock:
+        return dict(_instance_metadata)
+
+
+# ======================================================================
+# Phase Timing (eo.meta.timing.*)
+# ======================================================================
+def _build_phase_timing(
+    connection_timing_ms: Optional[Dict[str, Optional[float]]],
+    download_ms: Optional[float],
+    retry_info: Optional[Dict[str, Any]],
+) -> Dict[str, Optional[float]]:
+    """
+    Build phase timing breakdown of the final request (after retries and redirects)
+
+    Phases (ms): dns / connect / tls / request-sent / first-byte / download / retry-wait
+        - dns, connect, tls: 0 when the keep-alive connection was reused
+        - tls: None for http:// (and for the async engine, where connect includes TLS)
+        - first-byte: request fully sent -> response headers received (server processing + RTT)
+        - retry-wait: measured backoff sleep before the final attempt (jitter / Retry-After applied)
+    """
+    connection_timing_ms = connection_timing_ms or {}
+    retry_info = retry_info or {}
+    retry_wait_s = retry_info.get("retry_sleep_s")
+    if retry_wait_s is None:
+        retry_wait_s = sum(retry_info.get("retry_delays") or [])
+    return {
+        "dns": connection_timing_ms.get("dns"),
+        "connect": connection_timing_ms.get("connect"),
+        "tls": connection_timing_ms.get("tls"),
+        "request-sent": connection_timing_ms.get("request_sent"),
+        "first-byte": connection_timing_ms.get("first_byte"),
+        "download": download_ms,
+        "retry-wait": float(retry_wait_s) * 1000,
+    }
+
+
+# ======================================================================
+# Build Flat Result
+# ======================================================================
+def _build_flat_result(
+    *,
+    status_code: Optional[int],
+    status_message: str,
+    duration_ms: float,
+    initial_response_ms: Optional[float] = None,
+    content_length_bytes: Optional[int] = None,
+    target_url: str,
+    http_request_number: Optional[Any] = None,
+    http_request_uuid: Optional[str] = None,
+    http_request_round_id: Optional[int] = None,
+    req_headers: Dict[str, str],
+    res_headers: Dict[str, str],
+    tls_version: Optional[str] = None,
+    http_protocol_version: Optional[str] = None,
+    request_start_timestamp: Optional[float] = None,
+    request_end_timestamp: Optional[float] = None,
+    execution_id: Optional[str] = None,
+    from_area: Optional[str] = None,
+    redirect_count: int = 0,
+    urltype: Optional[str] = None,
+    retry_info: Optional[Dict[str, Any]] = None,
+    connection_reused: Optional[bool] = None,
+    phase_timing: Optional[Dict[str, Optional[float]]] = None,
+    body_truncated: bool = False,
+    content_hash: Optional[str] = None,
+    http_request_method: str = "GET",
+    warmup_strategy: Optional[str] = None,
+    warmup_strategy_applied: Optional[str] = None,
+    circuit_state: Optional[str] = None,
+    host_limit_wait_s: Optional[float] = None,
+    handshake_info: Optional[Dict[str, Any]] = None,
+    res_headers_lower: Optional[Dict[str, str]] = None,
+    cdn_info: Optional[Dict[str, Any]] = None,
+    eviction_info: Optional[Dict[str, Any]] = None,
+    revalidation_info: Optional[Dict[str, Any]] = None,
+    revalidation_skipped: bool = False,
+    cold_start_info: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Build response in flat JSON structure (Pure HTTP Focus)
+    All keys are normalized to lowercase.
+
+    Reads no process state: eviction_info (_detect_eviction), revalidation_info
+    (_record_revalidation, its "content-hash" replaces content_hash) and cold_start_info
+    (_pop_cold_start_info) are taken by the caller. res_headers_lower / cdn_info are
+    computed here when not passed.
+    """
+    if not from_area:
+        raise RuntimeError("from_area parameter is required - must be passed from platform handler")
+
+    protocol_value = http_protocol_version or "unknown"
+    tls_version_value = tls_version or "unknown"
+
+    ordered_result = {}
+
+    # ==================================================================
+    # 1. Basic HTTP Information
+    # ==================================================================
+    ordered_result["headers.general.status-code"] = status_code
+    ordered_result["headers.general.status-message"] = status_message
+    ordered_result["headers.general.request-url"] = target_url
+    ordered_result["headers.general.http-request-method"] = http_request_method
+
+    # ==================================================================
+    # 2. Request Identification Information
+    # ==================================================================
+    if http_request_number is not None:
+        ordered_result["eo.meta.http-request-number"] = http_request_number
+    if http_request_uuid is not None:
+        ordered_result["eo.meta.http-request-uuid"] = http_request_uuid
+    if http_request_round_id is not None:
+        ordered_result["eo.meta.http-request-round-id"] = http_request_round_id
+    if urltype is not None:
+        ordered_result["eo.meta.urltype"] = urltype
+
+    # ==================================================================
+    # 3. Execution Environment / Timestamp Information
+    # ==================================================================
+    ordered_result["eo.meta.re-area"] = from_area
+    if execution_id is not None:
+        ordered_result["eo.meta.execution-id"] = execution_id
+    if request_start_timestamp is not None:
+        ordered_result["eo.meta.request-start-timestamp"] = request_start_timestamp
+    if request_end_timestamp is not None:
+        ordered_result["eo.meta.request-end-timestamp"] = request_end_timestamp
+    # First warmup result of this instance only (cold start breakdown)
+    if cold_start_info is not None:
+        ordered_result["eo.meta.cold-start"] = True
+        for phase_name, phase_ms in cold_start_info.items():
+            ordered_result[f"eo.meta.cold-start-{phase_name}-ms"] = round(phase_ms, 2)
+
+    # ==================================================================
+    # 4. Protocol Information
+    # ==================================================================
+    ordered_result["eo.meta.http-protocol-version"] = protocol_value
+    ordered_result["eo.meta.tls-version"] = tls_version_value
+    if connection_reused is not None:
+        ordered_result["eo.meta.connection-reused"] = connection_reused
+    if handshake_info:
+        # Handshake of the connection that served the final request (also when it was reused)
+        if handshake_info.get("tls_cipher") is not None:
+            ordered_result["eo.meta.tls-cipher"] = handshake_info["tls_cipher"]
+        if handshake_info.get("tls_alpn") is not None:
+            ordered_result["eo.meta.tls-alpn"] = handshake_info["tls_alpn"]
+        if handshake_info.get("tls_session_resumed") is not None:
+            ordered_result["eo.meta.tls-session-resumed"] = handshake_info["tls_session_resumed"]
+        if handshake_info.get("tls_handshake_ms") is not None:
+            ordered_result["eo.meta.tls-handshake-ms"] = round(handshake_info["tls_handshake_ms"], 2)
+        if handshake_info.get("peer_ip") is not None:
+            ordered_result["eo.meta.peer-ip"] = handshake_info["peer_ip"]
+        if handshake_info.get("dns_cache_hit") is not None:
+            ordered_result["eo.meta.dns-cache-hit"] = handshake_info["dns_cache_hit"]
+
+    # ==================================================================
+    # 5. CDN Detection (Core capability)
+    # ==================================================================
+    # Response header names are lowercased once and shared with extensions
+    if res_headers_lower is None:
+        res_headers_lower = _normalize_headers(res_headers)
+    if cdn_info is None:
+        cdn_info = _detect_cdn(res_headers, res_headers_lower)
+    if cdn_info["cdn-header-name"] is not None:
+        ordered_result["eo.meta.cdn-header-name"] = cdn_info["cdn-header-name"]
+        ordered_result["eo.meta.cdn-header-value"] = cdn_info["cdn-header-value"]
+    if cdn_info["cdn-cache-status"] is not None:
+        ordered_result["eo.meta.cdn-cache-status"] = cdn_info["cdn-cache-status"]
+        ordered_result["eo.meta.cdn-cache-status-normalized"] = cdn_info["cdn-cache-status-normalized"]
+    if cdn_info["cdn-pop"] is not None:
+        ordered_result["eo.meta.cdn-pop"] = cdn_info["cdn-pop"]
+    if cdn_info["cdn-detected"]:
+        ordered_result["eo.meta.cdn-detected"] = ", ".join(cdn_info["cdn-detected"])
+    if eviction_info is not None:
+        if eviction_info["cdn-ttl"] is not None:
+            ordered_result["eo.meta.cdn-ttl"] = eviction_info["cdn-ttl"]
+        if eviction_info["eviction-alert"] is not None:
+            ordered_result["eo.meta.eviction-alert"] = eviction_info["eviction-alert"]
+
+    # ==================================================================
+    # 6. Measurements
+    # ==================================================================
+    if duration_ms is not None:
+        ordered_result["eo.meta.duration-ms"] = round(duration_ms, 2)
+    if initial_response_ms is not None:
+        ordered_result["eo.meta.ttfb-ms"] = round(initial_response_ms, 2)
+    if phase_timing:
+        for phase_name, phase_ms in phase_timing.items():
+            if phase_ms is not None:
+                ordered_result[f"eo.meta.timing.{phase_name}-ms"] = round(phase_ms, 2)
+    if content_length_bytes is not None:
+        ordered_result["eo.meta.actual-content-length"] = content_length_bytes
+    if body_truncated:
+        ordered_result["eo.meta.body-truncated"] = True
+    if revalidation_info is not None:
+        content_hash = revalidation_info["content-hash"]
+    if content_hash is not None:
+        ordered_result["eo.meta.content-hash"] = content_hash
+    if revalidation_info is not None:
+        if revalidation_info["revalidated"] is not None:
+            ordered_result["eo.meta.revalidated"] = revalidation_info["revalidated"]
+        if revalidation_info["content-changed"] is not None:
+            ordered_result["eo.meta.content-changed"] = revalidation_info["content-changed"]
+    if revalidation_skipped:
+        ordered_result["eo.meta.revalidation-skipped"] = True
+    if warmup_strategy is not None:
+        ordered_result["eo.meta.warmup-strategy"] = warmup_strategy
+    if warmup_strategy_applied is not None:
+        ordered_result["eo.meta.warmup-strategy-applied"] = warmup_strategy_applied
+    ordered_result["eo.meta.redirect-count"] = redirect_count
+    if retry_info:
+        ordered_result["eo.meta.retry-attempts"] = retry_info.get("retry_attempts", 0)
+        if retry_info.get("retry_delays"):
+            ordered_result["eo.meta.retry-delays-ms"] = [round(d * 1000, 2) for d in retry_info.get("retry_delays", [])]
+        if retry_info.get("last_error"):
+            ordered_result["eo.meta.retry-last-error"] = retry_info.get("last_error")
+        if retry_info.get("stop_reason"):
+            ordered_result["eo.meta.retry-stop-reason"] = retry_info.get("stop_reason")
+        if duration_ms is not None:
+            # Time spent fetching (duration excluding backoff sleeps)
+            retry_sleep_ms = retry_info.get("retry_sleep_s", 0.0) * 1000
+            ordered_result["eo.meta.fetch-ms"] = round(max(duration_ms - retry_sleep_ms, 0.0), 2)
+    if circuit_state is not None:
+        ordered_result["eo.meta.circuit-state"] = circuit_state
+    if host_limit_wait_s is not None:
+        ordered_result["eo.meta.host-limit-wait-ms"] = round(host_limit_wait_s * 1000, 2)
 
     # ==================================================================
     # 7. Extensions (eo.security.* etc.)
@@ -575,6 +2328,7 @@ def _build_flat_result(
     extension_context = {
         "target_url": target_url,
         "res_headers": res_headers,
+        "res_headers_lower": res_headers_lower,
     }
 
     for ext_name in _EXTENSION_REGISTRY:
@@ -594,3 +2348,1548 @@ def _build_flat_result(
         ordered_result[f"headers.response-headers.{key.lower()}"] = res_headers[key]
 
     return ordered_result
+
+
+# ======================================================================
+# Warmup Execution (shared pre-fetch / post-fetch around an engine fetch adapter)
+# ======================================================================
+# The fetch engines (sync / async / HTTP/2) differ only in their fetch adapter
+# (_fetch_sync / _fetch_async / _fetch_http2): send the request with retry and return the
+# response status, headers, protocol / TLS / connection info and the drained body.
+# Everything before and after the fetch is done once here for all engines.
+_SKIPPED_BODY_INFO = {"bytes_read": 0, "truncated": False, "content_hash": None}
+
+
+class _WarmupRun:
+    """
+    State of one warmup request shared by the fetch engines
+
+    begin() -> (per-host limiter) start_fetch() -> engine fetch adapter -> finish() / fail()
+    - begin(): warmup strategy, revalidation (skip / conditional headers), circuit breaker
+    - start_fetch(): per-host limiter result, TTFB start
+    - finish(): circuit result, phase timing, flat result of the fetched response
+    - fail(): circuit result, flat result of a request error after retries
+    begin() / start_fetch() return a result when no request is sent, else None.
+    """
+
+    def __init__(
+        self,
+        *,
+        target_url: str,
+        req_headers: Dict[str, str],
+        start_time: float,
+        from_area: str,
+        execution_id: Optional[str] = None,
+        http_request_number: Optional[Any] = None,
+        http_request_uuid: Optional[str] = None,
+        http_request_round_id: Optional[int] = None,
+        urltype: Optional[str] = None,
+        warmup_strategy: Optional[str] = None,
+    ) -> None:
+        self.target_url = target_url
+        self.req_headers = req_headers
+        self.start_time = start_time
+        self.from_area = from_area
+        self.execution_id = execution_id
+        self.http_request_number = http_request_number
+        self.http_request_uuid = http_request_uuid
+        self.http_request_round_id = http_request_round_id
+        self.urltype = urltype
+        self.warmup_strategy = warmup_strategy
+        self.host = _get_request_host(target_url)
+        self.strategy: Optional[Dict[str, Any]] = None
+        self.http_request_method = "GET"
+        self.revalidation: Optional[Dict[str, Any]] = None
+        self.circuit_state: Optional[str] = None
+        self.host_limit_wait_s: Optional[float] = None
+        self.http_request_start_time: Optional[float] = None
+        self.retry_info: Optional[Dict[str, Any]] = None  # Set by the fetch adapter once the request returned
+
+    def _item_fields(self) -> Dict[str, Any]:
+        return {
+            "target_url": self.target_url,
+            "req_headers": self.req_headers,
+            "from_area": self.from_area,
+            "execution_id": self.execution_id,
+            "http_request_number": self.http_request_number,
+            "http_request_uuid": self.http_request_uuid,
+            "http_request_round_id": self.http_request_round_id,
+            "urltype": self.urltype,
+        }
+
+    def begin(self) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Pre-fetch checks before the per-host limiter
+
+        Returns:
+            (status code, flat result) when no request is sent, else None
+        """
+        # ==================================================================
+        # Warmup strategy (HTTP method / Range header / body download plan)
+        # ==================================================================
+        try:
+            self.strategy = _parse_warmup_strategy(self.warmup_strategy)
+        except ValueError as e:
+            return _build_invalid_warmup_strategy_result(e, self.start_time, **self._item_fields())
+        self.http_request_method, self.req_headers = _build_warmup_request(self.strategy, self.req_headers)
+
+        # ==================================================================
+        # Revalidation (skip a recently HIT immutable asset / conditional GET)
+        # ==================================================================
+        self.revalidation = _plan_revalidation(self.target_url, self.strategy, self.req_headers, self.start_time)
+        if self.revalidation is not None:
+            if self.revalidation["skip"] is not None:
+                return _build_revalidation_skipped_result(
+                    self.revalidation,
+                    self.start_time,
+                    warmup_strategy=self.strategy["name"],
+                    **self._item_fields(),
+                )
+            self.req_headers = self.revalidation["req_headers"]
+
+        # ==================================================================
+        # Circuit breaker (fail fast while the host is failing)
+        # ==================================================================
+        self.circuit_state = _acquire_circuit(self.host)
+        if self.circuit_state == CIRCUIT_STATE_OPEN:
+            return _build_circuit_open_result(
+                self.host,
+                self.start_time,
+                http_request_method=self.http_request_method,
+                warmup_strategy=self.strategy["name"],
+                **self._item_fields(),
+            )
+        return None
+
+    def start_fetch(self, host_limit_wait_s: Optional[float]) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Record the per-host limiter result (slot held until finish() / fail())
+
+        Args:
+            host_limit_wait_s: Seconds waited for the slot (_acquire_host_slot), None = no slot
+
+        Returns:
+            (status code, flat result) when no slot was free (HOST_LIMIT_TIMEOUT), else None
+        """
+        if host_limit_wait_s is None:
+            return _build_host_limit_timeout_result(
+                self.host,
+                self.start_time,
+                http_request_method=self.http_request_method,
+                warmup_strategy=self.strategy["name"],
+                circuit_state=self.circuit_state,
+                **self._item_fields(),
+            )
+        self.host_limit_wait_s = host_limit_wait_s
+
+        # initial_response_ms (Time To First Byte) measurement (starts after the limiter wait)
+        # Definition: Time from sending HTTP request to receiving response headers from server
+        # Includes: DNS lookup, TCP connection, TLS handshake, server processing, network latency
+        # Measurement: every fetch adapter streams the response (returns at headers-received)
+        self.http_request_start_time = time.time()
+        return None
+
+    def plan_body_download(self, res_headers: Dict[str, str]) -> Dict[str, Any]:
+        """Body download plan of the response (see _plan_body_download)"""
+        return _plan_body_download(self.strategy, res_headers)
+
+    def finish(self, fetched: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        Build flat result of a fetched response
+
+        Args:
+            fetched: Fetch adapter result with keys "status_code", "status_message", "res_headers",
+                "redirect_count", "connection_info" (http_protocol_version / tls_version /
+                connection_reused / timing_ms / handshake), "ttfb_end", "end_time", "body_plan"
+                and "body_info" (None if the body was not downloaded)
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: (200, flat result)
+        """
+        status_code = fetched["status_code"]
+        connection_info = fetched["connection_info"]
+        body_plan = fetched["body_plan"]
+        body_info = fetched["body_info"] or _SKIPPED_BODY_INFO
+        ttfb_end = fetched["ttfb_end"]
+        end_time = fetched["end_time"]
+        phase_timing = _build_phase_timing(
+            connection_info.get("timing_ms"),
+            (end_time - ttfb_end) * 1000,
+            self.retry_info,
+        )
+
+        # Process state (circuit / eviction history / revalidation / cold start report) is
+        # recorded here, _build_flat_result only formats the values
+        _record_circuit_result(self.host, status_code not in CIRCUIT_FAILURE_STATUS_CODES)
+        res_headers = fetched["res_headers"]
+        res_headers_lower = _normalize_headers(res_headers)
+        cdn_info = _detect_cdn(res_headers, res_headers_lower)
+        cache_status = cdn_info["cdn-cache-status-normalized"]
+        eviction_info = None
+        if EVICTION_DETECTION_ENABLED and cache_status is not None:
+            eviction_info = _detect_eviction(
+                self.target_url, cache_status, cdn_info["cdn-pop"], res_headers_lower, end_time,
+            )
+        revalidation_info = None
+        if self.revalidation is not None:
+            revalidation_info = _record_revalidation(
+                self.target_url,
+                status_code,
+                cache_status,
+                res_headers_lower,
+                body_info["content_hash"],
+                body_info["truncated"],
+                self.revalidation,
+                end_time,
+            )
+
+        return 200, _build_flat_result(
+            status_code=status_code,
+            status_message=fetched["status_message"] or "OK",
+            duration_ms=(end_time - self.start_time) * 1000,
+            initial_response_ms=(ttfb_end - self.http_request_start_time) * 1000,
+            content_length_bytes=body_info["bytes_read"] if body_plan["download"] else None,
+            target_url=self.target_url,
+            http_request_number=self.http_request_number,
+            http_request_uuid=self.http_request_uuid,
+            http_request_round_id=self.http_request_round_id,
+            req_headers=self.req_headers,
+            res_headers=res_headers,
+            tls_version=connection_info.get("tls_version"),
+            http_protocol_version=connection_info.get("http_protocol_version"),
+            request_start_timestamp=self.http_request_start_time,
+            request_end_timestamp=end_time,
+            execution_id=self.execution_id,
+            redirect_count=fetched["redirect_count"],
+            urltype=self.urltype,
+            retry_info=self.retry_info,
+            connection_reused=connection_info.get("connection_reused"),
+            handshake_info=connection_info.get("handshake"),
+            phase_timing=phase_timing,
+            body_truncated=body_info["truncated"],
+            content_hash=body_info["content_hash"],
+            http_request_method=self.http_request_method,
+            warmup_strategy=self.strategy["name"],
+            warmup_strategy_applied=body_plan["applied"],
+            from_area=self.from_area,
+            circuit_state=self.circuit_state,
+            host_limit_wait_s=self.host_limit_wait_s,
+            res_headers_lower=res_headers_lower,
+            cdn_info=cdn_info,
+            eviction_info=eviction_info,
+            revalidation_info=revalidation_info,
+            cold_start_info=_pop_cold_start_info(),
+        )
+
+    def fail(self, exception: Exception) -> Tuple[int, Dict[str, Any]]:
+        """
+        Build flat result of a request error after retries (engine specific exception types)
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: (500, flat result)
+        """
+        _record_circuit_result(self.host, False)
+        end_time = time.time()
+        duration_ms = (end_time - self.start_time) * 1000
+        return 500, _build_flat_result(
+            status_code=500,
+            status_message=f"Request failed: {str(exception) or type(exception).__name__}",
+            duration_ms=duration_ms,
+            target_url=self.target_url,
+            http_request_number=self.http_request_number,
+            http_request_uuid=self.http_request_uuid,
+            http_request_round_id=self.http_request_round_id,
+            req_headers=self.req_headers,
+            res_headers={},
+            request_start_timestamp=self.http_request_start_time,
+            request_end_timestamp=end_time,
+            execution_id=self.execution_id,
+            redirect_count=0,
+            urltype=self.urltype,
+            retry_info=getattr(exception, "eo_retry_info", self.retry_info),
+            http_request_method=self.http_request_method,
+            warmup_strategy=self.strategy["name"],
+            from_area=self.from_area,
+            circuit_state=self.circuit_state,
+            host_limit_wait_s=self.host_limit_wait_s,
+            cold_start_info=_pop_cold_start_info(),
+        )
+
+    def release(self) -> None:
+        """Release the per-host limiter slot taken for start_fetch()"""
+        _release_host_slot(self.host)
+
+
+def _run_warmup(
+    fetch: Callable[["_WarmupRun"], Dict[str, Any]],
+    request_errors: Tuple[type, ...],
+    **warmup_job: Any,
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Run one warmup with a blocking fetch adapter (sync / HTTP/2 engine)
+
+    Args:
+        fetch: Fetch adapter (_fetch_sync / _fetch_http2)
+        request_errors: Exception types of the adapter reported as "Request failed" (500)
+        **warmup_job: _WarmupRun arguments
+    """
+    run = _WarmupRun(**warmup_job)
+    early_result = run.begin()
+    if early_result is not None:
+        return early_result
+    early_result = run.start_fetch(_acquire_host_slot(run.host))
+    if early_result is not None:
+        return early_result
+    try:
+        return run.finish(fetch(run))
+    except request_errors as e:
+        return run.fail(e)
+    finally:
+        run.release()
+
+
+def _fetch_sync(run: _WarmupRun) -> Dict[str, Any]:
+    """
+    Fetch adapter of the sync engine (requests, stream=True)
+
+    Returns:
+        Dict for _WarmupRun.finish()
+    """
+    response, run.retry_info = _execute_http_request_with_retry(
+        run.target_url,
+        run.req_headers,
+        run.http_request_method,
+    )
+    with response:
+        # stream=True: headers already received, body not yet downloaded (connection still open)
+        ttfb_end = time.time()
+        connection_info = dict(_get_connection_info(response))
+        connection_info["http_protocol_version"] = _get_http_protocol_version(response)
+        connection_info["tls_version"] = _get_tls_version(response, run.target_url)
+        res_headers = dict(response.headers)
+
+        # Download body (cache warmup): streamed in chunks and discarded (constant memory)
+        body_plan = run.plan_body_download(res_headers)
+        body_info = None
+        if body_plan["download"]:
+            body_info = _drain_response_body(response, max_bytes=body_plan["max_bytes"])
+
+        return {
+            "status_code": response.status_code,
+            "status_message": response.reason,
+            "res_headers": res_headers,
+            "redirect_count": len(response.history) if hasattr(response, 'history') else 0,
+            "connection_info": connection_info,
+            "ttfb_end": ttfb_end,
+            "end_time": time.time(),
+            "body_plan": body_plan,
+            "body_info": body_info,
+        }
+
+
+def _warmup_target(**warmup_job: Any) -> Tuple[int, Dict[str, Any]]:
+    """
+    Execute warmup HTTP request to target URL and build flat result (sync engine)
+
+    Shared by all platform handlers (single request and batch mode).
+    Input must already be validated (URL present, token verified, headers prepared).
+
+    Args (keyword only, see _WarmupRun):
+        target_url, req_headers, start_time, from_area, execution_id, http_request_number,
+        http_request_uuid, http_request_round_id, urltype,
+        warmup_strategy: warmupStrategy request option (full / head / range-first-bytes / full-if-under-<N>-bytes)
+
+    Returns:
+        Tuple[int, Dict[str, Any]]: (response status code for n8n, flat result)
+            - 200: Target URL was requested (target status is in headers.general.status-code)
+            - 200: Immutable asset HIT recently (SKIPPED_IMMUTABLE, status-code null, no request sent)
+            - 400: Unknown warmupStrategy
+            - 500: Request failed after retries
+            - 503: Circuit open for the target host (CIRCUIT_OPEN, no request sent)
+            - 503: No per-host limiter slot within HOST_LIMIT_MAX_WAIT (HOST_LIMIT_TIMEOUT, no request sent)
+    """
+    return _run_warmup(_fetch_sync, (requests.exceptions.RequestException,), **warmup_job)
+
+
+def _build_invalid_warmup_strategy_result(
+    exception: ValueError,
+    start_time: float,
+    *,
+    target_url: str,
+    req_headers: Dict[str, str],
+    from_area: str,
+    execution_id: Optional[str] = None,
+    http_request_number: Optional[Any] = None,
+    http_request_uuid: Optional[str] = None,
+    http_request_round_id: Optional[int] = None,
+    urltype: Optional[str] = None,
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Build flat result for unknown warmupStrategy (no request is sent)
+    """
+    logging.warning(str(exception))
+    end_time = time.time()
+    duration_ms = (end_time - start_time) * 1000
+    return 400, _build_flat_result(
+        status_code=400,
+        status_message="INVALID_WARMUP_STRATEGY",
+        duration_ms=duration_ms,
+        target_url=target_url,
+        http_request_number=http_request_number,
+        http_request_uuid=http_request_uuid,
+        http_request_round_id=http_request_round_id,
+        req_headers=req_headers,
+        res_headers={},
+        request_start_timestamp=start_time,
+        request_end_timestamp=end_time,
+        execution_id=execution_id,
+        urltype=urltype,
+        from_area=from_area,
+    )
+
+
+def _build_circuit_open_result(
+    host: str,
+    start_time: float,
+    *,
+    target_url: str,
+    req_headers: Dict[str, str],
+    from_area: str,
+    execution_id: Optional[str] = None,
+    http_request_number: Optional[Any] = None,
+    http_request_uuid: Optional[str] = None,
+    http_request_round_id: Optional[int] = None,
+    urltype: Optional[str] = None,
+    http_request_method: str = "GET",
+    warmup_strategy: Optional[str] = None,
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Build flat result for a host whose circuit is open (no request is sent)
+    """
+    retry_in = _get_circuit_retry_in(host)
+    end_time = time.time()
+    duration_ms = (end_time - start_time) * 1000
+    return 503, _build_flat_result(
+        status_code=503,
+        status_message=f"CIRCUIT_OPEN: {host} is failing, next probe in {retry_in:.1f}s",
+        duration_ms=duration_ms,
+        target_url=target_url,
+        http_request_number=http_request_number,
+        http_request_uuid=http_request_uuid,
+        http_request_round_id=http_request_round_id,
+        req_headers=req_headers,
+        res_headers={},
+        request_start_timestamp=start_time,
+        request_end_timestamp=end_time,
+        execution_id=execution_id,
+        urltype=urltype,
+        http_request_method=http_request_method,
+        warmup_strategy=warmup_strategy,
+        from_area=from_area,
+        circuit_state=CIRCUIT_STATE_OPEN,
+    )
+
+
+def _build_host_limit_timeout_result(
+    host: str,
+    start_time: float,
+    *,
+    target_url: str,
+    req_headers: Dict[str, str],
+    from_area: str,
+    execution_id: Optional[str] = None,
+    http_request_number: Optional[Any] = None,
+    http_request_uuid: Optional[str] = None,
+    http_request_round_id: Optional[int] = None,
+    urltype: Optional[str] = None,
+    http_request_method: str = "GET",
+    warmup_strategy: Optional[str] = None,
+    circuit_state: Optional[str] = None,
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Build flat result when no slot of host was free within HOST_LIMIT_MAX_WAIT (no request is sent)
+    """
+    logging.warning(f"Host limit wait exceeded for {host} ({HOST_LIMIT_MAX_WAIT}s)")
+    end_time = time.time()
+    duration_ms = (end_time - start_time) * 1000
+    return 503, _build_flat_result(
+        status_code=503,
+        status_message=f"HOST_LIMIT_TIMEOUT: no slot for {host} within {HOST_LIMIT_MAX_WAIT}s",
+        duration_ms=duration_ms,
+        target_url=target_url,
+        http_request_number=http_request_number,
+        http_request_uuid=http_request_uuid,
+        http_request_round_id=http_request_round_id,
+        req_headers=req_headers,
+        res_headers={},
+        request_start_timestamp=start_time,
+        request_end_timestamp=end_time,
+        execution_id=execution_id,
+        urltype=urltype,
+        http_request_method=http_request_method,
+        warmup_strategy=warmup_strategy,
+        from_area=from_area,
+        circuit_state=circuit_state,
+        host_limit_wait_s=duration_ms / 1000,
+    )
+
+
+def _build_revalidation_skipped_result(
+    revalidation: Dict[str, Any],
+    start_time: float,
+    *,
+    target_url: str,
+    req_headers: Dict[str, str],
+    from_area: str,
+    execution_id: Optional[str] = None,
+    http_request_number: Optional[Any] = None,
+    http_request_uuid: Optional[str] = None,
+    http_request_round_id: Optional[int] = None,
+    urltype: Optional[str] = None,
+    warmup_strategy: Optional[str] = None,
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Build flat result for an immutable asset that was HIT recently (no request is sent)
+    """
+    end_time = time.time()
+    duration_ms = (end_time - start_time) * 1000
+    return 200, _build_flat_result(
+        status_code=None,  # No request sent: not a conditional 304 (see eo.meta.revalidated)
+        status_message=f"SKIPPED_IMMUTABLE: {revalidation['skip']}",
+        duration_ms=duration_ms,
+        target_url=target_url,
+        http_request_number=http_request_number,
+        http_request_uuid=http_request_uuid,
+        http_request_round_id=http_request_round_id,
+        req_headers=req_headers,
+        res_headers={},
+        request_start_timestamp=start_time,
+        request_end_timestamp=end_time,
+        execution_id=execution_id,
+        urltype=urltype,
+        warmup_strategy=warmup_strategy,
+        warmup_strategy_applied="skipped",
+        from_area=from_area,
+        revalidation_info=_record_revalidation(target_url, 304, None, {}, None, False, revalidation, end_time),
+        revalidation_skipped=True,
+        cold_start_info=_pop_cold_start_info(),
+    )
+
+
+# ======================================================================
+# Warmup Item Execution (single item: prepare -> warmup)
+# ======================================================================
+def _run_warmup_item(
+    data: Any,
+    prepare_item: Callable[[Any, float], Tuple[Optional[Tuple[int, Dict[str, Any]]], Optional[Dict[str, Any]]]],
+    *,
+    from_area: str,
+    execution_id: Optional[str] = None,
+    fetch_engine: str = FETCH_ENGINE_SYNC,
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Process one warmup item (one {targetUrl, tokenCalculatedByN8n, ...} object)
+
+    Args:
+        data: One item of the event / JSON body
+        prepare_item: Platform-specific function (data, start_time) -> (error_response, warmup_job)
+            - error_response: (status code, flat result) when validation / token verification failed
+            - warmup_job: keyword arguments for _warmup_target() when the item is valid
+        from_area: Request Engine area (used for unexpected error result)
+        execution_id: Execution ID (used for unexpected error result)
+        fetch_engine: FETCH_ENGINE_ASYNC uses _warmup_target_on_async_loop, FETCH_ENGINE_HTTP2
+            _warmup_target_http2, FETCH_ENGINE_SYNC _warmup_target (async / HTTP/2 fall back to
+            sync if aiohttp / httpx is not installed)
+
+    Returns:
+        Tuple[int, Dict[str, Any]]: (response status code for n8n, flat result)
+    """
+    start_time = time.time()
+    if fetch_engine == FETCH_ENGINE_ASYNC and aiohttp is not None:
+        warmup_target = _warmup_target_on_async_loop
+    elif fetch_engine == FETCH_ENGINE_HTTP2 and httpx is not None:
+        warmup_target = _warmup_target_http2
+    else:
+        warmup_target = _warmup_target
+    try:
+        error_response, warmup_job = prepare_item(data, start_time)
+        if error_response is not None:
+            return error_response
+        return warmup_target(start_time=start_time, **warmup_job)
+    except Exception as e:
+        return _build_internal_error_result(data, e, start_time, from_area=from_area, execution_id=execution_id)
+
+
+def _build_internal_error_result(
+    data: Any,
+    exception: Exception,
+    start_time: float,
+    *,
+    from_area: str,
+    execution_id: Optional[str] = None,
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Build flat result for unexpected error while processing one warmup item
+    """
+    logging.error(f"Unexpected error: {str(exception)}")
+    end_time = time.time()
+    duration_ms = (end_time - start_time) * 1000
+    item = data if isinstance(data, dict) else {}
+    input_headers = item.get("headersForTargetUrl") if isinstance(item.get("headersForTargetUrl"), dict) else {}
+    return 500, _build_flat_result(
+        status_code=500,
+        status_message=f"Internal error: {str(exception)}",
+        duration_ms=duration_ms,
+        target_url=item.get("targetUrl") or "",
+        http_request_number=item.get("httpRequestNumber"),
+        http_request_uuid=item.get("httpRequestUUID"),
+        http_request_round_id=item.get("httpRequestRoundID"),
+        req_headers=input_headers,
+        res_headers={},
+        request_start_timestamp=start_time,
+        request_end_timestamp=end_time,
+        execution_id=execution_id,
+        redirect_count=0,
+        urltype=item.get("urltype"),
+        retry_info=None,  # No retry info for unexpected errors
+        from_area=from_area,
+    )
+
+
+# ======================================================================
+# Batch Execution (multiple items per invocation)
+# ======================================================================
+def _run_warmup_batch(
+    items: List[Any],
+    prepare_item: Callable[[Any, float], Tuple[Optional[Tuple[int, Dict[str, Any]]], Optional[Dict[str, Any]]]],
+    *,
+    from_area: str,
+    execution_id: Optional[str] = None,
+    fetch_engine: str = FETCH_ENGINE_SYNC,
+) -> List[Dict[str, Any]]:
+    """
+    Process multiple warmup items concurrently (batch mode)
+
+    - FETCH_ENGINE_SYNC: Items are fetched in parallel threads, limited by BATCH_MAX_CONCURRENCY.
+    - FETCH_ENGINE_ASYNC: Items are fetched on the shared asyncio event loop, limited by
+      ASYNC_MAX_CONCURRENCY (falls back to sync if aiohttp is not installed).
+    - FETCH_ENGINE_HTTP2: Same threads as sync, requests share the HTTP/2 client
+      (same-origin items are multiplexed on one connection).
+
+    One flat result is returned per item, in the same order as the input items.
+    A failure of one item does not affect the other items.
+
+    Returns:
+        List[Dict[str, Any]]: Flat results (same order as items)
+    """
+    if fetch_engine == FETCH_ENGINE_ASYNC and aiohttp is not None:
+        return _run_warmup_batch_async(items, prepare_item, from_area=from_area, execution_id=execution_id)
+
+    max_workers = max(1, min(BATCH_MAX_CONCURRENCY, len(items)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        responses = list(executor.map(
+            lambda item: _run_warmup_item(
+                item, prepare_item, from_area=from_area, execution_id=execution_id, fetch_engine=fetch_engine,
+            ),
+            items,
+        ))
+    return [result for _, result in responses]
+
+
+# ======================================================================
+# Request Pipeline (platform-neutral handler logic)
+# ======================================================================
+class _RequestPipeline:
+    """
+    Platform-neutral request pipeline shared by all platform handlers
+
+    normalize event -> validate item -> verify token -> prepare headers -> warmup -> flat result(s)
+
+    Platform handlers are thin adapters: they supply the request secret getter, the EO
+    identification header and the fetch engine, pass in the parsed event / JSON body,
+    and wrap the returned (status code, body) in their platform response:
+    - AWS Lambda: return dict
+    - Azure Functions: return func.HttpResponse(...)
+    - GCP Cloud Run: return jsonify(...), status_code
+    """
+
+    def __init__(
+        self,
+        *,
+        get_request_secret: Callable[[], str],
+        eo_header_name: str,
+        eo_header_value: str,
+        fetch_engine: str = FETCH_ENGINE_SYNC,
+    ) -> None:
+        """
+        Args:
+            get_request_secret: Platform secret getter (cached, raises on failure)
+            eo_header_name / eo_header_value: EO identification header added to target requests
+            fetch_engine: FETCH_ENGINE_SYNC / FETCH_ENGINE_ASYNC / FETCH_ENGINE_HTTP2
+        """
+        self.get_request_secret = get_request_secret
+        self.eo_header_name = eo_header_name
+        self.eo_header_value = eo_header_value
+        self.fetch_engine = fetch_engine
+
+    def handle(
+        self,
+        payload: Any,
+        *,
+        from_area: Optional[str],
+        execution_id: Optional[str] = None,
+    ) -> Tuple[int, Any]:
+        """
+        Process one invocation (event / JSON body)
+
+        Args:
+            payload: Parsed event / JSON body
+                - Object format: {targetUrl, tokenCalculatedByN8n, ...}
+                - Array format (1 item): [{...}] - uses first element
+                - Array format (2+ items): [{...}, {...}, ...] - batch mode (see BATCH_MAX_CONCURRENCY)
+            from_area: Request Engine area (region)
+            execution_id: Execution ID (platform request ID)
+
+        Returns:
+            Tuple[int, Any]: (response status code for n8n, flat result or list of flat results)
+        """
+        start_time = time.time()
+
+        def prepare_item(data: Any, item_start_time: float):
+            return self.prepare_item(data, item_start_time, from_area=from_area, execution_id=execution_id)
+
+        # ==================================================================
+        # Normalize event format
+        # ==================================================================
+        # If payload is array format, extract first element
+        # (Some integrations send in array format)
+        if isinstance(payload, list):
+            if len(payload) == 0:
+                return 400, _build_request_error_result(
+                    400, "EMPTY_EVENT_LIST", start_time, from_area=from_area, execution_id=execution_id,
+                )
+            if len(payload) > 1:
+                # Batch mode: one flat result per item
+                return 200, _run_warmup_batch(
+                    payload,
+                    prepare_item,
+                    from_area=from_area,
+                    execution_id=execution_id,
+                    fetch_engine=self.fetch_engine,
+                )
+            payload = payload[0]  # Use first element
+
+        return _run_warmup_item(
+            payload, prepare_item, from_area=from_area, execution_id=execution_id, fetch_engine=self.fetch_engine,
+        )
+
+    def prepare_item(
+        self,
+        data: Any,
+        start_time: float,
+        *,
+        from_area: Optional[str],
+        execution_id: Optional[str] = None,
+    ) -> Tuple[Optional[Tuple[int, Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        """
+        Validate one warmup item and prepare the warmup job for _warmup_target()
+
+        Returns:
+            Tuple: (error_response, warmup_job)
+                - error_response: (status code, flat result) if validation failed, otherwise None
+                - warmup_job: keyword arguments for _warmup_target() if valid, otherwise None
+        """
+        # Return error if item is not dictionary format
+        if not isinstance(data, dict):
+            return (400, _build_request_error_result(
+                400, "INVALID_EVENT_TYPE", start_time, from_area=from_area, execution_id=execution_id,
+            )), None
+
+        # ==================================================================
+        # Extract request data
+        # ==================================================================
+        target_url = data.get("targetUrl") or ""
+        token_calculated_by_n8n = data.get("tokenCalculatedByN8n")
+        input_headers = data.get("headersForTargetUrl") if isinstance(data.get("headersForTargetUrl"), dict) else {}
+        item_fields = {
+            "http_request_number": data.get("httpRequestNumber"),
+            "http_request_uuid": data.get("httpRequestUUID"),
+            "http_request_round_id": data.get("httpRequestRoundID"),
+            "urltype": data.get("urltype"),
+        }
+
+        # ==================================================================
+        # URL Validation
+        # ==================================================================
+        if not target_url:
+            return (400, _build_request_error_result(
+                400, "MISSING_URL", start_time, from_area=from_area, execution_id=execution_id, **item_fields,
+            )), None
+
+        # ==================================================================
+        # Verify n8n-generated token against token generated from platform secret
+        # ==================================================================
+        # Note: Secret is retrieved once (prefetched at cold start), subsequent calls use cached value
+        try:
+            _wait_secret_prefetch()
+            request_secret = self.get_request_secret()
+            token_calculated_by_cloud_secret = _calc_token(target_url, request_secret)  # SHA-256(url + request secret)
+        except Exception as e:
+            logging.error(f"Request Secret validation failed: {str(e)}")
+            return (500, _build_request_error_result(
+                500, "SECRET_FETCH_FAILED", start_time,
+                target_url=target_url, from_area=from_area, execution_id=execution_id, **item_fields,
+            )), None
+        if token_calculated_by_n8n != token_calculated_by_cloud_secret:
+            return (401, _build_request_error_result(
+                401, "INVALID_TOKEN", start_time,
+                target_url=target_url, from_area=from_area, execution_id=execution_id, **item_fields,
+            )), None
+
+        # ==================================================================
+        # Prepare request headers
+        # ==================================================================
+        req_headers: Dict[str, str] = dict(input_headers)
+        # Add EO identification header (for Request Engine identification)
+        req_headers[self.eo_header_name] = self.eo_header_value
+
+        return None, {
+            "target_url": target_url,
+            "req_headers": req_headers,
+            "warmup_strategy": data.get("warmupStrategy"),
+            "execution_id": execution_id,
+            "from_area": from_area,
+            **item_fields,
+        }
+
+
+def _build_request_error_result(
+    status_code: int,
+    status_message: str,
+    start_time: float,
+    *,
+    from_area: Optional[str],
+    execution_id: Optional[str] = None,
+    target_url: str = "",
+    http_request_number: Optional[Any] = None,
+    http_request_uuid: Optional[str] = None,
+    http_request_round_id: Optional[int] = None,
+    urltype: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Build flat result for a request rejected before the target URL is fetched
+    (EMPTY_EVENT_LIST / INVALID_EVENT_TYPE / MISSING_URL / INVALID_TOKEN / SECRET_FETCH_FAILED)
+    """
+    end_time = time.time()
+    duration_ms = (end_time - start_time) * 1000
+    return _build_flat_result(
+        status_code=status_code,
+        status_message=status_message,
+        duration_ms=duration_ms,
+        target_url=target_url,
+        http_request_number=http_request_number,
+        http_request_uuid=http_request_uuid,
+        http_request_round_id=http_request_round_id,
+        req_headers={},
+        res_headers={},
+        request_start_timestamp=start_time,
+        request_end_timestamp=end_time,
+        execution_id=execution_id,
+        urltype=urltype,
+        from_area=from_area,
+    )
+
+
+
+# ======================================================================
+# Async Fetch Engine (aiohttp, optional)
+# ======================================================================
+# Same inputs and same flat result output as the sync engine
+# (_execute_http_request_with_retry / _warmup_target).
+# All coroutines run on one module-level event loop in a background thread,
+# shared by all handler threads of the instance (warm invocations reuse it).
+def _get_async_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get module-level asyncio event loop (started in a daemon thread on first call)
+    """
+    global _async_loop
+    with _async_loop_lock:
+        if _async_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="eo-async-fetch", daemon=True).start()
+            atexit.register(_close_async_http_session)
+            _async_loop = loop
+        return _async_loop
+
+
+def _run_on_async_loop(coroutine: Any) -> Any:
+    """
+    Run coroutine on the shared event loop and wait for the result (called from handler threads)
+
+    The calling thread blocks until the coroutine finishes (handlers are synchronous).
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, _get_async_loop()).result()
+
+
+def _close_async_http_session() -> None:
+    """
+    Close the shared aiohttp session on interpreter exit (registered with atexit)
+    """
+    if _async_loop is None or _async_http_session is None or _async_http_session.closed:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_async_http_session.close(), _async_loop).result(timeout=2)
+    except Exception:
+        pass
+
+
+def _create_async_trace_config() -> Any:
+    """
+    Create aiohttp TraceConfig that records connection reuse, DNS cache hit and phase timestamps into trace_request_ctx
+
+    trace_request_ctx (dict) is passed per request by _execute_http_request_with_retry_async.
+    Timestamps are reset on every request start, so they describe the final redirect hop.
+    """
+    def _record(trace_config_ctx, key, value):
+        if isinstance(trace_config_ctx.trace_request_ctx, dict):
+            trace_config_ctx.trace_request_ctx[key] = value
+
+    def _record_time(name):
+        async def on_event(session, trace_config_ctx, params):
+            if isinstance(trace_config_ctx.trace_request_ctx, dict):
+                trace_config_ctx.trace_request_ctx.setdefault("timestamps", {})[name] = time.perf_counter()
+        return on_event
+
+    async def on_request_start(session, trace_config_ctx, params):
+        _record(trace_config_ctx, "timestamps", {"request_start": time.perf_counter()})
+
+    async def on_connection_create_end(session, trace_config_ctx, params):
+        await _record_time("connection_create_end")(session, trace_config_ctx, params)
+        _record(trace_config_ctx, "connection_reused", False)
+
+    async def on_connection_reuseconn(session, trace_config_ctx, params):
+        _record(trace_config_ctx, "connection_reused", True)
+
+    async def on_dns_cache_hit(session, trace_config_ctx, params):
+        _record(trace_config_ctx, "dns_cache_hit", True)
+
+    async def on_dns_cache_miss(session, trace_config_ctx, params):
+        _record(trace_config_ctx, "dns_cache_hit", False)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(_record_time("dns_start"))
+    trace_config.on_dns_resolvehost_end.append(_record_time("dns_end"))
+    trace_config.on_connection_create_start.append(_record_time("connection_create_start"))
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+    trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+    trace_config.on_request_headers_sent.append(_record_time("request_sent"))
+    trace_config.on_request_end.append(_record_time("headers_received"))
+    return trace_config
+
+
+def _build_connection_timing_async(timestamps: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """
+    Convert TraceConfig timestamps into connection phase timings (ms)
+
+    aiohttp does not signal the end of the TCP connect separately,
+    so "connect" includes the TLS handshake and "tls" is None.
+    """
+    if "headers_received" not in timestamps:
+        return {}
+    dns = 0.0
+    connect = 0.0
+    if "dns_start" in timestamps and "dns_end" in timestamps:
+        dns = timestamps["dns_end"] - timestamps["dns_start"]
+    if "connection_create_start" in timestamps and "connection_create_end" in timestamps:
+        connect = max(0.0, timestamps["connection_create_end"] - timestamps["connection_create_start"] - dns)
+    request_sent = timestamps.get("request_sent", timestamps["headers_received"])
+    send_start = max(timestamps.get("request_start", request_sent), timestamps.get("connection_create_end", 0.0))
+    return {
+        "dns": dns * 1000,
+        "connect": connect * 1000,
+        "tls": None,
+        "request_sent": max(0.0, request_sent - send_start) * 1000,
+        "first_byte": (timestamps["headers_received"] - request_sent) * 1000,
+    }
+
+
+async def _get_async_http_session() -> Any:
+    """
+    Get module-level aiohttp.ClientSession (must be called on the shared event loop)
+
+    Keep-alive connections are closed after HTTP_SESSION_IDLE_TIMEOUT seconds idle
+    (connector keepalive_timeout). Cookies are not stored (DummyCookieJar).
+    Resolved addresses are cached for DNS_CACHE_TTL; TLS sessions are resumed (_get_tls_session_context).
+    """
+    global _async_http_session
+    if _async_http_session is None or _async_http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=ASYNC_MAX_CONCURRENCY,
+            keepalive_timeout=HTTP_SESSION_IDLE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL or None,
+            use_dns_cache=DNS_CACHE_TTL > 0,
+            ssl=_get_tls_session_context(FETCH_ENGINE_ASYNC),
+        )
+        _async_http_session = aiohttp.ClientSession(
+            connector=connector,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            trace_configs=[_create_async_trace_config()],
+            timeout=aiohttp.ClientTimeout(
+                total=None,
+                sock_connect=HTTP_REQUEST_TIMEOUT,
+                sock_read=HTTP_REQUEST_TIMEOUT,
+            ),
+        )
+    return _async_http_session
+
+
+def _is_retryable_error_async(exception: Exception) -> bool:
+    """
+    Determine if async (aiohttp) error is retryable (network errors and timeouts)
+    """
+    return isinstance(exception, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+async def _sleep_before_retry_async(retry_info: Dict[str, Any], delay: float) -> None:
+    """
+    Sleep before retry on the event loop (no thread held) and record the actual sleep time
+    """
+    sleep_start = time.perf_counter()
+    await asyncio.sleep(delay)
+    retry_info["retry_sleep_s"] += time.perf_counter() - sleep_start
+    retry_info["retry_attempts"] += 1
+
+
+async def _acquire_host_slot_async(host: str) -> Optional[float]:
+    """
+    Wait for a slot of host on the event loop (async version of _acquire_host_slot, no thread held)
+    """
+    wait_start = time.monotonic()
+    while True:
+        retry_in = _try_acquire_host_slot(host)
+        if retry_in is None:
+            return time.monotonic() - wait_start
+        remaining = HOST_LIMIT_MAX_WAIT - (time.monotonic() - wait_start)
+        if remaining <= 0:
+            return None
+        await asyncio.sleep(min(retry_in, remaining))
+
+
+async def _execute_http_request_with_retry_async(
+    session: Any,
+    target_url: str,
+    headers: Dict[str, str],
+    method: str = "GET",
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Execute HTTP request with retry (async version of _execute_http_request_with_retry)
+
+    Returns when response headers are received (body not yet downloaded).
+    Same retry policy as the sync engine (_plan_retry). Backoff uses asyncio.sleep,
+    so no thread is held while waiting.
+    The caller MUST consume the body and release the response.
+
+    Connection reuse and phase timings of the last attempt are recorded by the session TraceConfig
+    and attached to the response as response.eo_connection_reused / response.eo_connection_timing.
+    """
+    retry_info = _new_retry_info()
+    host = _get_request_host(target_url)
+    deadline = time.monotonic() + RETRY_DEADLINE
+    _record_host_request(host)
+
+    for attempt in range(MAX_RETRY_ATTEMPTS + 1):
+        try:
+            trace_request_ctx: Dict[str, Any] = {}
+            attempt_timeout = _get_attempt_timeout(attempt, deadline)
+            response = await session.request(
+                method,
+                target_url,
+                headers=headers,
+                allow_redirects=True,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=attempt_timeout, sock_read=attempt_timeout),
+                trace_request_ctx=trace_request_ctx,
+            )
+            response.eo_connection_reused = trace_request_ctx.get("connection_reused")
+            response.eo_dns_cache_hit = trace_request_ctx.get("dns_cache_hit")
+            response.eo_connection_timing = _build_connection_timing_async(trace_request_ctx.get("timestamps", {}))
+
+            status_code = response.status
+
+            if status_code in RETRYABLE_STATUS_CODES:
+                delay = _plan_retry(retry_info, attempt, deadline, host, status_code, response.headers.get("Retry-After"))
+                if delay is not None:
+                    response.release()
+                    await _sleep_before_retry_async(retry_info, delay)
+                    logging.warning(f"Retry attempt {retry_info['retry_attempts']} for status {status_code}")
+                    continue
+
+            retry_info["retry_attempts"] = attempt
+            return response, retry_info
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            retry_info["last_error"] = str(e) or type(e).__name__
+
+            if _is_retryable_error_async(e):
+                delay = _plan_retry(retry_info, attempt, deadline, host)
+                if delay is not None:
+                    await _sleep_before_retry_async(retry_info, delay)
+                    continue
+            e.eo_retry_info = retry_info  # Reported in the error result
+            raise
+
+    raise RuntimeError("Maximum retry attempts reached")
+
+
+def _get_response_headers_async(response: Any) -> Dict[str, str]:
+    """
+    Get response headers as dict (same shape as dict(requests.Response.headers))
+
+    Duplicate headers (e.g. Set-Cookie) are joined with ", " like requests does.
+    """
+    res_headers: Dict[str, str] = {}
+    for key in response.headers.keys():
+        if key not in res_headers:
+            res_headers[key] = ", ".join(response.headers.getall(key))
+    return res_headers
+
+
+def _get_connection_info_async(response: Any, target_url: str) -> Dict[str, Any]:
+    """
+    Get HTTP protocol version / TLS version / connection reuse / phase timings from aiohttp response
+    (connection is still open until the body is read)
+    """
+    version = getattr(response, "version", None)
+    if version is None:
+        http_protocol_version = "ERROR: Cannot determine HTTP protocol version. The aiohttp response does not have a 'version' attribute."
+    elif version.major == 2:
+        http_protocol_version = "HTTP/2"
+    else:
+        http_protocol_version = f"HTTP/{version.major}.{version.minor}"
+
+    # response.connection is released (None) as soon as a small body is fully buffered,
+    # so fall back to the protocol object kept by the response
+    connection = getattr(response, "connection", None)
+    protocol = connection.protocol if connection is not None else getattr(response, "_protocol", None)
+    transport = getattr(protocol, "transport", None) if protocol is not None else None
+
+    # Handshake info of the transport (aiohttp reports TCP + TLS as one connect, so no handshake time)
+    handshake_info: Dict[str, Any] = {}
+    ssl_object = transport.get_extra_info("ssl_object") if transport is not None else None
+    if ssl_object is not None:
+        handshake_info.update(_get_tls_handshake_info(ssl_object))
+        _store_tls_session(ssl_object)
+    peername = transport.get_extra_info("peername") if transport is not None else None
+    if peername:
+        handshake_info["peer_ip"] = peername[0]
+    if not getattr(response, "eo_connection_reused", True):
+        handshake_info["dns_cache_hit"] = getattr(response, "eo_dns_cache_hit", None)
+
+    if not target_url.startswith("https://"):
+        tls_version = "unknown: not_https"
+    elif transport is None:
+        tls_version = "unknown: connection_not_found"
+    else:
+        tls_version = handshake_info.get("tls_version") or "unknown: sock_not_ssl"
+
+    return {
+        "http_protocol_version": http_protocol_version,
+        "tls_version": tls_version,
+        "connection_reused": getattr(response, "eo_connection_reused", None),
+        "timing_ms": getattr(response, "eo_connection_timing", None),
+        "handshake": handshake_info,
+    }
+
+
+async def _drain_response_body_async(
+    response: Any,
+    *,
+    max_bytes: Optional[int] = BODY_DRAIN_MAX_BYTES,
+    hash_algorithm: Optional[str] = BODY_DRAIN_HASH_ALGORITHM,
+) -> Dict[str, Any]:
+    """
+    Download response body in fixed-size chunks with constant memory (async version of _drain_response_body)
+    """
+    state = _new_body_drain_state(hash_algorithm)
+    async for chunk in response.content.iter_chunked(BODY_DRAIN_CHUNK_SIZE):
+        if not _consume_body_chunk(state, chunk, max_bytes):
+            break
+    return _finish_body_drain(state, hash_algorithm)
+
+
+async def _fetch_async(session: Any, run: _WarmupRun) -> Dict[str, Any]:
+    """
+    Fetch adapter of the async engine (aiohttp)
+
+    Returns:
+        Dict for _WarmupRun.finish()
+    """
+    response, run.retry_info = await _execute_http_request_with_retry_async(
+        session,
+        run.target_url,
+        run.req_headers,
+        run.http_request_method,
+    )
+    async with response:
+        # Headers received, body not yet downloaded
+        ttfb_end = time.time()
+        connection_info = _get_connection_info_async(response, run.target_url)
+        res_headers = _get_response_headers_async(response)
+
+        # Download body (cache warmup): streamed, constant memory
+        body_plan = run.plan_body_download(res_headers)
+        body_info = None
+        if body_plan["download"]:
+            body_info = await _drain_response_body_async(response, max_bytes=body_plan["max_bytes"])
+
+        return {
+            "status_code": response.status,
+            "status_message": response.reason,
+            "res_headers": res_headers,
+            "redirect_count": len(response.history),
+            "connection_info": connection_info,
+            "ttfb_end": ttfb_end,
+            "end_time": time.time(),
+            "body_plan": body_plan,
+            "body_info": body_info,
+        }
+
+
+async def _warmup_target_async(session: Any, **warmup_job: Any) -> Tuple[int, Dict[str, Any]]:
+    """
+    Execute warmup HTTP request to target URL and build flat result (async engine, see _warmup_target)
+    """
+    run = _WarmupRun(**warmup_job)
+    early_result = run.begin()
+    if early_result is not None:
+        return early_result
+    early_result = run.start_fetch(await _acquire_host_slot_async(run.host))
+    if early_result is not None:
+        return early_result
+    try:
+        return run.finish(await _fetch_async(session, run))
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return run.fail(e)
+    finally:
+        run.release()
+
+
+def _warmup_target_on_async_loop(**warmup_job: Any) -> Tuple[int, Dict[str, Any]]:
+    """
+    Run _warmup_target_async for one item on the shared event loop (single request, FETCH_ENGINE_ASYNC)
+
+    Blocks the calling handler thread until the flat result is built (see _run_on_async_loop).
+    """
+    async def run_job() -> Tuple[int, Dict[str, Any]]:
+        return await _warmup_target_async(await _get_async_http_session(), **warmup_job)
+
+    return _run_on_async_loop(run_job())
+
+
+def _run_warmup_batch_async(
+    items: List[Any],
+    prepare_item: Callable[[Any, float], Tuple[Optional[Tuple[int, Dict[str, Any]]], Optional[Dict[str, Any]]]],
+    *,
+    from_area: str,
+    execution_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Process multiple warmup items on the shared async event loop (batch mode, FETCH_ENGINE_ASYNC)
+
+    Validation / token verification (prepare_item) runs in the calling thread,
+    only the HTTP fetches run on the event loop.
+    """
+    responses: List[Optional[Tuple[int, Dict[str, Any]]]] = [None] * len(items)
+    pending_jobs: List[Tuple[int, float, Any, Dict[str, Any]]] = []
+
+    for index, data in enumerate(items):
+        start_time = time.time()
+        try:
+            error_response, warmup_job = prepare_item(data, start_time)
+        except Exception as e:
+            responses[index] = _build_internal_error_result(data, e, start_time, from_area=from_area, execution_id=execution_id)
+            continue
+        if error_response is not None:
+            responses[index] = error_response
+        else:
+            pending_jobs.append((index, start_time, data, warmup_job))
+
+    async def run_pending_jobs() -> List[Tuple[int, Dict[str, Any]]]:
+        session = await _get_async_http_session()
+
+        async def run_job(start_time: float, data: Any, warmup_job: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+            try:
+                return await _warmup_target_async(session, start_time=start_time, **warmup_job)
+            except Exception as e:
+                return _build_internal_error_result(data, e, start_time, from_area=from_area, execution_id=execution_id)
+
+        return await asyncio.gather(*(
+            run_job(start_time, data, warmup_job) for _, start_time, data, warmup_job in pending_jobs
+        ))
+
+    if pending_jobs:
+        for (index, _, _, _), response in zip(pending_jobs, _run_on_async_loop(run_pending_jobs())):
+            responses[index] = response
+
+    return [result for _, result in responses]
+
+
+# ======================================================================
+# HTTP/2 Fetch Engine (httpx, optional)
+# ======================================================================
+# Same inputs and same flat result output as the sync engine (FETCH_ENGINE_HTTP2).
+# One module-level httpx.Client (http2=True) is shared by all threads and warm invocations;
+# concurrent requests to the same origin become streams on one HTTP/2 connection.
+def _create_http2_client() -> Any:
+    """
+    Create httpx.Client with HTTP/2 enabled (HTTP/1.1 is used when the origin does not offer h2)
+    """
+    client = httpx.Client(
+        http2=True,
+        verify=_get_tls_session_context(FETCH_ENGINE_HTTP2),
+        follow_redirects=True,
+        timeout=HTTP_REQUEST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=HTTP2_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP2_MAX_CONNECTIONS,
+            keepalive_expiry=HTTP_SESSION_IDLE_TIMEOUT,
+        ),
+    )
+    client.cookies.jar.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    return client
+
+
+def _get_http2_client() -> Any:
+    """
+    Get module-level HTTP/2 client (thread-safe, same idle eviction as _get_http_session)
+    """
+    global _http2_client, _http2_client_last_used
+    with _http2_client_lock:
+        now = time.monotonic()
+        if _http2_client is not None and now - _http2_client_last_used > HTTP_SESSION_IDLE_TIMEOUT:
+            _http2_client.close()
+            _http2_client = None
+        if _http2_client is None:
+            _http2_client = _create_http2_client()
+        _http2_client_last_used = now
+        return _http2_client
+
+
+def _create_http2_trace(trace_ctx: Dict[str, Any]) -> Callable[[str, Dict[str, Any]], None]:
+    """
+    Create httpx trace callback that records phase timestamps into trace_ctx["timestamps"]
+
+    Timestamps are reset when the next redirect hop starts, so they describe the final hop.
+    No connection.* event means the request used an existing (keep-alive / HTTP/2) connection.
+    """
+    event_keys = {
+        "connection.connect_tcp.started": "connect_start",
+        "connection.connect_tcp.complete": "connect_end",
+        "connection.start_tls.started": "tls_start",
+        "connection.start_tls.complete": "tls_end",
+        "send_request_headers.started": "send_start",
+        "send_request_body.complete": "request_sent",
+        "receive_response_headers.complete": "headers_received",
+    }
+
+    def trace(event_name: str, info: Dict[str, Any]) -> None:
+        key = event_keys.get(event_name) or event_keys.get(event_name.split(".", 1)[-1])
+        if key is None:
+            return
+        timestamps = trace_ctx.setdefault("timestamps", {})
+        if "headers_received" in timestamps and key in ("connect_start", "send_start"):
+            timestamps.clear()
+        timestamps[key] = time.perf_counter()
+
+    return trace
+
+
+def _build_connection_timing_http2(timestamps: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """
+    Convert httpx trace timestamps into connection phase timings (ms)
+
+    httpx resolves DNS inside the TCP connect, so "connect" includes DNS and "dns" is None.
+    """
+    if "headers_received" not in timestamps:
+        return {}
+    connect = 0.0
+    tls = 0.0
+    if "connect_start" in timestamps and "connect_end" in timestamps:
+        connect = timestamps["connect_end"] - timestamps["connect_start"]
+    if "tls_start" in timestamps and "tls_end" in timestamps:
+        tls = timestamps["tls_end"] - timestamps["tls_start"]
+    request_sent = timestamps.get("request_sent", timestamps["headers_received"])
+    return {
+        "dns": None,
+        "connect": connect * 1000,
+        "tls": tls * 1000,
+        "request_sent": max(0.0, request_sent - timestamps.get("send_start", request_sent)) * 1000,
+        "first_byte": (timestamps["headers_received"] - request_sent) * 1000,
+    }
+
+
+def _is_retryable_error_http2(exception: Exception) -> bool:
+    """
+    Determine if httpx error is retryable (network errors, timeouts and protocol errors)
+    """
+    return isinstance(exception, httpx.TransportError)
+
+
+def _execute_http_request_with_retry_http2(
+    target_url: str,
+    headers: Dict[str, str],
+    method: str = "GET",
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Execute HTTP request with retry on the HTTP/2 client (streamed, HTTP/2 version of _execute_http_request_with_retry)
+
+    Same retry policy as the sync engine (_plan_retry).
+    The caller MUST consume the body (_drain_response_body_http2) and close the response.
+    """
+    retry_info = _new_retry_info()
+    host = _get_request_host(target_url)
+    deadline = time.monotonic() + RETRY_DEADLINE
+    _record_host_request(host)
+    client = _get_http2_client()
+
+    for attempt in range(MAX_RETRY_ATTEMPTS + 1):
+        try:
+            trace_ctx: Dict[str, Any] = {}
+            request = client.build_request(
+                method,
+                target_url,
+                headers=headers,
+                timeout=_get_attempt_timeout(attempt, deadline),
+                extensions={"trace": _create_http2_trace(trace_ctx)},
+            )
+            response = client.send(request, stream=True)
+            timestamps = trace_ctx.get("timestamps", {})
+            response.eo_connection_reused = "connect_start" not in timestamps
+            response.eo_connection_timing = _build_connection_timing_http2(timestamps)
+
+            status_code = response.status_code
+
+            if status_code in RETRYABLE_STATUS_CODES:
+                delay = _plan_retry(retry_info, attempt, deadline, host, status_code, response.headers.get("Retry-After"))
+                if delay is not None:
+                    response.close()
+                    _sleep_before_retry(retry_info, delay)
+                    logging.warning(f"Retry attempt {retry_info['retry_attempts']} for status {status_code}")
+                    continue
+
+            retry_info["retry_attempts"] = attempt
+            return response, retry_info
+
+        except httpx.HTTPError as e:
+            retry_info["last_error"] = str(e) or type(e).__name__
+
+            if _is_retryable_error_http2(e):
+                delay = _plan_retry(retry_info, attempt, deadline, host)
+                if delay is not None:
+                    _sleep_before_retry(retry_info, delay)
+                    continue
+            e.eo_retry_info = retry_info  # Reported in the error result
+            raise
+
+    raise RuntimeError("Maximum retry attempts reached")
+
+
+def _get_connection_info_http2(response: Any, target_url: str) -> Dict[str, Any]:
+    """
+    Get negotiated HTTP protocol version / TLS version / connection reuse / phase timings from httpx response
+    (connection is still open until the body is read)
+    """
+    http_protocol_version = getattr(response, "http_version", None) or (
+        "ERROR: Cannot determine HTTP protocol version. The httpx response does not have an 'http_version' attribute."
+    )
+
+    # Handshake info of the network stream (handshake time only when this request opened the connection)
+    handshake_info: Dict[str, Any] = {}
+    network_stream = response.extensions.get("network_stream")
+    ssl_object = network_stream.get_extra_info("ssl_object") if network_stream is not None else None
+    if ssl_object is not None:
+        handshake_info.update(_get_tls_handshake_info(ssl_object))
+        _store_tls_session(ssl_object)
+    server_addr = network_stream.get_extra_info("server_addr") if network_stream is not None else None
+    if server_addr:
+        handshake_info["peer_ip"] = server_addr[0]
+    timing_ms = getattr(response, "eo_connection_timing", None) or {}
+    if ssl_object is not None and not getattr(response, "eo_connection_reused", True):
+        handshake_info["tls_handshake_ms"] = timing_ms.get("tls")
+
+    if not target_url.startswith("https://"):
+        tls_version = "unknown: not_https"
+    elif network_stream is None:
+        tls_version = "unknown: connection_not_found"
+    else:
+        tls_version = handshake_info.get("tls_version") or "unknown: sock_not_ssl"
+
+    return {
+        "http_protocol_version": http_protocol_version,
+        "tls_version": tls_version,
+        "connection_reused": getattr(response, "eo_connection_reused", None),
+        "timing_ms": getattr(response, "eo_connection_timing", None),
+        "handshake": handshake_info,
+    }
+
+
+def _drain_response_body_http2(
+    response: Any,
+    *,
+    max_bytes: Optional[int] = BODY_DRAIN_MAX_BYTES,
+    hash_algorithm: Optional[str] = BODY_DRAIN_HASH_ALGORITHM,
+) -> Dict[str, Any]:
+    """
+    Download response body in fixed-size chunks with constant memory (HTTP/2 version of _drain_response_body)
+    """
+    state = _new_body_drain_state(hash_algorithm)
+    for chunk in response.iter_bytes(chunk_size=BODY_DRAIN_CHUNK_SIZE):
+        if not _consume_body_chunk(state, chunk, max_bytes):
+            break
+    return _finish_body_drain(state, hash_algorithm)
+
+
+def _fetch_http2(run: _WarmupRun) -> Dict[str, Any]:
+    """
+    Fetch adapter of the HTTP/2 engine (httpx, streamed)
+
+    Returns:
+        Dict for _WarmupRun.finish()
+    """
+    response, run.retry_info = _execute_http_request_with_retry_http2(
+        run.target_url,
+        run.req_headers,
+        run.http_request_method,
+    )
+    try:
+        ttfb_end = time.time()
+        connection_info = _get_connection_info_http2(response, run.target_url)
+        res_headers = dict(response.headers)
+
+        body_plan = run.plan_body_download(res_headers)
+        body_info = None
+        if body_plan["download"]:
+            body_info = _drain_response_body_http2(response, max_bytes=body_plan["max_bytes"])
+    finally:
+        response.close()
+
+    return {
+        "status_code": response.status_code,
+        "status_message": response.reason_phrase,
+        "res_headers": res_headers,
+        "redirect_count": len(response.history),
+        "connection_info": connection_info,
+        "ttfb_end": ttfb_end,
+        "end_time": time.time(),
+        "body_plan": body_plan,
+        "body_info": body_info,
+    }
+
+
+def _warmup_target_http2(**warmup_job: Any) -> Tuple[int, Dict[str, Any]]:
+    """
+    Execute warmup HTTP request to target URL and build flat result (HTTP/2 engine, see _warmup_target)
+    """
+    return _run_warmup(_fetch_http2, (httpx.HTTPError,), **warmup_job)
@@ -18,6 +18,8 @@
 #   * httpRequestNumber: Optional request sequence number
 #   * httpRequestUUID: Optional UUID for each request (created by n8n)
 #   * httpRequestRoundID: Optional UNIX timestamp when the first request of a round reaches 215 Add httpRequestRoundID (created by n8n)
+#   * warmupStrategy: Optional "full" (default) / "head" / "range-first-bytes" / "full-if-under-<N>-bytes" (see WARMUP_STRATEGY_*)
+# - Batch mode: JSON array of 2+ items above -> JSON array of flat results (same order, BATCH_MAX_CONCURRENCY parallel)
 # - Actual usage: n8n workflow (EOn8nWorkflowJson/eo-n8n-workflow-jp.json) sends POST with JSON body
 #
 # * Dependencies:
@@ -46,6 +48,14 @@ app = Flask(__name__)
 CLOUDRUN_REQUEST_SECRET_NAME = os.environ.get("CLOUDRUN_REQUEST_SECRET_NAME", "eo-re-d1-secretmng")
 CLOUDRUN_REQUEST_SECRET_KEY_NAME = os.environ.get("CLOUDRUN_REQUEST_SECRET_KEY_NAME", "CLOUDRUN_REQUEST_SECRET")
 
+# ======================================================================
+# Fetch Engine
+# ======================================================================
+CLOUDRUN_FETCH_ENGINE = FETCH_ENGINE_ASYNC
+# Single requests and batch mode run on the shared asyncio event loop (falls back to sync if aiohttp
+# is not installed); the Flask request thread waits for the result (see FETCH_ENGINE_ASYNC in the core)
+# FETCH_ENGINE_HTTP2 (HTTP/2 via httpx) requires httpx[http2] in requirements.txt
+
 # ======================================================================
 # EO Identification Header
 # ======================================================================
@@ -57,6 +67,11 @@ EO_HEADER_VALUE = "gcp"
 # ======================================================================
 CLOUDRUN_ENDPOINT_PATH = "/requestengine_tail"
 
+# ======================================================================
+# Instance Metadata Configuration
+# ======================================================================
+GCP_METADATA_BASE_URL = "http://metadata.google.internal/computeMetadata/v1"
+
 # ======================================================================
 # Global Variables
 # ======================================================================
@@ -95,6 +110,12 @@ def _get_secretmng_requestsecret_value() -> str:
     if not project_id:
         raise RuntimeError("Environment variable 'EO_GCP_PROJECT_ID' is not set.")
 
+    # Lazy SDK import (runs in the secret prefetch thread during instance init)
+    sdk_import_start = time.perf_counter()
+    from google.cloud import secretmanager
+    secret_fetch_start = time.perf_counter()
+    _record_cold_start_timing("sdk-import", (secret_fetch_start - sdk_import_start) * 1000)
+
     try:
         client = secretmanager.SecretManagerServiceClient()
         secret_path = f"projects/{project_id}/secrets/{CLOUDRUN_REQUEST_SECRET_NAME}/versions/latest"
@@ -119,6 +140,7 @@ def _get_secretmng_requestsecret_value() -> str:
         # If not JSON, use as plain text
         pass
 
+    _record_cold_start_timing("secret-fetch", (time.perf_counter() - secret_fetch_start) * 1000)
     _cached_secretmng_requestsecret_value = secret_string
     return secret_string
 
@@ -126,30 +148,54 @@ def _get_secretmng_requestsecret_value() -> str:
 # ======================================================================
 # Get GCP Region
 # ======================================================================
+def _fetch_gcp_instance_metadata() -> Dict[str, Optional[str]]:
+    """
+    Fetch region / instance id / project id from the GCP metadata server
+
+    Registered with _init_instance_metadata() and run in a background thread only
+    (never on the request path). Unavailable values are returned as None.
+    """
+    metadata_paths = {
+        "region": "instance/region",  # Format: projects/12345/regions/asia-northeast1
+        "instance_id": "instance/id",
+        "project_id": "project/project-id",
+    }
+    metadata: Dict[str, Optional[str]] = {}
+    for key, path in metadata_paths.items():
+        metadata[key] = None
+        try:
+            url = f"{GCP_METADATA_BASE_URL}/{path}"
+            resp = requests.get(url, headers={"Metadata-Flavor": "Google"}, timeout=INSTANCE_METADATA_FETCH_TIMEOUT)
+            if resp.status_code == 200 and resp.text:
+                metadata[key] = resp.text.split('/')[-1] if key == "region" else resp.text
+        except requests.exceptions.RequestException:
+            pass
+    return metadata
+
+
 def _get_gcp_region() -> str:
     """
-    Get GCP region from metadata server or environment variable
+    Get GCP region from cached instance metadata (metadata server or environment variable)
+
+    Never blocks: the metadata server is queried in the background (_fetch_gcp_instance_metadata).
 
     Returns:
         str: GCP region (e.g., "asia-northeast1") or "gcp-unknown" if not available
     """
-    region = None
+    return _get_instance_metadata()["region"] or "gcp-unknown"
 
-    # Try to get from metadata server
-    try:
-        url = "http://metadata.google.internal/computeMetadata/v1/instance/region"
-        resp = requests.get(url, headers={"Metadata-Flavor": "Google"}, timeout=2)
-        if resp.status_code == 200:
-            # Format: projects/12345/regions/asia-northeast1
-            region = resp.text.split('/')[-1]
-    except Exception:
-        pass
 
-    # Fallback to environment variable
-    if not region:
-        region = os.environ.get("GCP_REGION") or "gcp-unknown"
-
-    return region
+# ======================================================================
+# Request Pipeline (platform-neutral logic in request_engine_core)
+# ======================================================================
+# Validation, token verification, request headers, warmup and batch mode are shared;
+# this handler only adapts input/output and supplies the secret getter.
+_request_pipeline = _RequestPipeline(
+    get_request_secret=_get_secretmng_requestsecret_value,
+    eo_header_name=EO_HEADER_NAME,
+    eo_header_value=EO_HEADER_VALUE,
+    fetch_engine=CLOUDRUN_FETCH_ENGINE,
+)
 
 
 # ======================================================================
@@ -167,308 +213,55 @@ def requestengine_tail():
         Flask Response: JSON response
             - On success: HTTP status code 200, includes performance metrics
             - On error: Appropriate HTTP status code, includes error message
+            - Batch mode (JSON array body with 2+ items): HTTP status code 200,
+              JSON array of flat results (one per item, same order, see BATCH_MAX_CONCURRENCY)
 
     Note:
         - Authentication: Verify token parameter against GCP Secret Manager secret
         - Retry: Automatic retry for temporary errors (up to 3 times)
-        - Memory protection: Skip analysis for content exceeding 5MB
+        - Memory protection: Body is streamed in chunks and discarded (constant memory, see BODY_DRAIN_*)
     """
-    start_time = time.time()
-
     # Get GCP region and convert to short name
     gcp_region = _get_gcp_region()
     gcp_region_display = gcp_region
 
+    # ==================================================================
+    # Receive request from n8n HttpRequest node (Request Engine node)
+    # ==================================================================
+    # JSON parse and data extraction
     try:
-        # ==================================================================
-        # Receive request from n8n HttpRequest node (Request Engine node)
-        # ==================================================================
-        # JSON parse and data extraction
-        try:
-            body_json = request.get_json() or {}
-        except Exception:
-            body_json = {}
-
-        # ==================================================================
-        # Normalize event format
-        # ==================================================================
-        # Note: Event normalization (array handling, type validation) is NOT in common/
-        # because error response format differs per platform:
-        # - AWS Lambda: return dict
-        # - Azure Functions: return func.HttpResponse(...)
-        # - GCP Cloud Run: return jsonify(...), status_code
-
-        # If body_json is array format, extract first element
-        if isinstance(body_json, list):
-            if len(body_json) == 0:
-                end_time = time.time()
-                duration_ms = (end_time - start_time) * 1000
-                result = _build_flat_result(
-                    status_code=400,
-                    status_message="EMPTY_EVENT_LIST",
-                    duration_ms=duration_ms,
-                    target_url="",
-                    http_request_number=None,
-                    req_headers={},
-                    res_headers={},
-                    request_start_timestamp=start_time,
-                    request_end_timestamp=end_time,
-                    execution_id=None,
-                    from_area=gcp_region_display,
-                )
-                return jsonify(result), 400
-            body_json = body_json[0]
-
-        # Return error if body_json is not dictionary format
-        if not isinstance(body_json, dict):
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            result = _build_flat_result(
-                status_code=400,
-                status_message="INVALID_EVENT_TYPE",
-                duration_ms=duration_ms,
-                target_url="",
-                http_request_number=None,
-                req_headers={},
-                res_headers={},
-                request_start_timestamp=start_time,
-                request_end_timestamp=end_time,
-                execution_id=None,
-                from_area=gcp_region_display,
-            )
-            return jsonify(result), 400
-
-        data = body_json
-
-        # ==================================================================
-        # Extract request data
-        # ==================================================================
-        target_url = data.get("targetUrl") or ""
-        token_calculated_by_n8n = data.get("tokenCalculatedByN8n")
-        http_request_number = data.get("httpRequestNumber")
-        http_request_uuid = data.get("httpRequestUUID")
-        http_request_round_id = data.get("httpRequestRoundID")
-        urltype = data.get("urltype")
-        input_headers = data.get("headersForTargetUrl") if isinstance(data.get("headersForTargetUrl"), dict) else {}
-
-        # Get User-Agent header
-        ua_from_request_headers = input_headers.get("User-Agent") or ""
-
-        # ==================================================================
-        # URL Validation
-        # ==================================================================
-        if not target_url:
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            result = _build_flat_result(
-                status_code=400,
-                status_message="MISSING_URL",
-                duration_ms=duration_ms,
-                target_url="",
-                http_request_number=http_request_number,
-                http_request_uuid=http_request_uuid,
-                http_request_round_id=http_request_round_id,
-                req_headers={},
-                res_headers={},
-                request_start_timestamp=start_time,
-                request_end_timestamp=end_time,
-                execution_id=None,
-                urltype=urltype,
-                from_area=gcp_region_display,
-            )
-            return jsonify(result), 400
-
-        # ==================================================================
-        # Verify n8n-generated token against token generated from GCP Secret Manager secret
-        # ==================================================================
-        try:
-            secretmng_requestsecret_value = _get_secretmng_requestsecret_value()
-            token_calculated_by_cloud_secret = _calc_token(target_url, secretmng_requestsecret_value)
-            if token_calculated_by_n8n == token_calculated_by_cloud_secret:
-                # Token verification successful: continue processing
-                pass
-            else:
-                end_time = time.time()
-                duration_ms = (end_time - start_time) * 1000
-                result = _build_flat_result(
-                    status_code=401,
-                    status_message="INVALID_TOKEN",
-                    duration_ms=duration_ms,
-                    target_url=target_url,
-                    http_request_number=http_request_number,
-                    http_request_uuid=http_request_uuid,
-                    http_request_round_id=http_request_round_id,
-                    req_headers={},
-                    res_headers={},
-                    request_start_timestamp=start_time,
-                    request_end_timestamp=end_time,
-                    execution_id=None,
-                    urltype=urltype,
-                    from_area=gcp_region_display,
-                )
-                return jsonify(result), 401
-        except Exception as e:
-            logger.error(f"Request Secret validation failed: {str(e)}")
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            result = _build_flat_result(
-                status_code=500,
-                status_message="SECRET_FETCH_FAILED",
-                duration_ms=duration_ms,
-                target_url=target_url,
-                http_request_number=http_request_number,
-                http_request_uuid=http_request_uuid,
-                http_request_round_id=http_request_round_id,
-                req_headers={},
-                res_headers={},
-                request_start_timestamp=start_time,
-                request_end_timestamp=end_time,
-                execution_id=None,
-                urltype=urltype,
-                from_area=gcp_region_display,
-            )
-            return jsonify(result), 500
-
-        # ==================================================================
-        # Prepare request headers
-        # ==================================================================
-        req_headers: Dict[str, str] = dict(input_headers)
-        # Set User-Agent if specified
-        if ua_from_request_headers:
-            req_headers.setdefault("User-Agent", ua_from_request_headers)
-        # Add EO identification header
-        req_headers[EO_HEADER_NAME] = EO_HEADER_VALUE
-
-        # ==================================================================
-        # Execute HTTP request (with retry)
-        # ==================================================================
-        # stream=True makes requests.get() return at headers-received (before body download)
-        http_request_start_time = time.time()
-        try:
-            # ==================================================================
-            # Send HTTP request to Warmup Target URL
-            # ==================================================================
-            response, retry_info = _execute_http_request_with_retry(
-                target_url,
-                req_headers,
-            )
-
-            with response:
-                # ==================================================================
-                # TTFB measurement (stream=True: headers already received, body not yet downloaded)
-                # ==================================================================
-                ttfb_end = time.time()
-                initial_response_ms = (ttfb_end - http_request_start_time) * 1000
-
-                # ==================================================================
-                # Get HTTP protocol version (connection still open with stream=True)
-                # ==================================================================
-                http_protocol_version = _get_http_protocol_version(response)
-
-                # ==================================================================
-                # Get TLS version (connection still open with stream=True)
-                # ==================================================================
-                tls_version = _get_tls_version(response, target_url)
-
-                # ==================================================================
-                # Get response headers
-                # ==================================================================
-                res_headers = dict(response.headers)
-
-                # ==================================================================
-                # Get redirect count
-                # ==================================================================
-                redirect_count = len(response.history) if hasattr(response, 'history') else 0
-
-                # ==================================================================
-                # Download body (cache warmup) and measure actual content length
-                # ==================================================================
-                body_content = response.content
-                content_length = len(body_content)
-
-                # ==================================================================
-                # Build result
-                # ==================================================================
-                end_time = time.time()
-                duration_ms = (end_time - start_time) * 1000
-
-                # ==================================================================
-                # Return warmup result data to n8n HttpRequest node
-                # ==================================================================
-                result = _build_flat_result(
-                    status_code=response.status_code,
-                    status_message=response.reason or "OK",
-                    duration_ms=duration_ms,
-                    initial_response_ms=initial_response_ms,
-                    content_length_bytes=content_length,
-                    target_url=target_url,
-                    http_request_number=http_request_number,
-                    http_request_uuid=http_request_uuid,
-                    http_request_round_id=http_request_round_id,
-                    req_headers=req_headers,
-                    res_headers=res_headers,
-                    tls_version=tls_version,
-                    http_protocol_version=http_protocol_version,
-                    request_start_timestamp=http_request_start_time,
-                    request_end_timestamp=end_time,
-                    execution_id=None,
-                    redirect_count=redirect_count,
-                    urltype=urltype,
-                    retry_info=retry_info,
-                    from_area=gcp_region_display,
-                )
-                return jsonify(result), 200
-
-        # ==================================================================
-        # Error Handling
-        # ==================================================================
-        except requests.exceptions.RequestException as e:
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-            result = _build_flat_result(
-                status_code=500,
-                status_message=f"Request failed: {str(e)}",
-                duration_ms=duration_ms,
-                target_url=target_url,
-                http_request_number=http_request_number,
-                http_request_uuid=http_request_uuid,
-                http_request_round_id=http_request_round_id,
-                req_headers=req_headers,
-                res_headers={},
-                request_start_timestamp=http_request_start_time if "http_request_start_time" in locals() else None,
-                request_end_timestamp=end_time,
-                execution_id=None,
-                redirect_count=0,
-                urltype=urltype if "urltype" in locals() else None,
-                retry_info=retry_info if "retry_info" in locals() else None,
-                from_area=gcp_region_display,
-            )
-            return jsonify(result), 500
+        body_json = request.get_json() or {}
+    except Exception:
+        body_json = {}
 
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        end_time = time.time()
-        duration_ms = (end_time - start_time) * 1000
-        error_target_url = target_url if "target_url" in locals() else ""
-        result = _build_flat_result(
-            status_code=500,
-            status_message=f"Internal error: {str(e)}",
-            duration_ms=duration_ms,
-            target_url=error_target_url,
-            http_request_number=http_request_number if "http_request_number" in locals() else None,
-            http_request_uuid=http_request_uuid if "http_request_uuid" in locals() else None,
-            http_request_round_id=http_request_round_id if "http_request_round_id" in locals() else None,
-            req_headers=input_headers if "input_headers" in locals() else {},
-            res_headers={},
-            request_start_timestamp=start_time if "start_time" in locals() else None,
-            request_end_timestamp=end_time,
-            execution_id=None,
-            redirect_count=0,
-            urltype=urltype if "urltype" in locals() else None,
-            retry_info=None,
-            from_area=gcp_region_display,
-        )
-        return jsonify(result), 500
+    # ==================================================================
+    # Return warmup result data to n8n HttpRequest node
+    # ==================================================================
+    # Event normalization (array / batch mode) and all error results are built by the pipeline
+    # Note: Response wrapping is NOT in common/ because response format differs per platform:
+    # - AWS Lambda: return dict
+    # - Azure Functions: return func.HttpResponse(...)
+    # - GCP Cloud Run: return jsonify(...), status_code
+    status_code, result = _request_pipeline.handle(body_json, from_area=gcp_region_display, execution_id=None)
+    return jsonify(result), status_code
+
+
+# ======================================================================
+# Cold Start (instance init)
+# ======================================================================
+# Record import/init time and start fetching the request secret in the background,
+# so the first request does not pay for the SDK import and Secret Manager round trip.
+# Instance metadata: environment variables immediately, metadata server in the background.
+_mark_cold_start_init_done()
+_start_secret_prefetch(_get_secretmng_requestsecret_value)
+_init_instance_metadata(
+    {
+        "region": os.environ.get("GCP_REGION"),
+        "instance_id": None,
+        "project_id": os.environ.get("EO_GCP_PROJECT_ID"),
+    },
+    _fetch_gcp_instance_metadata,
+)
 
 
 # ======================================================================
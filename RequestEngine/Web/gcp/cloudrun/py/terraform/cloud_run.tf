@@ -50,6 +50,11 @@ resource "google_cloud_run_v2_service" "request_engine" {
         name  = "CLOUDRUN_REQUEST_SECRET_NAME"
         value = var.secret_name
       }
+
+      env {
+        name  = "GCP_REGION"
+        value = var.gcp_region
+      }
     }
   }
 
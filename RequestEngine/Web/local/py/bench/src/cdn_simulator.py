@@ -0,0 +1,207 @@
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+CACHE_HIT = "HIT"
+CACHE_MISS = "MISS"
+OUTCOME_ERROR = "ERROR"
+OUTCOME_TIMEOUT = "TIMEOUT"
+
+
+# Vendor header profiles: same header names / value formats as the real CDNs
+# (must be detected by cdn_rule_pack.json like real responses).
+def _cloudflare_headers(cache_status, age, pop, request_id):
+    headers = {"server": "cloudflare", "cf-ray": f"{request_id[:16]}-{pop}"}
+    if cache_status:
+        headers["cf-cache-status"] = cache_status
+    return headers
+
+
+def _cloudfront_headers(cache_status, age, pop, request_id):
+    label = {CACHE_HIT: "Hit", CACHE_MISS: "Miss"}.get(cache_status, "Error")
+    return {
+        "x-amz-cf-id": request_id,
+        "x-amz-cf-pop": f"{pop}57-P1",
+        "x-cache": f"{label} from cloudfront",
+        "via": f"1.1 {request_id[:32]}.cloudfront.net (CloudFront)",
+    }
+
+
+def _fastly_headers(cache_status, age, pop, request_id):
+    return {
+        "x-served-by": f"cache-{pop.lower()}{int(request_id[:4], 16)}-{pop}",
+        "x-fastly-request-id": request_id,
+        "x-cache": cache_status or "MISS",
+    }
+
+
+def _akamai_headers(cache_status, age, pop, request_id):
+    tcp_status = {CACHE_HIT: "TCP_HIT", CACHE_MISS: "TCP_MISS"}.get(cache_status, "TCP_DENIED")
+    return {
+        "x-akamai-request-id": request_id[:8],
+        "x-cache": f"{tcp_status} from a23-{pop.lower()}.deploy.akamaitechnologies.com (AkamaiGHost/22.0)",
+    }
+
+
+def _vercel_headers(cache_status, age, pop, request_id):
+    return {
+        "server": "Vercel",
+        "x-vercel-id": f"{pop.lower()}1::iad1::{request_id[:24]}",
+        "x-vercel-cache": cache_status or "MISS",
+    }
+
+
+VENDOR_PROFILES = {
+    "cloudflare": _cloudflare_headers,
+    "cloudfront": _cloudfront_headers,
+    "fastly": _fastly_headers,
+    "akamai": _akamai_headers,
+    "vercel": _vercel_headers,
+}
+
+
+class CdnSimulator:
+    """
+    Deterministic fake CDN edge + origin.
+
+    Every decision (cache hit / eviction / error / timeout) is drawn from a RNG seeded by
+    (seed, path, per-path request count), so the same request sequence per path produces the
+    same outcomes regardless of thread scheduling.
+    """
+
+    def __init__(self, config):
+        self.vendor = config.get("vendor", "cloudflare")
+        if self.vendor not in VENDOR_PROFILES:
+            raise ValueError(f"Unknown vendor: {self.vendor} (expected one of {', '.join(VENDOR_PROFILES)})")
+        self.pop = config.get("pop", "NRT")
+        self.hit_latency_ms = float(config.get("hit_latency_ms", 5))
+        self.miss_latency_ms = float(config.get("miss_latency_ms", 80))
+        self.latency_jitter_ms = float(config.get("latency_jitter_ms", 0))
+        self.eviction_rate = float(config.get("eviction_rate", 0.0))
+        self.error_rate = float(config.get("error_rate", 0.0))
+        self.error_status_codes = list(config.get("error_status_codes", [502, 503, 504]))
+        self.timeout_rate = float(config.get("timeout_rate", 0.0))
+        self.timeout_seconds = float(config.get("timeout_seconds", 12))
+        self.body_bytes = int(config.get("body_bytes", 16 * 1024))
+        self.seed = config.get("seed", 0)
+
+        self._body = b"x" * self.body_bytes
+        self._cached_at = {}
+        self._request_counts = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def decide(self, path):
+        """Decide the outcome of one request: dict(outcome, cache_status, status_code, age, latency_s, request_id)."""
+        with self._lock:
+            count = self._request_counts.get(path, 0)
+            self._request_counts[path] = count + 1
+            cached_at = self._cached_at.get(path)
+
+        rng = random.Random(f"{self.seed}:{path}:{count}")
+        request_id = hashlib.sha256(f"{self.seed}:{path}:{count}".encode()).hexdigest()
+        roll = rng.random()
+        jitter_s = rng.uniform(0, self.latency_jitter_ms) / 1000
+
+        if roll < self.timeout_rate:
+            decision = {"outcome": OUTCOME_TIMEOUT, "cache_status": None, "status_code": None,
+                        "latency_s": self.timeout_seconds}
+        elif roll < self.timeout_rate + self.error_rate:
+            decision = {"outcome": OUTCOME_ERROR, "cache_status": None,
+                        "status_code": rng.choice(self.error_status_codes),
+                        "latency_s": self.miss_latency_ms / 1000 + jitter_s}
+        elif cached_at is not None and rng.random() >= self.eviction_rate:
+            decision = {"outcome": CACHE_HIT, "cache_status": CACHE_HIT, "status_code": 200,
+                        "latency_s": self.hit_latency_ms / 1000 + jitter_s}
+        else:
+            # Not cached yet or evicted: fetch from origin and store
+            with self._lock:
+                self._cached_at[path] = time.time()
+            cached_at = None
+            decision = {"outcome": CACHE_MISS, "cache_status": CACHE_MISS, "status_code": 200,
+                        "latency_s": self.miss_latency_ms / 1000 + jitter_s}
+
+        decision["age"] = int(time.time() - cached_at) if decision["outcome"] == CACHE_HIT else 0
+        decision["request_id"] = request_id
+        with self._lock:
+            self._stats[decision["outcome"]] = self._stats.get(decision["outcome"], 0) + 1
+        return decision
+
+    def response_headers(self, decision):
+        headers = VENDOR_PROFILES[self.vendor](decision["cache_status"], decision["age"], self.pop, decision["request_id"])
+        headers["age"] = str(decision["age"])
+        headers["cache-control"] = "public, max-age=3600"
+        return headers
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def reset(self):
+        with self._lock:
+            self._cached_at.clear()
+            self._request_counts.clear()
+            self._stats.clear()
+
+    def create_server(self, host="127.0.0.1", port=0):
+        """Create a ThreadingHTTPServer serving this simulator (caller runs serve_forever())."""
+        simulator = self
+
+        class Handler(_CdnSimulatorHandler):
+            pass
+
+        Handler.simulator = simulator
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        return server
+
+
+class _CdnSimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body are separate writes (avoid delayed ACK stalls)
+    simulator = None
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        decision = self.simulator.decide(self.path.split("?", 1)[0])
+        time.sleep(decision["latency_s"])
+        if decision["outcome"] == OUTCOME_TIMEOUT:
+            # Never answer: the client hits its read timeout
+            self.close_connection = True
+            return
+
+        headers = self.simulator.response_headers(decision)
+        status_code = decision["status_code"]
+        body = self.simulator._body if status_code == 200 else b"error"
+
+        # Range: bytes=<start>-<end> (warmupStrategy range-first-bytes)
+        range_match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+        if status_code == 200 and range_match:
+            start = int(range_match.group(1))
+            end = min(int(range_match.group(2) or len(body) - 1), len(body) - 1)
+            headers["content-range"] = f"bytes {start}-{end}/{len(body)}"
+            body = body[start:end + 1]
+            status_code = 206
+
+        self.send_response(status_code)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
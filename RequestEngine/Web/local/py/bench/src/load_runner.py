@@ -0,0 +1,115 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def calc_token(url, secret):
+    """Same token as n8n 170 Secret Key Token Generator: SHA-256(url + request secret)."""
+    return hashlib.sha256((url + secret).encode("utf-8")).hexdigest()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (values need not be sorted)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 2)
+
+
+class LoadRunner:
+    """
+    Sends warmup items to a Request Engine endpoint (local stand-in or a real cloud endpoint)
+    and aggregates client-side latency plus the engine's own flat result metrics.
+    """
+
+    def __init__(self, config, engine_url, target_base_url, request_secret):
+        self.engine_url = engine_url
+        self.target_base_url = target_base_url.rstrip("/")
+        self.request_secret = request_secret
+        self.total_items = int(config.get("total_items", 200))
+        self.concurrency = int(config.get("concurrency", 8))
+        self.batch_size = max(1, int(config.get("batch_size", 1)))
+        self.unique_paths = max(1, int(config.get("unique_paths", 50)))
+        self.warmup_strategy = config.get("warmup_strategy")
+        self.timeout_seconds = float(config.get("timeout_seconds", 60))
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _build_item(self, index):
+        url = f"{self.target_base_url}/asset/{index % self.unique_paths}"
+        item = {
+            "targetUrl": url,
+            "tokenCalculatedByN8n": calc_token(url, self.request_secret),
+            "httpRequestNumber": index,
+            "headersForTargetUrl": {"User-Agent": "EO-LocalBench/1.0"},
+        }
+        if self.warmup_strategy:
+            item["warmupStrategy"] = self.warmup_strategy
+        return item
+
+    def _send(self, indexes):
+        items = [self._build_item(i) for i in indexes]
+        payload = items if len(items) > 1 else items[0]
+        start = time.perf_counter()
+        try:
+            response = self._session().post(self.engine_url, json=payload, timeout=self.timeout_seconds)
+            body = response.json()
+            error = None
+        except (requests.RequestException, ValueError) as e:
+            body, error = None, str(e)
+        latency_ms = (time.perf_counter() - start) * 1000
+        results = body if isinstance(body, list) else ([body] if isinstance(body, dict) else [])
+        return {"latency_ms": latency_ms, "results": results, "error": error, "items": len(items)}
+
+    def run(self):
+        """Run the load and return a summary dict."""
+        batches = [
+            list(range(start, min(start + self.batch_size, self.total_items)))
+            for start in range(0, self.total_items, self.batch_size)
+        ]
+        logger.info(f"Sending {self.total_items} items in {len(batches)} calls (concurrency={self.concurrency}, batch_size={self.batch_size})")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            calls = list(executor.map(self._send, batches))
+        elapsed_s = time.perf_counter() - start
+        return self._summarize(calls, elapsed_s)
+
+    def _summarize(self, calls, elapsed_s):
+        results = [r for call in calls for r in call["results"]]
+        status_counts = {}
+        cache_status_counts = {}
+        for r in results:
+            status = str(r.get("headers.general.status-code"))
+            status_counts[status] = status_counts.get(status, 0) + 1
+            cache_status = r.get("eo.meta.cdn-cache-status-normalized") or "-"
+            cache_status_counts[cache_status] = cache_status_counts.get(cache_status, 0) + 1
+        call_latencies = [c["latency_ms"] for c in calls]
+        ttfbs = [r["eo.meta.ttfb-ms"] for r in results if isinstance(r.get("eo.meta.ttfb-ms"), (int, float))]
+        durations = [r["eo.meta.duration-ms"] for r in results if isinstance(r.get("eo.meta.duration-ms"), (int, float))]
+        retries = sum(r.get("eo.meta.retry-attempts") or 0 for r in results)
+        return {
+            "calls": len(calls),
+            "items": sum(c["items"] for c in calls),
+            "results": len(results),
+            "client_errors": sum(1 for c in calls if c["error"]),
+            "elapsed_s": round(elapsed_s, 3),
+            "items_per_s": round(len(results) / elapsed_s, 1) if elapsed_s > 0 else None,
+            "call_latency_ms": {p: percentile(call_latencies, int(p[1:])) for p in ("p50", "p90", "p99")},
+            "item_ttfb_ms": {p: percentile(ttfbs, int(p[1:])) for p in ("p50", "p90", "p99")},
+            "item_duration_ms": {p: percentile(durations, int(p[1:])) for p in ("p50", "p90", "p99")},
+            "retry_attempts": retries,
+            "status_counts": status_counts,
+            "cache_status_counts": cache_status_counts,
+        }
@@ -0,0 +1,97 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import threading
+
+import yaml
+
+from cdn_simulator import CdnSimulator
+from load_runner import LoadRunner
+from merge import load_merged_module
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _serve_in_background(server, name):
+    threading.Thread(target=server.serve_forever, name=name, daemon=True).start()
+    return f"http://{server.server_address[0]}:{server.server_port}"
+
+
+def start_cdn_simulator(config):
+    simulator = CdnSimulator(config.get("cdn_simulator", {}))
+    server = simulator.create_server(config["cdn_simulator"].get("host", "127.0.0.1"), config["cdn_simulator"].get("port", 0))
+    base_url = _serve_in_background(server, "eo-cdn-simulator")
+    logger.info(f"CDN simulator ({simulator.vendor}) listening on {base_url}")
+    return simulator, server, base_url
+
+
+def start_local_request_engine(config, request_secret):
+    engine_config = config.get("request_engine", {})
+    os.environ["EO_LOCAL_REQUEST_SECRET"] = request_secret
+    if engine_config.get("fetch_engine"):
+        os.environ["EO_LOCAL_FETCH_ENGINE"] = engine_config["fetch_engine"]
+    if engine_config.get("host_limits"):
+        os.environ["EO_HOST_LIMITS"] = json.dumps(engine_config["host_limits"])
+    module = load_merged_module("local", engine_config.get("build_dir", "./build"))
+    server = module.run_local_request_engine(engine_config.get("host", "127.0.0.1"), engine_config.get("port", 0))
+    base_url = _serve_in_background(server, "eo-local-request-engine")
+    engine_url = base_url + module.LOCAL_ENDPOINT_PATH
+    logger.info(f"Local Request Engine listening on {engine_url}")
+    return server, engine_url
+
+
+def write_report(report, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_file = os.path.join(output_dir, f"re_bench_{timestamp}.json")
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    logger.info(f"Report saved: {report_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EdgeOptimizer Request Engine Local Bench")
+    parser.add_argument("--config", type=str, default="bench_config.yaml", help="Path to the config file")
+    parser.add_argument("mode", nargs="?", default="bench", choices=["bench", "simulator", "engine"],
+                        help="bench: simulator + local engine + load (default) / simulator or engine: serve only")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.config):
+        logger.error(f"Config file not found: {args.config}")
+        return
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+
+    request_secret = config.get("request_engine", {}).get("request_secret", "eo-local-request-secret")
+
+    if args.mode == "simulator":
+        _, server, _ = start_cdn_simulator(config)
+        threading.Event().wait()
+    if args.mode == "engine":
+        start_local_request_engine(config, request_secret)
+        threading.Event().wait()
+
+    simulator, simulator_server, target_base_url = start_cdn_simulator(config)
+    engine_url = config.get("request_engine", {}).get("url")
+    if not engine_url:
+        # No external engine URL: run the merged core + local handler in this process
+        _, engine_url = start_local_request_engine(config, request_secret)
+
+    runner = LoadRunner(config.get("load", {}), engine_url, target_base_url, request_secret)
+    summary = runner.run()
+    summary["simulator_outcomes"] = simulator.stats()
+    report = {"config": config, "summary": summary}
+
+    print("\n" + "=" * 50)
+    print(json.dumps(summary, indent=2))
+    print("=" * 50 + "\n")
+    write_report(report, config.get("settings", {}).get("output_dir", "./reports"))
+    simulator_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
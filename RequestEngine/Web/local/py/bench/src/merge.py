@@ -0,0 +1,70 @@
+import importlib.util
+import logging
+import os
+import shutil
+import sys
+
+logger = logging.getLogger(__name__)
+
+# RequestEngine/Web (this file: RequestEngine/Web/local/py/bench/src/merge.py)
+WEB_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+COMMON_DIR = os.path.join(WEB_DIR, "funcfiles", "common", "py")
+EXT_DIR = os.path.join(COMMON_DIR, "extensions")
+CDN_RULE_PACK_FILE = "cdn_rule_pack.json"
+
+# Same file order as the deploy workflows (.github/workflows/deploy-py-to-*-web.yml):
+# 1. _01_imports.py  2. request_engine_core.py  3. extensions/_ext_*.py  4. platform handler
+PLATFORMS = {
+    "local": ("local/py/funcfiles", "_03_local_handler.py"),
+    "aws": ("aws/lambda/py/funcfiles", "_03_aws_lambda_handler.py"),
+    "azure": ("azure/functions/py/funcfiles", "_03_azure_handler.py"),
+    "gcp": ("gcp/cloudrun/py/funcfiles", "_03_gcp_cloudrun_handler.py"),
+}
+
+
+def merged_source_files(platform, extensions=None):
+    """Return the source files of a merged Request Engine module, in merge order."""
+    if platform not in PLATFORMS:
+        raise ValueError(f"Unknown platform: {platform} (expected one of {', '.join(PLATFORMS)})")
+    src_dir, handler_file = PLATFORMS[platform]
+    if extensions is None:
+        extensions = sorted(
+            name for name in os.listdir(EXT_DIR) if name.startswith("_ext_") and name.endswith(".py")
+        )
+    return (
+        [os.path.join(WEB_DIR, src_dir, "_01_imports.py"), os.path.join(COMMON_DIR, "request_engine_core.py")]
+        + [os.path.join(EXT_DIR, name) for name in extensions]
+        + [os.path.join(WEB_DIR, src_dir, handler_file)]
+    )
+
+
+def build_merged_module(platform, output_dir, extensions=None):
+    """
+    Merge the Request Engine source files like the deploy workflows do.
+
+    Writes <output_dir>/<platform>_request_engine.py and copies the CDN rule pack next to it
+    (request_engine_core loads it relative to the merged module).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"{platform}_request_engine.py")
+    with open(output_path, "w", encoding="utf-8") as out:
+        out.write("# AUTO-GENERATED FILE - DO NOT EDIT DIRECTLY (RequestEngine/Web/local/py/bench/src/merge.py)\n\n")
+        for path in merged_source_files(platform, extensions):
+            with open(path, encoding="utf-8") as f:
+                out.write(f"# --- {os.path.relpath(path, WEB_DIR)} ---\n")
+                out.write(f.read())
+                out.write("\n")
+    shutil.copy(os.path.join(COMMON_DIR, CDN_RULE_PACK_FILE), output_dir)
+    logger.info(f"Merged {platform} Request Engine: {output_path}")
+    return output_path
+
+
+def load_merged_module(platform, output_dir, extensions=None):
+    """Build and import a merged Request Engine module (platform dependencies must be installed)."""
+    output_path = build_merged_module(platform, output_dir, extensions)
+    module_name = f"{platform}_request_engine"
+    spec = importlib.util.spec_from_file_location(module_name, output_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,246 @@
+import argparse
+import csv
+import gc
+import glob
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from merge import load_merged_module
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BENCH_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+REPO_DIR = os.path.abspath(os.path.join(BENCH_DIR, "..", "..", "..", "..", ".."))
+DEFAULT_CSV_GLOB = os.path.join(REPO_DIR, "RequestResults", "*.csv")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "microbench_baseline.json")
+
+# Flat result column prefixes (current and older RequestResults CSV layouts)
+REQUEST_HEADER_PREFIX = "headers.request-headers."
+RESPONSE_HEADER_PREFIX = "headers.response-headers."
+LEGACY_HEADER_PREFIX = "headers."
+NON_HEADER_PREFIXES = ("headers.general.", REQUEST_HEADER_PREFIX)
+
+
+def load_rows(csv_glob):
+    """Load (target_url, req_headers, res_headers) per RequestResults CSV row."""
+    rows = []
+    for path in sorted(glob.glob(csv_glob)):
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for record in csv.DictReader(f):
+                req_headers, res_headers = {}, {}
+                for column, value in record.items():
+                    if not column or not value:
+                        continue
+                    if column.startswith(REQUEST_HEADER_PREFIX):
+                        req_headers[column[len(REQUEST_HEADER_PREFIX):]] = value
+                    elif column.startswith(RESPONSE_HEADER_PREFIX):
+                        res_headers[column[len(RESPONSE_HEADER_PREFIX):]] = value
+                    elif column.startswith(LEGACY_HEADER_PREFIX) and not column.startswith(NON_HEADER_PREFIXES):
+                        res_headers[column[len(LEGACY_HEADER_PREFIX):]] = value
+                rows.append((record.get("headers.general.request-url") or "https://example.com/", req_headers, res_headers))
+    return rows
+
+
+def build_cases(engine):
+    """Per-row hot path functions: name -> fn(row)."""
+    cases = {
+        "normalize_headers": lambda row: engine._normalize_headers(row[2]),
+        "detect_cdn": lambda row: engine._detect_cdn(row[2], engine._normalize_headers(row[2])),
+        # Eviction history read / classify / record (done by the warmup routine, not _build_flat_result)
+        "detect_eviction": lambda row: engine._detect_eviction(
+            row[0], "HIT", None, engine._normalize_headers(row[2]), 1700000000.5,
+        ),
+    }
+    for ext_name in engine.get_registered_extensions():
+        cases[f"extension:{ext_name}"] = (
+            lambda row, ext_name=ext_name: engine.build_extension_output(ext_name, {
+                "target_url": row[0],
+                "res_headers": row[2],
+                "res_headers_lower": engine._normalize_headers(row[2]),
+            })
+        )
+    cases["build_flat_result"] = lambda row: engine._build_flat_result(
+        status_code=200,
+        status_message="OK",
+        duration_ms=123.456,
+        initial_response_ms=45.678,
+        content_length_bytes=12345,
+        target_url=row[0],
+        http_request_number=1,
+        http_request_uuid="00000000-0000-0000-0000-000000000000",
+        http_request_round_id=1700000000,
+        req_headers=row[1],
+        res_headers=row[2],
+        tls_version="TLSv1.3",
+        http_protocol_version="HTTP/1.1",
+        request_start_timestamp=1700000000.0,
+        request_end_timestamp=1700000000.5,
+        execution_id="bench",
+        from_area="local",
+        retry_info={"retry_attempts": 0, "retry_delays": [], "last_error": None},
+    )
+    return cases
+
+
+def measure_time(fn, rows, repeat, min_seconds):
+    """ns/row: best of `repeat` runs, each looping over all rows until min_seconds has elapsed."""
+    best = None
+    for _ in range(repeat):
+        loops = 0
+        start = time.perf_counter_ns()
+        while True:
+            for row in rows:
+                fn(row)
+            loops += 1
+            elapsed = time.perf_counter_ns() - start
+            if elapsed >= min_seconds * 1e9:
+                break
+        ns_per_row = elapsed / (loops * len(rows))
+        best = ns_per_row if best is None else min(best, ns_per_row)
+    return best
+
+
+def measure_memory(fn, rows):
+    """
+    Allocation metrics (results are kept alive so retained allocations can be counted):
+    - alloc_blocks_per_row: memory blocks still allocated per row (result objects; temporaries freed)
+    - alloc_bytes_per_row: bytes still allocated per row (tracemalloc)
+    - peak_kib: peak traced memory of one call (working set incl. temporaries, results discarded)
+    """
+    outputs = [None] * len(rows)
+    gc.collect()
+    gc.disable()
+    try:
+        blocks_before = sys.getallocatedblocks()
+        for i, row in enumerate(rows):
+            outputs[i] = fn(row)
+        blocks_after = sys.getallocatedblocks()
+        outputs = [None] * len(rows)
+
+        gc.collect()
+        tracemalloc.start()
+        traced_before, _ = tracemalloc.get_traced_memory()
+        for i, row in enumerate(rows):
+            outputs[i] = fn(row)
+        traced_after, _ = tracemalloc.get_traced_memory()
+        outputs = None
+
+        gc.collect()
+        peak_bytes = 0
+        for row in rows:
+            tracemalloc.reset_peak()
+            peak_start, _ = tracemalloc.get_traced_memory()
+            fn(row)
+            _, traced_peak = tracemalloc.get_traced_memory()
+            peak_bytes = max(peak_bytes, traced_peak - peak_start)
+        tracemalloc.stop()
+    finally:
+        gc.enable()
+    return {
+        "alloc_blocks_per_row": round((blocks_after - blocks_before) / len(rows), 2),
+        "alloc_bytes_per_row": round((traced_after - traced_before) / len(rows), 1),
+        "peak_kib": round(peak_bytes / 1024, 2),
+    }
+
+
+def run_suite(engine, rows, repeat, min_seconds):
+    results = {}
+    for name, fn in build_cases(engine).items():
+        fn(rows[0])  # Warm up (lazy init, caches)
+        results[name] = {"ns_per_row": round(measure_time(fn, rows, repeat, min_seconds), 1)}
+        results[name].update(measure_memory(fn, rows))
+        logger.info(f"{name}: {results[name]}")
+    return results
+
+
+def compare_with_baseline(results, baseline, time_tolerance, alloc_tolerance):
+    """Return list of regression messages (empty = pass)."""
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get("cases", {}).get(name)
+        if reference is None:
+            logger.info(f"{name}: not in baseline (new case)")
+            continue
+        checks = (
+            ("ns_per_row", time_tolerance, 0),
+            ("alloc_blocks_per_row", alloc_tolerance, 1),
+            ("peak_kib", alloc_tolerance, 1),
+        )
+        for metric, tolerance, slack in checks:
+            limit = reference[metric] * (1 + tolerance) + slack
+            if current[metric] > limit:
+                regressions.append(
+                    f"{name}.{metric}: {current[metric]} > {round(limit, 1)} (baseline {reference[metric]}, +{int(tolerance * 100)}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EdgeOptimizer Request Engine per-row microbenchmark")
+    parser.add_argument("--csv", type=str, default=DEFAULT_CSV_GLOB, help="RequestResults CSV glob (header sets to replay)")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE, help="Baseline JSON")
+    parser.add_argument("--update-baseline", action="store_true", help="Write current results as the new baseline")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per case (best is reported)")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="Minimum duration of one timing run")
+    parser.add_argument("--time-tolerance", type=float, default=0.30, help="Allowed ns/row increase (0.30 = +30%%)")
+    parser.add_argument("--alloc-tolerance", type=float, default=0.10, help="Allowed allocation / peak memory increase")
+    parser.add_argument("--build-dir", type=str, default=os.path.join(BENCH_DIR, "build"), help="Merged module output dir")
+    args = parser.parse_args()
+
+    rows = load_rows(args.csv)
+    if not rows:
+        logger.error(f"No rows found: {args.csv}")
+        sys.exit(2)
+    logger.info(f"Loaded {len(rows)} header sets from {args.csv}")
+
+    logging.getLogger().setLevel(logging.WARNING)  # Silence engine init logs
+    engine = load_merged_module("local", args.build_dir)
+    logging.getLogger().setLevel(logging.INFO)
+
+    results = run_suite(engine, rows, args.repeat, args.min_seconds)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rows": len(rows),
+        "cases": results,
+    }
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        logger.info(f"Baseline written: {args.baseline}")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("python") != report["python"] or baseline.get("rows") != report["rows"]:
+        logger.warning(
+            f"Baseline was recorded with Python {baseline.get('python')} / {baseline.get('rows')} rows "
+            f"(now {report['python']} / {report['rows']}); timings may not be comparable"
+        )
+
+    print("\n" + "=" * 50)
+    print(f"{'case':<28}{'ns/row':>12}{'base':>12}{'blocks/row':>12}{'bytes/row':>12}{'peak KiB':>10}")
+    for name, current in results.items():
+        reference = baseline.get("cases", {}).get(name, {})
+        print(f"{name:<28}{current['ns_per_row']:>12}{str(reference.get('ns_per_row', '-')):>12}"
+              f"{current['alloc_blocks_per_row']:>12}{current['alloc_bytes_per_row']:>12}{current['peak_kib']:>10}")
+    print("=" * 50 + "\n")
+
+    regressions = compare_with_baseline(results, baseline, args.time_tolerance, args.alloc_tolerance)
+    if regressions:
+        for message in regressions:
+            logger.error(f"REGRESSION {message}")
+        sys.exit(1)
+    logger.info("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# ----------------------------------------------------
+# Edge Optimizer
+# Request Engine for Local Benchmarking - Platform-Specific Handler
+# Crafted by Nishi Labo | https://4649-24.com
+# ----------------------------------------------------
+#
+# EO Request Engine (local stand-in)
+# * Overview:
+# Runs the same merged core (request_engine_core + extensions) as AWS Lambda / Azure Functions /
+# GCP Cloud Run behind one local HTTP endpoint, so fetch / retry / CDN detection changes can be
+# benchmarked offline (see RequestEngine/Web/local/py/bench, EO_Documents/Manuals/Web/py/LOCAL_BENCH_README.md).
+# Not deployed: the request secret is a stub taken from an environment variable.
+#
+# * Input:
+# - HTTP Method: POST
+# - Path: /requestengine_local (LOCAL_ENDPOINT_PATH)
+# - JSON Body: same as the cloud handlers ({ targetUrl, tokenCalculatedByN8n, ... } or batch array)
+#
+# * Dependencies:
+# - Request secret: env.EO_LOCAL_REQUEST_SECRET (default: LOCAL_REQUEST_SECRET_DEFAULT)
+# - Region label: env.EO_LOCAL_REGION (default: "local")
+
+# ======================================================================
+# Local Server Configuration
+# ======================================================================
+LOCAL_ENDPOINT_PATH = "/requestengine_local"
+LOCAL_DEFAULT_HOST = "127.0.0.1"
+LOCAL_DEFAULT_PORT = 8090
+
+# ======================================================================
+# Stub Secret Provider Configuration
+# ======================================================================
+LOCAL_REQUEST_SECRET_ENV = "EO_LOCAL_REQUEST_SECRET"
+LOCAL_REQUEST_SECRET_DEFAULT = "eo-local-request-secret"
+# Benchmark only: never use the default value for a reachable endpoint
+
+# ======================================================================
+# Fetch Engine
+# ======================================================================
+LOCAL_FETCH_ENGINE = os.environ.get("EO_LOCAL_FETCH_ENGINE", FETCH_ENGINE_SYNC)
+# "sync" (thread pool, same as AWS Lambda), "async" (aiohttp, same as Azure Functions / GCP Cloud Run)
+# or "http2" (httpx[http2])
+
+# ======================================================================
+# EO Identification Header
+# ======================================================================
+EO_HEADER_NAME = "x-eo-re"
+EO_HEADER_VALUE = "local"
+
+
+# ======================================================================
+# Get Request Secret (stub secret provider)
+# ======================================================================
+def _get_local_request_secret() -> str:
+    """
+    Get request secret for the local stand-in (stub for the cloud secret services)
+
+    Returns:
+        str: Value of EO_LOCAL_REQUEST_SECRET, or LOCAL_REQUEST_SECRET_DEFAULT if not set
+    """
+    return os.environ.get(LOCAL_REQUEST_SECRET_ENV) or LOCAL_REQUEST_SECRET_DEFAULT
+
+
+# ======================================================================
+# Request Pipeline (platform-neutral logic in request_engine_core)
+# ======================================================================
+# Validation, token verification, request headers, warmup and batch mode are shared;
+# this handler only adapts input/output and supplies the secret getter.
+_request_pipeline = _RequestPipeline(
+    get_request_secret=_get_local_request_secret,
+    eo_header_name=EO_HEADER_NAME,
+    eo_header_value=EO_HEADER_VALUE,
+    fetch_engine=LOCAL_FETCH_ENGINE,
+)
+
+
+# ======================================================================
+# Main Function (HTTP Handler)
+# ======================================================================
+class _LocalRequestEngineHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in handler (POST LOCAL_ENDPOINT_PATH -> JSON flat result(s))
+    """
+
+    protocol_version = "HTTP/1.1"  # Keep-Alive for the benchmark client
+    disable_nagle_algorithm = True  # Headers and body are separate writes (avoid delayed ACK stalls)
+
+    def do_POST(self) -> None:
+        if self.path.split("?", 1)[0] != LOCAL_ENDPOINT_PATH:
+            self._send_json(404, {"error": "NOT_FOUND"})
+            return
+
+        # JSON parse and data extraction
+        try:
+            content_length = int(self.headers.get("Content-Length") or 0)
+            body_json = json.loads(self.rfile.read(content_length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            body_json = {}
+
+        local_region = _get_instance_metadata()["region"]
+        status_code, result = _request_pipeline.handle(body_json, from_area=local_region, execution_id=None)
+        self._send_json(status_code, result)
+
+    def _send_json(self, status_code: int, body: Any) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Access log would dominate benchmark output
+        pass
+
+
+def run_local_request_engine(host: str = LOCAL_DEFAULT_HOST, port: int = LOCAL_DEFAULT_PORT) -> ThreadingHTTPServer:
+    """
+    Create the local stand-in server (caller runs serve_forever(), e.g. in a thread)
+
+    Args:
+        host: Bind address
+        port: Bind port (0 = ephemeral port, see server.server_port)
+
+    Returns:
+        ThreadingHTTPServer: Server bound to (host, port)
+    """
+    server = ThreadingHTTPServer((host, port), _LocalRequestEngineHandler)
+    server.daemon_threads = True
+    return server
+
+
+# ======================================================================
+# Cold Start (instance init)
+# ======================================================================
+_mark_cold_start_init_done()
+_init_instance_metadata({
+    "region": os.environ.get("EO_LOCAL_REGION") or "local",
+    "instance_id": None,
+    "project_id": None,
+})
+
+
+# ======================================================================
+# Entry Point
+# ======================================================================
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    local_server = run_local_request_engine(
+        os.environ.get("EO_LOCAL_HOST", LOCAL_DEFAULT_HOST),
+        int(os.environ.get("EO_LOCAL_PORT", LOCAL_DEFAULT_PORT)),
+    )
+    logging.info(f"Local Request Engine listening on http://{local_server.server_address[0]}:{local_server.server_port}{LOCAL_ENDPOINT_PATH}")
+    local_server.serve_forever()
@@ -0,0 +1,388 @@
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from results_store import ROUND_ID_COLUMN, load_result_file, rows_to_table, select_columns
+
+logger = logging.getLogger(__name__)
+
+# RequestEngine/Web (this file: RequestEngine/Web/local/py/results/src/analytics.py)
+WEB_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+CDN_RULE_PACK_PATH = os.path.join(WEB_DIR, "funcfiles", "common", "py", "cdn_rule_pack.json")
+
+# Flat result columns loaded for analysis -> frame column names
+FRAME_COLUMNS = {
+    ROUND_ID_COLUMN: "round",
+    "eo.meta.re-area": "area",
+    "headers.request-headers.x-eo-re": "engine",  # aws / azure / gcp / cloudflare
+    "headers.general.request-url": "url",
+    "eo.meta.urltype": "urltype",
+    "headers.general.status-code": "status",
+    "eo.meta.revalidation-skipped": "revalidation_skipped",  # No request sent (SKIPPED_IMMUTABLE)
+    "eo.meta.request-start-timestamp": "start",
+    "eo.meta.request-end-timestamp": "end",
+    "eo.meta.ttfb-ms": "ttfb_ms",
+    "eo.meta.cdn-cache-status-normalized": "cache_status_normalized",
+    "eo.meta.cdn-cache-status": "cdn_cache_status",
+    "headers.response-headers.cf-cache-status": "cf_cache_status",  # Older results without eo.meta.cdn-*
+    "eo.meta.cdn-pop": "pop",
+    "headers.response-headers.cf-ray": "cf_ray",  # Older results without eo.meta.cdn-pop
+    "headers.response-headers.age": "age",
+    "headers.response-headers.cdn-cache-control": "cdn_cache_control",
+    "headers.response-headers.surrogate-control": "surrogate_control",
+    "headers.response-headers.cache-control": "cache_control",
+    "headers.response-headers.content-type": "content_type",
+    "eo.re.eviction-alert": "eviction_alert",  # n8n 355 Eviction Detector
+    "waitSeconds": "wait_seconds",  # n8n rate control
+}
+
+CACHE_STATUS_UNKNOWN = "UNKNOWN"  # Same as CDN_CACHE_STATUS_UNKNOWN (request_engine_core.py)
+CACHE_STATUS_NONE = "NONE"  # No CDN cache status header in the response
+MISS_STATUSES = ["MISS", "EXPIRED"]  # Not served from the edge cache (fetched from the origin)
+CACHED_STATUSES = ["HIT", "STALE", "REVALIDATED"]
+IGNORE_STATUSES = ["DYNAMIC", "BYPASS"]
+CF_RAY_POP_PATTERN = r"-([A-Za-z]{3})$"  # Cloudflare pop pattern of the rule pack (cf-ray: <id>-NRT)
+URLTYPE_MAIN_DOCUMENT = "main_document"
+URLTYPE_ASSET = "asset"
+TTFB_PERCENTILES = (0.5, 0.9, 0.99)
+REPORT_TOP_URLS = 20  # Markdown report only (JSON has all URLs)
+
+# Eviction classification: same rules and defaults as _classify_eviction (request_engine_core.py)
+EVICTION_FRESH_AGE = 60.0
+EVICTION_FRESH_TTL_RATIO = 0.1
+EVICTION_AGE_TOLERANCE = 2.0
+TTL_COLUMNS = ("cdn_cache_control", "surrogate_control", "cache_control")  # Highest precedence first
+EVICTION_ALERT_EVICTED = "EVICTED"
+EVICTION_ALERT_EXPIRED = "EXPIRED"
+EVICTION_ALERT_FRESH = "FRESH"
+EVICTION_ALERT_SAFE = "SAFE"
+EVICTION_ALERT_IGNORE = "IGNORE"
+
+
+def load_cache_status_values(path=CDN_RULE_PACK_PATH):
+    """{"hit": "HIT", "tcp_hit": "HIT", ...} from the rule pack cache_status_values."""
+    with open(path, encoding="utf-8") as f:
+        cache_status_values = json.load(f)["cache_status_values"]
+    return {
+        raw_value.lower(): normalized
+        for normalized, raw_values in cache_status_values.items()
+        for raw_value in raw_values
+    }
+
+
+def normalize_cache_status(raw, cache_status_values):
+    """
+    Normalize raw cache status values like _normalize_cdn_cache_status (request_engine_core.py):
+    last tier of "MISS, HIT", first word of "Hit from cloudfront".
+
+    Each distinct value is normalized once (results repeat a handful of values).
+    """
+    codes, uniques = pd.factorize(raw)
+    normalized = []
+    for value in uniques:
+        last_tier = str(value).rsplit(",", 1)[-1].split()
+        normalized.append(cache_status_values.get(last_tier[0].lower(), CACHE_STATUS_UNKNOWN) if last_tier else CACHE_STATUS_UNKNOWN)
+    normalized.append(CACHE_STATUS_NONE)  # code -1 (missing)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=normalized).astype(str), index=raw.index)
+
+
+def parse_cache_control_ttl(value):
+    """Shared cache TTL (seconds) of a Cache-Control style value, like _parse_cache_control_ttl."""
+    directives = {}
+    for part in str(value).lower().split(","):
+        name, _, argument = part.partition("=")
+        directives[name.strip()] = argument.strip().strip('"')
+    if "no-store" in directives or "private" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(float(directives[name]), 0.0)
+            except ValueError:
+                continue
+    return None
+
+
+def cache_ttl(frame):
+    """TTL (seconds, NaN if not set) from the first of TTL_COLUMNS that sets one (each distinct value parsed once)."""
+    ttl = pd.Series(np.nan, index=frame.index)
+    for column in TTL_COLUMNS:
+        codes, uniques = pd.factorize(frame[column])
+        parsed = np.array([parse_cache_control_ttl(value) for value in uniques] + [None], dtype=float)
+        ttl = ttl.fillna(pd.Series(parsed[codes], index=frame.index))
+    return ttl
+
+
+def classify_evictions(frame):
+    """
+    Bulk version of _classify_eviction (request_engine_core.py) over a prepared frame.
+
+    The previous observation of a row is the previous HIT / MISS of the same URL at the same
+    edge POP (any area / round, by response time). Returns labels (None: no / unknown cache status).
+    """
+    observed_at = frame["end"].fillna(frame["start"])
+    status = frame["cache_status"]
+    missed = status.isin(MISS_STATUSES)
+    cached = status.isin(CACHED_STATUSES)
+    ttl = frame["ttl"].where(frame["ttl"] > 0)  # 0 with a HIT / MISS: edge rule overrides the origin
+
+    observations = pd.DataFrame({
+        "url": frame["url"],
+        "pop": frame["pop"].fillna(""),
+        "observed_at": observed_at,
+        "copy_age": frame["age"].where(cached, 0.0),  # After a MISS the CDN holds a new copy (age 0)
+        "ttl": ttl,
+    })[missed | cached].sort_values("observed_at", kind="stable")
+    previous = observations.groupby(["url", "pop"], sort=False)[["observed_at", "copy_age", "ttl"]].shift(1)
+    previous = previous.reindex(frame.index)
+    expected_age = previous["copy_age"] + (observed_at - previous["observed_at"])
+    previous_ttl = previous["ttl"].fillna(ttl)
+
+    fresh_age = np.minimum(EVICTION_FRESH_AGE, ttl * EVICTION_FRESH_TTL_RATIO).fillna(EVICTION_FRESH_AGE)
+    expired = missed & (expected_age >= previous_ttl - EVICTION_AGE_TOLERANCE)
+    fresh = cached & ((frame["age"] + EVICTION_AGE_TOLERANCE < expected_age) | (frame["age"] < fresh_age))
+    labels = np.select(
+        [status.isin(IGNORE_STATUSES), expired, missed, fresh, cached],
+        [EVICTION_ALERT_IGNORE, EVICTION_ALERT_EXPIRED, EVICTION_ALERT_EVICTED, EVICTION_ALERT_FRESH, EVICTION_ALERT_SAFE],
+        default=None,
+    )
+    return pd.Series(labels, index=frame.index, dtype=object)
+
+
+def load_frame(store=None, paths=(), rounds=None):
+    """
+    Load results from a ResultsStore and / or RequestResults files (CSV / flat JSON)
+    as one DataFrame with the FRAME_COLUMNS names.
+    """
+    columns = list(FRAME_COLUMNS)
+    tables = []
+    if store is not None:
+        tables.append(store.read(columns=columns, rounds=rounds))
+    for path in paths:
+        table = select_columns(rows_to_table(load_result_file(path)), columns)
+        if rounds is not None:
+            table = table.filter(pa.compute.is_in(table.column(ROUND_ID_COLUMN), pa.array(list(rounds), pa.int64())))
+        tables.append(table)
+    frame = pa.concat_tables(tables).to_pandas() if tables else pd.DataFrame(columns=columns)
+    return frame.rename(columns=FRAME_COLUMNS)
+
+
+def prepare_frame(frame, cache_status_values=None):
+    """
+    Derived columns: cache_status (normalized), missed, pop (from cf-ray when missing),
+    urltype (from content-type when missing),
+    numeric age / wait_seconds, ttl, eviction (classify_evictions); rows sorted by round and request start.
+    Skipped items (eo.meta.revalidation-skipped: no request, no status / cache status) are dropped.
+    """
+    if cache_status_values is None:
+        cache_status_values = load_cache_status_values()
+    skipped = frame["revalidation_skipped"].astype("string").str.lower().eq("true").fillna(False)
+    frame = frame[~skipped.to_numpy(dtype=bool)].copy()
+    raw_status = frame["cdn_cache_status"].fillna(frame["cf_cache_status"])
+    cache_status = normalize_cache_status(raw_status, cache_status_values)
+    frame["cache_status"] = frame["cache_status_normalized"].fillna(cache_status)
+    frame["missed"] = frame["cache_status"].isin(MISS_STATUSES)
+    frame["pop"] = frame["pop"].fillna(frame["cf_ray"].astype("string").str.extract(CF_RAY_POP_PATTERN, expand=False))
+    is_html = frame["content_type"].fillna("").str.lower().str.startswith("text/html")
+    frame["urltype"] = frame["urltype"].fillna(is_html.map({True: URLTYPE_MAIN_DOCUMENT, False: URLTYPE_ASSET}))
+    frame["area"] = frame["area"].fillna("(none)")
+    for column in ("status", "start", "end", "ttfb_ms", "age", "wait_seconds"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    frame["error"] = frame["status"].isna() | (frame["status"] >= 400)
+    frame["ttl"] = cache_ttl(frame)
+    frame["eviction"] = classify_evictions(frame)
+    frame = frame.sort_values(["round", "start"], kind="stable", na_position="last").reset_index(drop=True)
+    # First request per (round, URL) warms the edge; later requests (other areas) verify it
+    frame["warmer"] = ~frame.duplicated(["round", "url"])
+    return frame
+
+
+def round_summary(frame):
+    """Per round: requests, URLs, areas, errors, cache status counts, hit rate."""
+    grouped = frame.groupby("round")
+    summary = pd.DataFrame({
+        "requests": grouped.size(),
+        "urls": grouped["url"].nunique(),
+        "areas": grouped["area"].nunique(),
+        "errors": grouped["error"].sum(),
+    })
+    status_counts = pd.crosstab(frame["round"], frame["cache_status"])
+    summary = summary.join(status_counts)
+    summary[status_counts.columns] = summary[status_counts.columns].fillna(0).astype(int)
+    summary["hit_rate"] = summary.get("HIT", 0) / summary["requests"]
+    return summary.reset_index()
+
+
+def url_rounds(frame):
+    """
+    Per (URL, round): warming request cache status and whether any request of the round missed,
+    with the round index (rounds in id order) used to find the next round.
+    """
+    round_index = {round_id: i for i, round_id in enumerate(sorted(frame["round"].dropna().unique()))}
+    grouped = frame.groupby(["url", "round"], sort=True)
+    per_round = pd.DataFrame({
+        "urltype": grouped["urltype"].first(),
+        "warm_missed": frame[frame["warmer"]].set_index(["url", "round"])["missed"],
+        "warm_eviction": frame[frame["warmer"]].set_index(["url", "round"])["eviction"],
+        "any_missed": grouped["missed"].any(),
+    }).reset_index()
+    per_round["round_index"] = per_round["round"].map(round_index)
+    return per_round
+
+
+def recovery(per_round):
+    """
+    Cache recovery between consecutive rounds: URLs missed in round N that are served
+    from the edge cache (not missed) at the first request of round N+1.
+    """
+    next_rows = per_round.groupby("url").shift(-1)
+    consecutive = next_rows["round_index"] == per_round["round_index"] + 1
+    missed = per_round[per_round["any_missed"] & consecutive]
+    recovered = ~next_rows.loc[missed.index, "warm_missed"].astype(bool)
+    result = pd.DataFrame({"missed_urls": missed.groupby("round").size(), "recovered_urls": recovered.groupby(missed["round"]).sum()})
+    result["recovery_rate"] = result["recovered_urls"] / result["missed_urls"]
+    return result.reset_index()
+
+
+def eviction(per_round):
+    """
+    Eviction rate: share of rounds (after the first round a URL appears in) where the warming
+    request was classified EVICTED, i.e. the copy cached by an earlier round was lost before its
+    TTL. Misses after the TTL ran out (EXPIRED) are counted separately. Per URL and per urltype.
+    """
+    seen_before = per_round.groupby("url").cumcount() > 0
+    later = per_round[seen_before].assign(
+        evicted=lambda rows: rows["warm_eviction"] == EVICTION_ALERT_EVICTED,
+        expired=lambda rows: rows["warm_eviction"] == EVICTION_ALERT_EXPIRED,
+    )
+    aggregations = {"rounds": ("round", "size"), "evicted": ("evicted", "sum"), "expired": ("expired", "sum")}
+    by_url = later.groupby("url").agg(urltype=("urltype", "first"), **aggregations)
+    by_url["eviction_rate"] = by_url["evicted"] / by_url["rounds"]
+    by_urltype = later.groupby("urltype").agg(urls=("url", "nunique"), **aggregations)
+    by_urltype["eviction_rate"] = by_urltype["evicted"] / by_urltype["rounds"]
+    by_url = by_url.sort_values(["eviction_rate", "evicted"], ascending=False)
+    return by_url.reset_index(), by_urltype.reset_index()
+
+
+def ttfb_percentiles(frame, by):
+    """TTFB (eo.meta.ttfb-ms) count / mean / percentiles per group."""
+    measured = frame.dropna(subset=["ttfb_ms"])
+    grouped = measured.groupby(by)["ttfb_ms"]
+    result = pd.DataFrame({"count": grouped.size(), "mean_ms": grouped.mean()})
+    quantiles = grouped.quantile(list(TTFB_PERCENTILES)).unstack()
+    quantiles.columns = [f"p{int(q * 100)}_ms" for q in quantiles.columns]
+    return result.join(quantiles).reset_index()
+
+
+def warm_handoff(frame):
+    """
+    Cross-cloud warm hand-off per (warmer area -> verifier area): of the URLs the warmer fetched
+    from the origin (MISS), how many the later request from the other area got as HIT.
+    """
+    warmers = frame.loc[frame["warmer"], ["round", "url", "area", "missed"]]
+    warmers = warmers.rename(columns={"area": "warmer_area", "missed": "warmer_missed"})
+    verifiers = frame.loc[~frame["warmer"], ["round", "url", "area", "cache_status"]].rename(columns={"area": "verifier_area"})
+    pairs = verifiers.merge(warmers, on=["round", "url"])
+    pairs = pairs[pairs["verifier_area"] != pairs["warmer_area"]]
+    pairs["hit_after_miss"] = pairs["warmer_missed"] & (pairs["cache_status"] == "HIT")
+    grouped = pairs.groupby(["warmer_area", "verifier_area"])
+    result = pd.DataFrame({
+        "pairs": grouped.size(),
+        "warmer_missed": grouped["warmer_missed"].sum(),
+        "verifier_hit_after_miss": grouped["hit_after_miss"].sum(),
+    })
+    result["handoff_rate"] = result["verifier_hit_after_miss"] / result["warmer_missed"]
+    return result.reset_index()
+
+
+def area_cache_status(frame):
+    """Cache status counts per round and area (e.g. AWS first: MISS, Azure after: HIT)."""
+    return pd.crosstab([frame["round"], frame["area"]], frame["cache_status"]).reset_index()
+
+
+def eviction_classes(frame):
+    """Eviction classification (classify_evictions) counts per round and area."""
+    return pd.crosstab([frame["round"], frame["area"]], frame["eviction"]).reset_index()
+
+
+def round_stats(frame):
+    """Per round: age (seconds) and waitSeconds min / max / mean, n8n eviction alert counts."""
+    grouped = frame.groupby("round")
+    stats = pd.DataFrame({
+        "age_min": grouped["age"].min(),
+        "age_max": grouped["age"].max(),
+        "age_mean": grouped["age"].mean(),
+        "wait_min": grouped["wait_seconds"].min(),
+        "wait_max": grouped["wait_seconds"].max(),
+        "wait_mean": grouped["wait_seconds"].mean(),
+    })
+    if frame["eviction_alert"].notna().any():
+        stats = stats.join(pd.crosstab(frame["round"], frame["eviction_alert"]).add_prefix("alert_"))
+    return stats.reset_index()
+
+
+def analyze(frame, cache_status_values=None):
+    """Run all analyses on a loaded frame. Returns {name: DataFrame}."""
+    frame = prepare_frame(frame, cache_status_values)
+    per_round = url_rounds(frame)
+    eviction_by_url, eviction_by_urltype = eviction(per_round)
+    return {
+        "rounds": round_summary(frame),
+        "area_cache_status": area_cache_status(frame),
+        "recovery": recovery(per_round),
+        "eviction_classes": eviction_classes(frame),
+        "eviction_by_urltype": eviction_by_urltype,
+        "eviction_by_url": eviction_by_url,
+        "ttfb_by_cache_status": ttfb_percentiles(frame, "cache_status"),
+        "ttfb_by_area_cache_status": ttfb_percentiles(frame, ["area", "cache_status"]),
+        "warm_handoff": warm_handoff(frame),
+        "round_stats": round_stats(frame),
+    }
+
+
+def _format_cell(value):
+    if isinstance(value, float):
+        if pd.isna(value):
+            return ""
+        return f"{value:,.3f}" if abs(value) < 100 else f"{value:,.1f}"
+    return str(value)
+
+
+def markdown_table(table):
+    lines = ["| " + " | ".join(str(c) for c in table.columns) + " |", "|" + "---|" * len(table.columns)]
+    for row in table.itertuples(index=False):
+        lines.append("| " + " | ".join(_format_cell(value) for value in row) + " |")
+    return "\n".join(lines)
+
+
+REPORT_SECTIONS = [
+    ("rounds", "ラウンド別サマリー", "リクエスト数・ユニークURL数・エラー数・キャッシュステータス（正規化）別件数・HIT 率"),
+    ("area_cache_status", "ラウンド・リージョン別キャッシュステータス", "先行リージョンの MISS と後続リージョンの HIT"),
+    ("warm_handoff", "クロスクラウド ウォームハンドオフ", "先行リージョンが MISS（オリジンフェッチ）した URL のうち、同一ラウンドで後続リージョンが HIT した割合"),
+    ("recovery", "キャッシュ回復率", "ラウンド N で MISS / EXPIRED になった URL のうち、次のラウンドの最初のリクエストで MISS にならなかった割合"),
+    ("eviction_classes", "Eviction 判定", "EVICTED（TTL 前に消失）/ EXPIRED（TTL 切れ）/ FRESH（新しく生成されたコピー）/ SAFE / IGNORE の件数"),
+    ("eviction_by_urltype", "URL 種別ごとの Eviction 率", "2 ラウンド目以降に、ラウンド最初のリクエストが EVICTED と判定された割合"),
+    ("eviction_by_url", "URL ごとの Eviction 率", f"上位 {REPORT_TOP_URLS} 件（全件は JSON）"),
+    ("ttfb_by_cache_status", "キャッシュステータス別 TTFB", "eo.meta.ttfb-ms のパーセンタイル"),
+    ("ttfb_by_area_cache_status", "リージョン・キャッシュステータス別 TTFB", "eo.meta.ttfb-ms のパーセンタイル"),
+    ("round_stats", "Age / waitSeconds / Eviction Alert", "age（秒）・waitSeconds（秒）の最小・最大・平均と eo.re.eviction-alert の件数"),
+]
+
+
+def render_markdown(report, title="RequestResults 分析レポート"):
+    lines = [f"# {title}", ""]
+    for number, (name, heading, description) in enumerate(REPORT_SECTIONS, start=1):
+        table = report[name]
+        if name == "eviction_by_url":
+            table = table.head(REPORT_TOP_URLS)
+        lines += [f"## {number}. {heading}", "", description, ""]
+        lines += [markdown_table(table) if len(table) else "（データなし）", ""]
+    return "\n".join(lines)
+
+
+def report_to_json(report):
+    return {name: json.loads(table.to_json(orient="records")) for name, table in report.items()}
@@ -0,0 +1,142 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from analytics import CACHED_STATUSES, MISS_STATUSES
+from scheduler import cloud_type_area
+
+logger = logging.getLogger(__name__)
+
+# Warm then verify: the warm area requests every URL of the round, then (after the delay)
+# each verify area requests only the URLs the warm area reported MISS / EXPIRED.
+# Areas are n8n cloud_type_area values (180 RequestEngine Settings), e.g. AwsLambda_ap-northeast-1
+DEFAULT_VERIFY_DELAY = 30.0  # Seconds between the warm response and the verify request of a URL
+PHASE_VERIFY = "verify"
+
+
+def with_cloud_type_area(frame):
+    """Prepared frame plus cloud_type_area (from x-eo-re and eo.meta.re-area) per row."""
+    keys = frame["engine"].astype(str) + "\t" + frame["area"].astype(str)
+    codes, uniques = pd.factorize(keys)
+    mapping = [cloud_type_area(*key.split("\t", 1)) for key in uniques] + [None]
+    return frame.assign(cloud_type_area=np.array(mapping, dtype=object)[codes])
+
+
+def warm_results(frame, warm_area, round_id=None):
+    """First response of each URL at the warm area in the round (default: the latest round it warmed)."""
+    rows = frame[frame["cloud_type_area"] == warm_area]
+    if rows.empty:
+        return rows, None
+    if round_id is None:
+        round_id = int(rows["round"].max())
+    rows = rows[rows["round"] == round_id].drop_duplicates("url")
+    return rows, round_id
+
+
+def plan_verify(frame, warm_area, verify_areas, delay=DEFAULT_VERIFY_DELAY, round_id=None):
+    """
+    Verify targets of a round from prepared results (analytics.prepare_frame).
+
+    The URLs the warm area reported MISS / EXPIRED are verified by each verify area,
+    not before the warm response + delay. HIT URLs were already at the edge and failed /
+    uncached (no CDN status, DYNAMIC, BYPASS) URLs have nothing to verify.
+
+    Returns (targets DataFrame, summary dict).
+    """
+    frame = with_cloud_type_area(frame)
+    warmed, round_id = warm_results(frame, warm_area, round_id)
+    if round_id is None:
+        raise ValueError(f"No results of the warm area {warm_area}")
+
+    needs_verify = warmed["cache_status"].isin(MISS_STATUSES) & ~warmed["error"]
+    missed = warmed[needs_verify]
+    not_before = missed["end"].fillna(missed["start"]) + delay
+    targets = pd.concat([
+        pd.DataFrame({
+            "url": missed["url"],
+            "cloud_type_area": verify_area,
+            "urltype": missed["urltype"],
+            "warm_cache_status": missed["cache_status"],
+            "warm_pop": missed["pop"],
+            "not_before": not_before,
+        })
+        for verify_area in verify_areas
+    ], ignore_index=True)
+    targets = targets.sort_values(["not_before", "cloud_type_area"], kind="stable").reset_index(drop=True)
+
+    summary = {
+        "round_id": round_id,
+        "warm_area": warm_area,
+        "verify_areas": list(verify_areas),
+        "delay": delay,
+        "warmed": len(warmed),
+        "warm_hit": int(warmed["cache_status"].isin(CACHED_STATUSES).sum()),
+        "warm_miss": len(missed),
+        "warm_error": int(warmed["error"].sum()),
+        "verify_requests": len(targets),
+        # Every area requesting every URL (the round without the coordinator)
+        "requests_all_areas": len(warmed) * (1 + len(verify_areas)),
+        "requests_coordinated": len(warmed) + len(targets),
+    }
+    return targets, summary
+
+
+def verify_coverage(frame, warm_area, verify_areas, round_id=None):
+    """
+    Per warm POP: URLs the warm area missed, how many a verify area requested after the warm
+    response (same round), how many of those were served from the edge cache, and how many at
+    the same POP (the verify area reached the edge the warm area filled).
+    """
+    frame = with_cloud_type_area(frame)
+    warmed, round_id = warm_results(frame, warm_area, round_id)
+    if round_id is None:
+        return pd.DataFrame()
+    missed = warmed[warmed["cache_status"].isin(MISS_STATUSES) & ~warmed["error"]]
+    missed = missed.assign(warmed_at=missed["end"].fillna(missed["start"]))
+    verified = frame[(frame["round"] == round_id) & frame["cloud_type_area"].isin(verify_areas)]
+    verified = verified.drop_duplicates(["url", "cloud_type_area"])[["url", "cloud_type_area", "start", "cache_status", "pop"]]
+    joined = missed[["url", "pop", "warmed_at"]].merge(verified, on="url", how="left", suffixes=("_warm", ""))
+    joined["verified"] = joined["cloud_type_area"].notna() & (joined["start"] >= joined["warmed_at"])
+    joined["hit"] = joined["verified"] & joined["cache_status"].isin(CACHED_STATUSES)
+    joined["same_pop"] = joined["verified"] & (joined["pop"] == joined["pop_warm"])
+
+    coverage = joined.groupby(joined["pop_warm"].fillna("(none)")).agg(
+        missed=("url", "nunique"),
+        verified=("verified", "sum"),
+        hit=("hit", "sum"),
+        same_pop=("same_pop", "sum"),
+    )
+    coverage["hit_rate"] = (coverage["hit"] / coverage["verified"]).where(coverage["verified"] > 0)
+    coverage.index.name = "pop"
+    return coverage.reset_index()
+
+
+def verify_plan_to_json(targets, summary, coverage=None):
+    """Verify plan as JSON for n8n: targets keyed by targetUrl + cloud_type_area."""
+    plan = dict(summary)
+    plan["phase"] = PHASE_VERIFY
+    plan["targets"] = [
+        {
+            "targetUrl": row.url,
+            "cloud_type_area": row.cloud_type_area,
+            "urltype": row.urltype,
+            "warm_cache_status": row.warm_cache_status,
+            "warm_pop": None if pd.isna(row.warm_pop) else row.warm_pop,
+            "not_before": round(float(row.not_before), 3),
+        }
+        for row in targets.itertuples(index=False)
+    ]
+    if coverage is not None and not coverage.empty:
+        plan["coverage"] = [
+            {
+                "pop": row.pop,
+                "missed": int(row.missed),
+                "verified": int(row.verified),
+                "hit": int(row.hit),
+                "same_pop": int(row.same_pop),
+                "hit_rate": None if pd.isna(row.hit_rate) else round(float(row.hit_rate), 4),
+            }
+            for row in coverage.itertuples(index=False)
+        ]
+    return plan
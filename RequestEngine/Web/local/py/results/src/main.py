@@ -0,0 +1,172 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+
+from analytics import analyze, load_frame, prepare_frame, render_markdown, report_to_json
+from coordinator import DEFAULT_VERIFY_DELAY, plan_verify, verify_coverage, verify_plan_to_json
+from results_store import MAP_COLUMNS, ResultsStore, load_result_file
+from scheduler import plan_rewarm, plan_to_json
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_STORE_DIR = os.path.join(RESULTS_DIR, "store")
+DEFAULT_REPORT_DIR = os.path.join(RESULTS_DIR, "reports")
+
+
+def import_files(store, paths):
+    for path in paths:
+        rows = load_result_file(path)
+        store.append(rows)
+        logger.info(f"Imported {len(rows)} rows: {path}")
+
+
+def export_csv(table, output):
+    """Write selected columns as CSV (map columns as JSON objects)."""
+    columns = {name: table.column(name).to_pylist() for name in table.column_names}
+    writer = csv.writer(output)
+    writer.writerow(table.column_names)
+    for i in range(table.num_rows):
+        row = []
+        for name in table.column_names:
+            value = columns[name][i]
+            if name in MAP_COLUMNS and value is not None:
+                value = json.dumps(dict(value), ensure_ascii=False)
+            row.append("" if value is None else value)
+        writer.writerow(row)
+
+
+def write_report(store, paths, rounds, report_dir):
+    """Analyze the store (or the given files) and write the Markdown / JSON report."""
+    start = time.perf_counter()
+    frame = load_frame(store=None if paths else store, paths=paths, rounds=rounds)
+    if frame.empty:
+        raise SystemExit("No results to analyze (import files into the store or pass CSV / JSON paths)")
+    report = analyze(frame)
+    os.makedirs(report_dir, exist_ok=True)
+    base = os.path.join(report_dir, f"ANALYSIS_REPORT_{time.strftime('%Y-%m-%d_%H_%M_%S')}")
+    with open(base + ".md", "w", encoding="utf-8") as f:
+        f.write(render_markdown(report))
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(report_to_json(report), f, ensure_ascii=False, indent=2)
+    logger.info(f"Analyzed {len(frame)} rows ({frame['round'].nunique()} rounds) in {time.perf_counter() - start:.2f}s: {base}.md / .json")
+
+
+def write_rewarm_plan(store, paths, now, interval, output):
+    """Plan the next round from the store (or the given files) and write the due target list (JSON)."""
+    frame = load_frame(store=None if paths else store, paths=paths)
+    if frame.empty:
+        raise SystemExit("No results to plan from (import files into the store or pass CSV / JSON paths)")
+    plan = plan_rewarm(prepare_frame(frame), now=now, interval=interval)
+    body = json.dumps(plan_to_json(plan), ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(body)
+    else:
+        print(body)
+    for (area, reason), count in plan[plan["due"]].groupby(["area", "reason"]).size().items():
+        logger.info(f"Due: {area} {reason} {count}")
+    logger.info(f"Re-warm plan: {int(plan['due'].sum())} due / {len(plan)} targets{f': {output}' if output else ''}")
+
+
+def write_verify_plan(store, paths, warm_area, verify_areas, delay, round_id, output):
+    """Plan the verify phase of a round from its warm results and write the target list (JSON)."""
+    frame = load_frame(store=None if paths else store, paths=paths, rounds=None if round_id is None else [round_id])
+    if frame.empty:
+        raise SystemExit("No results to plan from (import files into the store or pass CSV / JSON paths)")
+    frame = prepare_frame(frame)
+    try:
+        targets, summary = plan_verify(frame, warm_area, verify_areas, delay, round_id)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    coverage = verify_coverage(frame, warm_area, verify_areas, summary["round_id"])
+    body = json.dumps(verify_plan_to_json(targets, summary, coverage), ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(body)
+    else:
+        print(body)
+    for row in coverage.itertuples(index=False):
+        logger.info(f"Coverage {row.pop}: {row.hit}/{row.verified} verified HIT ({row.same_pop} same POP) of {row.missed} missed")
+    logger.info(
+        f"Verify plan (round {summary['round_id']}): {summary['warm_miss']} of {summary['warmed']} missed at {warm_area}, "
+        f"{summary['verify_requests']} verify requests ({summary['requests_coordinated']} vs "
+        f"{summary['requests_all_areas']} for every area){f': {output}' if output else ''}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EdgeOptimizer RequestResults columnar store")
+    parser.add_argument("--store", type=str, default=DEFAULT_STORE_DIR, help="Store directory (Parquet files)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Append RequestResults CSV / flat result JSON files")
+    import_parser.add_argument("paths", nargs="+", help="CSV or JSON files (one store file per round id)")
+
+    subparsers.add_parser("info", help="Show files / rows / rounds / bytes of the store")
+    subparsers.add_parser("compact", help="Merge round files into one segment file (faster reads)")
+
+    export_parser = subparsers.add_parser("export", help="Export selected columns as CSV")
+    export_parser.add_argument("--columns", type=str, required=True,
+                               help="Comma-separated flat column names (e.g. eo.meta.ttfb-ms,headers.response-headers.age)")
+    export_parser.add_argument("--rounds", type=str, default=None, help="Comma-separated round ids (default: all)")
+    export_parser.add_argument("--output", type=str, default=None, help="Output CSV path (default: stdout)")
+
+    analyze_parser = subparsers.add_parser("analyze", help="Round-over-round analysis report (Markdown + JSON)")
+    analyze_parser.add_argument("paths", nargs="*", help="CSV or JSON files to analyze instead of the store")
+    analyze_parser.add_argument("--rounds", type=str, default=None, help="Comma-separated round ids (default: all)")
+    analyze_parser.add_argument("--output-dir", type=str, default=DEFAULT_REPORT_DIR, help="Report directory")
+
+    schedule_parser = subparsers.add_parser("schedule", help="Re-warm plan: targets due before the next round (JSON)")
+    schedule_parser.add_argument("paths", nargs="*", help="CSV or JSON files to plan from instead of the store")
+    schedule_parser.add_argument("--interval", type=float, default=None,
+                                 help="Seconds until the next round (default: median interval of past rounds)")
+    schedule_parser.add_argument("--now", type=float, default=None, help="Plan time (epoch seconds, default: current time)")
+    schedule_parser.add_argument("--output", type=str, default=None, help="Output JSON path (default: stdout)")
+
+    coordinate_parser = subparsers.add_parser("coordinate", help="Warm then verify: verify targets of a round (JSON)")
+    coordinate_parser.add_argument("paths", nargs="*", help="CSV or JSON files to plan from instead of the store")
+    coordinate_parser.add_argument("--warm", type=str, required=True, help="Warm area (cloud_type_area, e.g. AwsLambda_ap-northeast-1)")
+    coordinate_parser.add_argument("--verify", type=str, required=True,
+                                   help="Comma-separated verify areas (e.g. AzureFunctions_japan-east)")
+    coordinate_parser.add_argument("--delay", type=float, default=DEFAULT_VERIFY_DELAY,
+                                   help="Seconds between the warm response and the verify request of a URL")
+    coordinate_parser.add_argument("--round", type=int, default=None, help="Round id (default: latest round of the warm area)")
+    coordinate_parser.add_argument("--output", type=str, default=None, help="Output JSON path (default: stdout)")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.store)
+    if args.command == "import":
+        import_files(store, args.paths)
+    elif args.command == "info":
+        print(json.dumps(store.info(), indent=2))
+    elif args.command == "compact":
+        store.compact()
+    elif args.command == "analyze":
+        rounds = [int(r) for r in args.rounds.split(",")] if args.rounds else None
+        write_report(store, args.paths, rounds, args.output_dir)
+    elif args.command == "schedule":
+        write_rewarm_plan(store, args.paths, args.now, args.interval, args.output)
+    elif args.command == "coordinate":
+        verify_areas = [area.strip() for area in args.verify.split(",") if area.strip()]
+        if not verify_areas or args.warm in verify_areas:
+            raise SystemExit("The verify areas must differ from the warm area")
+        write_verify_plan(store, args.paths, args.warm, verify_areas, args.delay, args.round, args.output)
+    elif args.command == "export":
+        rounds = [int(r) for r in args.rounds.split(",")] if args.rounds else None
+        table = store.read(columns=args.columns.split(","), rounds=rounds)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="") as f:
+                export_csv(table, f)
+            logger.info(f"Exported {table.num_rows} rows: {args.output}")
+        else:
+            export_csv(table, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
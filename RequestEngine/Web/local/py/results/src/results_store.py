@@ -0,0 +1,357 @@
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Flat result column names (same as the Request Engine output / RequestResults CSV)
+ROUND_ID_COLUMN = "eo.meta.http-request-round-id"
+REQUEST_HEADER_PREFIX = "headers.request-headers."
+RESPONSE_HEADER_PREFIX = "headers.response-headers."
+LEGACY_HEADER_PREFIX = "headers."  # Older CSV layout: response headers as headers.<name>
+NON_HEADER_PREFIXES = ("headers.general.", REQUEST_HEADER_PREFIX, RESPONSE_HEADER_PREFIX)
+LEGACY_COLUMN_NAMES = {"eo.meta.area": "eo.meta.re-area"}
+
+# Map columns (key -> string value). Header names vary per row, so they are not columns of their own.
+REQUEST_HEADERS_COLUMN = "headers.request-headers"
+RESPONSE_HEADERS_COLUMN = "headers.response-headers"
+EXTRA_COLUMN = "eo.extra"  # Everything else: extensions (eo.security.*), n8n columns (eo.re.*, waitSeconds), new keys
+MAP_COLUMNS = (REQUEST_HEADERS_COLUMN, RESPONSE_HEADERS_COLUMN, EXTRA_COLUMN)
+
+# Known flat result keys of _build_flat_result (request_engine_core.py) stored as typed columns
+TYPED_COLUMNS = {
+    "headers.general.status-code": pa.int32(),
+    "headers.general.status-message": pa.string(),
+    "headers.general.request-url": pa.string(),
+    "headers.general.http-request-method": pa.string(),
+    "eo.meta.http-request-number": pa.int64(),
+    "eo.meta.http-request-uuid": pa.string(),
+    ROUND_ID_COLUMN: pa.int64(),
+    "eo.meta.urltype": pa.string(),
+    "eo.meta.re-area": pa.string(),
+    "eo.meta.execution-id": pa.string(),
+    "eo.meta.request-start-timestamp": pa.float64(),
+    "eo.meta.request-end-timestamp": pa.float64(),
+    "eo.meta.cold-start": pa.bool_(),
+    "eo.meta.http-protocol-version": pa.string(),
+    "eo.meta.tls-version": pa.string(),
+    "eo.meta.connection-reused": pa.bool_(),
+    "eo.meta.tls-cipher": pa.string(),
+    "eo.meta.tls-alpn": pa.string(),
+    "eo.meta.tls-session-resumed": pa.bool_(),
+    "eo.meta.tls-handshake-ms": pa.float64(),
+    "eo.meta.peer-ip": pa.string(),
+    "eo.meta.dns-cache-hit": pa.bool_(),
+    "eo.meta.cdn-header-name": pa.string(),
+    "eo.meta.cdn-header-value": pa.string(),
+    "eo.meta.cdn-cache-status": pa.string(),
+    "eo.meta.cdn-cache-status-normalized": pa.string(),
+    "eo.meta.cdn-pop": pa.string(),
+    "eo.meta.cdn-detected": pa.string(),
+    "eo.meta.cdn-ttl": pa.float64(),
+    "eo.meta.eviction-alert": pa.string(),
+    "eo.meta.duration-ms": pa.float64(),
+    "eo.meta.ttfb-ms": pa.float64(),
+    "eo.meta.timing.dns-ms": pa.float64(),
+    "eo.meta.timing.connect-ms": pa.float64(),
+    "eo.meta.timing.tls-ms": pa.float64(),
+    "eo.meta.timing.request-sent-ms": pa.float64(),
+    "eo.meta.timing.first-byte-ms": pa.float64(),
+    "eo.meta.timing.download-ms": pa.float64(),
+    "eo.meta.timing.retry-wait-ms": pa.float64(),
+    "eo.meta.actual-content-length": pa.int64(),
+    "eo.meta.body-truncated": pa.bool_(),
+    "eo.meta.content-hash": pa.string(),
+    "eo.meta.revalidated": pa.bool_(),
+    "eo.meta.content-changed": pa.bool_(),
+    "eo.meta.revalidation-skipped": pa.bool_(),
+    "eo.meta.warmup-strategy": pa.string(),
+    "eo.meta.warmup-strategy-applied": pa.string(),
+    "eo.meta.redirect-count": pa.int32(),
+    "eo.meta.retry-attempts": pa.int32(),
+    "eo.meta.retry-delays-ms": pa.list_(pa.float64()),
+    "eo.meta.retry-last-error": pa.string(),
+    "eo.meta.retry-stop-reason": pa.string(),
+    "eo.meta.fetch-ms": pa.float64(),
+    "eo.meta.circuit-state": pa.string(),
+    "eo.meta.host-limit-wait-ms": pa.float64(),
+}
+
+RESULTS_SCHEMA = pa.schema(
+    [pa.field(name, type_) for name, type_ in TYPED_COLUMNS.items()]
+    + [pa.field(name, pa.map_(pa.string(), pa.string())) for name in MAP_COLUMNS]
+)
+
+PARQUET_COMPRESSION = "zstd"
+ROUND_FILE_PREFIX = "round-"  # Written by append (one per round)
+SEGMENT_FILE_PREFIX = "segment-"  # Written by compact (many rounds, sorted by round id)
+SEGMENT_ROW_GROUP_SIZE = 64 * 1024  # Row groups per segment (round filter skips row groups by statistics)
+SEGMENT_MERGED_FILES_KEY = b"eo.merged_files"  # Segment metadata: round files merged into it
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1"):
+        return True
+    if text in ("false", "0"):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def _to_float_list(value):
+    if isinstance(value, str):
+        value = json.loads(value)
+    return [float(v) for v in value]
+
+
+def _converter(type_):
+    if pa.types.is_integer(type_):
+        return lambda value: int(float(value)) if isinstance(value, str) else int(value)
+    if pa.types.is_floating(type_):
+        return float
+    if pa.types.is_boolean(type_):
+        return _to_bool
+    if pa.types.is_list(type_):
+        return _to_float_list
+    return str
+
+
+_CONVERTERS = {name: _converter(type_) for name, type_ in TYPED_COLUMNS.items()}
+
+
+def _to_text(value):
+    """Map values are strings (CSV-compatible: bools / numbers / lists as JSON)."""
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def split_flat_result(row):
+    """
+    Split one flat result (Request Engine JSON or RequestResults CSV row) into
+    typed column values and the three map columns.
+
+    Empty strings are missing values (CSV). Values that do not fit the typed column
+    are kept as text in eo.extra under the same key. Legacy headers.<name> columns never
+    override headers.response-headers.<name> (older CSVs mix in the Request Engine's own headers).
+    """
+    typed = {}
+    request_headers, response_headers, legacy_headers, extra = {}, {}, {}, {}
+    for key, value in row.items():
+        if not key or value is None or value == "":
+            continue
+        key = LEGACY_COLUMN_NAMES.get(key, key)
+        converter = _CONVERTERS.get(key)
+        if converter is not None:
+            try:
+                typed[key] = converter(value)
+                continue
+            except (TypeError, ValueError):
+                pass
+        if key.startswith(REQUEST_HEADER_PREFIX):
+            request_headers[key[len(REQUEST_HEADER_PREFIX):]] = _to_text(value)
+        elif key.startswith(RESPONSE_HEADER_PREFIX):
+            response_headers[key[len(RESPONSE_HEADER_PREFIX):]] = _to_text(value)
+        elif key.startswith(LEGACY_HEADER_PREFIX) and not key.startswith(NON_HEADER_PREFIXES):
+            legacy_headers[key[len(LEGACY_HEADER_PREFIX):]] = _to_text(value)
+        else:
+            extra[key] = _to_text(value)
+    for name, value in legacy_headers.items():
+        response_headers.setdefault(name, value)
+    typed[REQUEST_HEADERS_COLUMN] = list(request_headers.items())
+    typed[RESPONSE_HEADERS_COLUMN] = list(response_headers.items())
+    typed[EXTRA_COLUMN] = list(extra.items())
+    return typed
+
+
+def rows_to_table(rows):
+    """Build an Arrow table (RESULTS_SCHEMA) from flat results."""
+    columns = {name: [] for name in RESULTS_SCHEMA.names}
+    for row in rows:
+        values = split_flat_result(row)
+        for name, column in columns.items():
+            column.append(values.get(name))
+    return pa.table(columns, schema=RESULTS_SCHEMA)
+
+
+def load_csv_rows(path):
+    """Load flat result rows from a RequestResults CSV (n8n 350 Json Flattener for Csv output)."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def load_result_file(path):
+    """Flat result rows from a RequestResults CSV or a JSON file (flat result object or array)."""
+    if path.lower().endswith(".csv"):
+        return load_csv_rows(path)
+    with open(path, encoding="utf-8") as f:
+        body = json.load(f)
+    return body if isinstance(body, list) else [body]
+
+
+def resolve_column(name):
+    """
+    Stored location of a flat result column name: (stored column, map key or None).
+
+    Single headers / extra keys live in the map columns, e.g. "headers.response-headers.age"
+    -> (headers.response-headers, "age"), "eo.re.eviction-alert" -> (eo.extra, "eo.re.eviction-alert").
+    """
+    name = LEGACY_COLUMN_NAMES.get(name, name)
+    if name in RESULTS_SCHEMA.names:
+        return name, None
+    if name.startswith(REQUEST_HEADER_PREFIX):
+        return REQUEST_HEADERS_COLUMN, name[len(REQUEST_HEADER_PREFIX):]
+    if name.startswith(RESPONSE_HEADER_PREFIX):
+        return RESPONSE_HEADERS_COLUMN, name[len(RESPONSE_HEADER_PREFIX):]
+    return EXTRA_COLUMN, name
+
+
+def select_columns(table, columns):
+    """Select flat result columns from a RESULTS_SCHEMA table (map keys as string columns)."""
+    output = {}
+    for name in columns:
+        source, key = resolve_column(name)
+        if key is None:
+            output[name] = table.column(source)
+        else:
+            output[name] = pc.map_lookup(table.column(source), pa.scalar(key, pa.string()), "first")
+    return pa.table(output)
+
+
+class ResultsStore:
+    """
+    Columnar RequestResults store: a directory of zstd-compressed Parquet files, one per appended round.
+
+    - Appending a round writes new files only (existing files are never rewritten).
+    - Known eo.meta.* keys are typed columns; request / response headers and other keys
+      are map columns (Parquet dictionary-encodes their keys and values).
+    - read() loads only the requested columns (and rounds) from all files.
+    - compact() merges round files into one segment file (each file costs a few ms to open).
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+
+    def _list(self, prefix):
+        if not os.path.isdir(self.store_dir):
+            return []
+        return sorted(
+            os.path.join(self.store_dir, name)
+            for name in os.listdir(self.store_dir)
+            if name.startswith(prefix) and name.endswith(".parquet")
+        )
+
+    def _merged_round_files(self, segments):
+        merged = set()
+        for path in segments:
+            metadata = pq.read_schema(path).metadata or {}
+            merged.update(json.loads(metadata.get(SEGMENT_MERGED_FILES_KEY, b"[]")))
+        return merged
+
+    def _files(self):
+        """Segment files + round files not merged into a segment yet (left over by an interrupted compact)."""
+        segments = self._list(SEGMENT_FILE_PREFIX)
+        merged = self._merged_round_files(segments)
+        return segments + [path for path in self._list(ROUND_FILE_PREFIX) if os.path.basename(path) not in merged]
+
+    def append(self, rows):
+        """
+        Append flat results (one file per round id in rows). Returns the written file paths.
+        """
+        table = rows_to_table(rows)
+        if table.num_rows == 0:
+            return []
+        os.makedirs(self.store_dir, exist_ok=True)
+        written = []
+        round_ids = table.column(ROUND_ID_COLUMN)
+        for round_id in pc.unique(round_ids).to_pylist():
+            mask = pc.is_null(round_ids) if round_id is None else pc.equal(round_ids, round_id)
+            round_table = table.filter(pc.fill_null(mask, False))
+            label = "none" if round_id is None else str(round_id)
+            file_name = f"{ROUND_FILE_PREFIX}{label}-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+            path = os.path.join(self.store_dir, file_name)
+            # Write under a temporary name so readers never see a partial file
+            pq.write_table(round_table, path + ".tmp", compression=PARQUET_COMPRESSION)
+            os.replace(path + ".tmp", path)
+            written.append(path)
+            logger.info(f"Appended {round_table.num_rows} rows (round {label}): {path}")
+        return written
+
+    def compact(self):
+        """
+        Merge all round files into one new segment file (sorted by round id), then delete them.
+
+        Readers ignore round files listed in a segment, so an interrupted compact never
+        duplicates rows; the next compact deletes the leftovers. Returns the segment path.
+        """
+        segments = self._list(SEGMENT_FILE_PREFIX)
+        merged = self._merged_round_files(segments)
+        round_files = self._list(ROUND_FILE_PREFIX)
+        leftovers = [path for path in round_files if os.path.basename(path) in merged]
+        pending = [path for path in round_files if os.path.basename(path) not in merged]
+        segment_path = None
+        if pending:
+            table = ds.dataset(pending, schema=RESULTS_SCHEMA, format="parquet").to_table()
+            table = table.sort_by([(ROUND_ID_COLUMN, "ascending")])
+            table = table.replace_schema_metadata({
+                SEGMENT_MERGED_FILES_KEY: json.dumps([os.path.basename(path) for path in pending]).encode("utf-8"),
+            })
+            segment_path = os.path.join(self.store_dir, f"{SEGMENT_FILE_PREFIX}{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet")
+            pq.write_table(table, segment_path + ".tmp", compression=PARQUET_COMPRESSION, row_group_size=SEGMENT_ROW_GROUP_SIZE)
+            os.replace(segment_path + ".tmp", segment_path)
+            logger.info(f"Compacted {len(pending)} round files ({table.num_rows} rows): {segment_path}")
+        for path in leftovers + pending:
+            os.remove(path)
+        return segment_path
+
+    def append_csv(self, path):
+        """Append the rows of a RequestResults CSV."""
+        return self.append(load_csv_rows(path))
+
+    def read(self, columns=None, rounds=None):
+        """
+        Read results from all files as one Arrow table.
+
+        columns: flat result column names (None = all stored columns). Besides typed and map
+            columns, single headers / extra keys can be selected by their flat name, e.g.
+            "headers.response-headers.age" or "eo.re.eviction-alert" (string columns).
+        rounds: round ids to load (None = all rounds); files of other rounds are skipped
+            using the Parquet column statistics.
+        """
+        # Explicit schema: files written before a typed column was added read it as null
+        dataset = ds.dataset(self._files(), schema=RESULTS_SCHEMA, format="parquet")
+        filter_expression = ds.field(ROUND_ID_COLUMN).isin(list(rounds)) if rounds is not None else None
+        if columns is None:
+            return dataset.to_table(filter=filter_expression)
+
+        physical = []
+        for name in columns:
+            source, _ = resolve_column(name)
+            if source not in physical:
+                physical.append(source)
+        return select_columns(dataset.to_table(columns=physical, filter=filter_expression), columns)
+
+    def rounds(self):
+        """Stored round ids (sorted, None for rows without a round id)."""
+        round_ids = set(self.read(columns=[ROUND_ID_COLUMN]).column(ROUND_ID_COLUMN).to_pylist())
+        return sorted(round_ids, key=lambda r: (r is None, r or 0))
+
+    def info(self):
+        """Summary of the store (files, rows, rounds, bytes on disk)."""
+        files = self._files()
+        rows = sum(pq.ParquetFile(path).metadata.num_rows for path in files)
+        return {
+            "store_dir": self.store_dir,
+            "files": len(files),
+            "rows": rows,
+            "rounds": len(self.rounds()) if files else 0,
+            "bytes": sum(os.path.getsize(path) for path in files),
+        }
@@ -0,0 +1,199 @@
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import CACHED_STATUSES, EVICTION_AGE_TOLERANCE, EVICTION_ALERT_EVICTED, MISS_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# The plan is keyed like the n8n items of 220 Loop Over Request Target Urls: data.targetUrl + data.cloud_type_area
+# (180 RequestEngine Settings), derived from the x-eo-re request header and eo.meta.re-area of the results
+CLOUD_TYPE_PREFIXES = {
+    "aws": "AwsLambda",
+    "azure": "AzureFunctions",
+    "gcp": "GcpCloudRun",
+    "cloudflare": "CloudflareWorkers",
+}
+CLOUDFLARE_AREA = "global"
+
+EVICTION_INTERVAL_QUANTILE = 0.25  # Upper bound = this quantile of the idle intervals that ended in an eviction
+REWARM_GROWTH_FACTOR = 2.0  # Never evicted: next interval = longest survived idle time * factor
+REWARM_SAFETY_FACTOR = 0.5  # Survived longer than it was once lost (behaviour changed): upper bound * factor
+REWARM_MAX_INTERVAL = 24 * 3600.0  # Warm every URL at least this often (seconds), even if nothing was learned
+DEFAULT_ROUND_INTERVAL = 3600.0  # Round interval when it cannot be learned from the round start times (seconds)
+
+REASON_ERROR = "error"  # Last request failed (status >= 400 / no response)
+REASON_TTL = "ttl"  # Copy reaches its TTL (Cache-Control) before the next round
+REASON_EVICTION = "eviction"  # Idle time reaches the learned re-warm interval before the next round
+REASON_MAX_INTERVAL = "max-interval"  # Not warmed for REWARM_MAX_INTERVAL
+
+
+def cloud_type_area(engine, area):
+    """n8n cloud_type_area of a result (e.g. aws + ap-northeast-1 -> AwsLambda_ap-northeast-1), or None."""
+    prefix = CLOUD_TYPE_PREFIXES.get(str(engine).lower()) if isinstance(engine, str) else None
+    if prefix is None or not isinstance(area, str):
+        return None
+    region = CLOUDFLARE_AREA if prefix == CLOUD_TYPE_PREFIXES["cloudflare"] else area.strip().lower().replace(" ", "-")
+    return f"{prefix}_{region}"
+
+
+def round_interval(frame):
+    """Median interval between the starts of consecutive rounds (seconds)."""
+    round_starts = frame.groupby("round")["start"].min().sort_values().diff().dropna()
+    return float(round_starts.median()) if len(round_starts) else DEFAULT_ROUND_INTERVAL
+
+
+def observations(frame):
+    """
+    HIT / MISS observations per (URL, area) in response time order, with the idle time since
+    the previous observation and how that idle period ended:
+
+    - eviction_interval: the copy was gone (EVICTED MISS), or replaced by a younger copy
+      (HIT younger than the previous copy would be now); idle time until the loss (upper bound)
+    - survived_interval: the same copy was still served (HIT)
+    """
+    cached = frame["cache_status"].isin(CACHED_STATUSES)
+    missed = frame["cache_status"].isin(MISS_STATUSES)
+    rows = frame[cached | missed].assign(
+        observed_at=lambda rows: rows["end"].fillna(rows["start"]),
+        cached=cached,
+    )
+    rows = rows.assign(copy_age=rows["age"].where(rows["cached"], 0.0)).sort_values("observed_at", kind="stable")
+    previous = rows.groupby(["url", "area"], sort=False)[["observed_at", "copy_age"]].shift(1)
+    idle = rows["observed_at"] - previous["observed_at"]
+
+    replaced = rows["cached"] & (rows["age"] + EVICTION_AGE_TOLERANCE < previous["copy_age"] + idle)
+    evicted = rows["eviction"] == EVICTION_ALERT_EVICTED
+    rows["eviction_interval"] = np.where(
+        evicted, idle, np.where(replaced, (rows["observed_at"] - rows["age"] - previous["observed_at"]).clip(lower=0), np.nan)
+    )
+    rows["survived_interval"] = idle.where(rows["cached"] & ~replaced)
+    return rows
+
+
+def learn_intervals(rows, base_interval):
+    """
+    Per (URL, area): the idle interval to re-warm at, searched between the longest idle time
+    the copy survived (lower) and the idle time after which it was lost (upper,
+    EVICTION_INTERVAL_QUANTILE of the eviction intervals).
+
+    - Never lost: lower * REWARM_GROWTH_FACTOR (at least base_interval), so the interval keeps growing
+    - lower < upper: midpoint (each eviction or survival halves the gap; warmups happen no later
+      than the interval, so it settles on the longest safe idle time)
+    - Otherwise (behaviour changed): upper * REWARM_SAFETY_FACTOR
+    """
+    upper = rows.groupby(["url", "area"])["eviction_interval"].quantile(EVICTION_INTERVAL_QUANTILE)
+    rows_upper = upper.reindex(pd.MultiIndex.from_frame(rows[["url", "area"]])).to_numpy()
+    survived = rows["survived_interval"].where(~(rows["survived_interval"] >= rows_upper))
+
+    learned = rows.assign(survived=survived).groupby(["url", "area"]).agg(
+        urltype=("urltype", "last"),
+        eviction_samples=("eviction_interval", "count"),
+        lower=("survived", "max"),
+    )
+    learned["upper"] = upper
+    lower = learned["lower"].fillna(0.0)
+    learned["rewarm_interval"] = np.where(
+        learned["upper"].isna(),
+        np.maximum(lower * REWARM_GROWTH_FACTOR, base_interval),
+        np.where(lower < learned["upper"], (lower + learned["upper"]) / 2, learned["upper"] * REWARM_SAFETY_FACTOR),
+    )
+    return learned
+
+
+def plan_rewarm(frame, now=None, interval=None):
+    """
+    Re-warm plan for the next round from prepared results (analytics.prepare_frame).
+
+    For each (URL, area) the next warmup is due at the earliest of
+    - copy created + TTL (Cache-Control max-age / s-maxage)
+    - last warmup + learned re-warm interval (learn_intervals)
+    - last warmup + REWARM_MAX_INTERVAL
+    and immediately when the last request failed. Targets due before the next round
+    (now + interval) are marked due; priority 1 is the most overdue.
+
+    Returns a DataFrame (one row per URL / area, due targets first).
+    """
+    now = time.time() if now is None else now
+    interval = round_interval(frame) if interval is None else interval
+    next_round_at = now + interval
+
+    rows = observations(frame)
+    learned = learn_intervals(rows, interval)
+    last = rows.groupby(["url", "area"]).last()
+    last_warm_at = last["observed_at"]
+    copy_created_at = last_warm_at - last["copy_age"]
+    ttl = last["ttl"].where(last["ttl"] > 0)  # 0 with a HIT / MISS: edge rule overrides the origin
+
+    candidates = pd.DataFrame({
+        REASON_TTL: copy_created_at + ttl,
+        REASON_EVICTION: last_warm_at + learned["rewarm_interval"],
+        REASON_MAX_INTERVAL: last_warm_at + REWARM_MAX_INTERVAL,
+    })
+    plan = pd.DataFrame({
+        "urltype": learned["urltype"],
+        "engine": last["engine"],
+        "last_warm_at": last_warm_at,
+        "last_cache_status": last["cache_status"],
+        "last_age": last["age"],
+        "ttl": ttl,
+        "rewarm_interval": learned["rewarm_interval"],
+        "survived_interval": learned["lower"],
+        "eviction_interval": learned["upper"],
+        "eviction_samples": learned["eviction_samples"],
+        "due_at": candidates.min(axis=1),
+        "reason": candidates.idxmin(axis=1),
+    })
+
+    # Last request of the URL / area (any row) failed: warm again now
+    last_any = frame.sort_values(["start"], kind="stable").groupby(["url", "area"]).last()
+    failed = last_any["error"].reindex(plan.index, fill_value=False)
+    plan.loc[failed, "due_at"] = now
+    plan.loc[failed, "reason"] = REASON_ERROR
+    failed_only = last_any.index[last_any["error"]].difference(plan.index)
+    if len(failed_only):
+        plan = pd.concat([plan, pd.DataFrame({
+            "urltype": last_any.loc[failed_only, "urltype"],
+            "engine": last_any.loc[failed_only, "engine"],
+            "due_at": now,
+            "reason": REASON_ERROR,
+        })])
+
+    plan["due"] = plan["due_at"] <= next_round_at
+    plan["overdue_s"] = next_round_at - plan["due_at"]
+    plan = plan.reset_index()
+    plan["cloud_type_area"] = [cloud_type_area(engine, area) for engine, area in zip(plan["engine"], plan["area"])]
+    plan["is_main_document"] = plan["urltype"] == "main_document"
+    plan = plan.sort_values(["due", "overdue_s", "is_main_document"], ascending=False, kind="stable").reset_index(drop=True)
+    plan["priority"] = np.where(plan["due"], np.arange(1, len(plan) + 1), None)
+    plan.attrs.update(generated_at=now, next_round_at=next_round_at, round_interval=interval)
+    return plan.drop(columns=["is_main_document", "overdue_s"])
+
+
+def plan_to_json(plan):
+    """
+    Plan as JSON for n8n: targets keyed by targetUrl + cloud_type_area. Targets not in the plan
+    (new URLs, results without x-eo-re) should be warmed as usual.
+    """
+    targets = []
+    for row in plan.itertuples(index=False):
+        targets.append({
+            "targetUrl": row.url,
+            "cloud_type_area": row.cloud_type_area,
+            "re_area": row.area,
+            "urltype": row.urltype,
+            "due": bool(row.due),
+            "priority": None if row.priority is None else int(row.priority),
+            "due_at": round(float(row.due_at), 3),
+            "reason": row.reason,
+        })
+    return {
+        "generated_at": plan.attrs["generated_at"],
+        "next_round_at": plan.attrs["next_round_at"],
+        "round_interval": plan.attrs["round_interval"],
+        "due": int(plan["due"].sum()),
+        "skipped": int((~plan["due"]).sum()),
+        "targets": targets,
+    }